@@ -0,0 +1,114 @@
+"""
+Журнал ответов (data/answer_log.py): время записи ответа в очередь по
+сравнению с записью каждого ответа отдельной транзакцией и проверка
+сохранности при сбое. Дочерний процесс записывает ответы и аварийно
+завершается (os._exit, затем SIGKILL во время записи), после чего
+проверяется, что ответы до flush(wait=True) сохранены, а записанные
+ответы - непрерывное начало очереди без разорванных пачек.
+Запуск из корня проекта:
+    python -m benchmarks.answer_log_crash_check
+"""
+import os
+import shutil
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from time import perf_counter, sleep
+
+from data import db_session
+from data.answer_log import AnswerLog
+from data.consts import WORD
+from data.models.answers import AnswerEvent
+from data.models.users import User
+
+FLUSHED_COUNT = 1000  # ответов до flush(wait=True)
+UNFLUSHED_COUNT = 500  # ответов после flush, процесс завершается сразу
+RECORD_COUNT = 5000
+
+
+def child(path, mode):
+    db_session.global_init(path)
+    with db_session.unit_of_work() as session:
+        session.add(User(login='crash_check', password_hash='hash'))
+    log = AnswerLog(flush_interval=0.05)
+    if mode == 'exit':
+        for index in range(FLUSHED_COUNT):
+            log.record(1, WORD, index, 'вариант', True, 0.5)
+        log.flush(wait=True)
+        for index in range(FLUSHED_COUNT, FLUSHED_COUNT + UNFLUSHED_COUNT):
+            log.record(1, WORD, index, 'вариант', True, 0.5)
+        os._exit(1)  # сбой без записи очереди
+    index = 0
+    print('ready', flush=True)
+    while True:  # запись до принудительного завершения родителем
+        log.record(1, WORD, index, 'вариант', index % 2 == 0, 0.5)
+        index += 1
+        if index % 100 == 0:
+            sleep(0.001)
+
+
+def saved_element_ids(path):
+    connection = sqlite3.connect(path)
+    assert connection.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+    ids = [row[0] for row in connection.execute('SELECT element_id FROM answer_events ORDER BY id')]
+    connection.close()
+    return ids
+
+
+def run_child(directory, mode):
+    path = os.path.join(directory, f'{mode}.sqlite')
+    process = subprocess.Popen([sys.executable, '-m', 'benchmarks.answer_log_crash_check', 'child', path, mode],
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    if mode == 'kill':
+        process.stdout.readline()
+        sleep(1)
+        process.send_signal(signal.SIGKILL)
+    process.wait()
+    return saved_element_ids(path)
+
+
+def measure_latency(directory):
+    db_session.global_init(os.path.join(directory, 'latency.sqlite'))
+    with db_session.unit_of_work() as session:
+        session.add(User(login='latency_check', password_hash='hash'))
+    log = AnswerLog()
+    start = perf_counter()
+    for index in range(RECORD_COUNT):
+        log.record(1, WORD, index, 'вариант', True, 0.5)
+    queued = (perf_counter() - start) / RECORD_COUNT * 1_000_000
+    log.stop()
+    start = perf_counter()
+    for index in range(RECORD_COUNT // 10):
+        with db_session.unit_of_work() as session:
+            session.execute(AnswerEvent.__table__.insert(), {
+                'user_id': 1, 'element_type': WORD, 'element_id': index, 'chosen': 'вариант',
+                'correct': True, 'latency': 0.5, 'answered_at': 0})
+    direct = (perf_counter() - start) / (RECORD_COUNT // 10) * 1_000_000
+    print(f'Ответ в очередь: {queued:.1f} мкс, отдельной транзакцией: {direct:.0f} мкс, '
+          f'записано журналом: {log.written}')
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        measure_latency(directory)
+        ids = run_child(directory, 'exit')
+        assert ids[:FLUSHED_COUNT] == list(range(FLUSHED_COUNT)), 'потеряны ответы до flush'
+        assert ids == list(range(len(ids))), 'записанные ответы не являются началом очереди'
+        print(f'Сбой после flush: сохранено {len(ids)} из {FLUSHED_COUNT + UNFLUSHED_COUNT} ответов, '
+              f'все {FLUSHED_COUNT} ответов до flush на месте')
+        ids = run_child(directory, 'kill')
+        assert ids == list(range(len(ids))), 'записанные ответы не являются началом очереди'
+        print(f'SIGKILL во время записи: сохранено {len(ids)} ответов без пропусков, '
+              f'целостность базы данных: ok')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == 'child':
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,35 @@
+"""
+Время нажатия "Прослушать" со звуками урока, загруженными заранее,
+и проверка, что повторное нажатие начинает звук сначала.
+Работает без звуковой карты (NullAudioBackend).
+Запуск из корня проекта:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.audio_playback_check
+"""
+import glob
+import os
+from statistics import mean
+from time import perf_counter
+
+from data.audio import AudioPlayer, NullAudioBackend
+
+PRESSES_COUNT = 1000
+
+
+def main():
+    paths = glob.glob(os.path.join('images_and_sounds', '**', '*.mp3'), recursive=True)
+    backend = NullAudioBackend()
+    player = AudioPlayer(backend)
+    start = perf_counter()
+    player.preload(paths)
+    print(f'Загрузка {len(paths)} звуков урока: {(perf_counter() - start) * 1000:.2f} мс')
+    times = []
+    for index in range(PRESSES_COUNT):
+        start = perf_counter()
+        player.play(paths[index // 2 % len(paths)])  # каждый звук нажимается дважды подряд
+        times.append(perf_counter() - start)
+    print(f'Нажатий: {PRESSES_COUNT}, среднее время: {mean(times) * 1000:.4f} мс')
+    print(f'Повторных нажатий, начавших звук сначала: {backend.restarts}')
+
+
+if __name__ == '__main__':
+    main()
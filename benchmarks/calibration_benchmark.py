@@ -0,0 +1,108 @@
+"""
+Оценка трудности элементов (data/calibration.py) по 2 000 000 ответов,
+сгенерированных моделью Раша с известными трудностями (сильные
+пользователи чаще отвечают на трудные элементы): время загрузки и подбора
+модели, совпадение оценок с истинными трудностями и время одной итерации
+циклом Python по ответам для сравнения.
+Запуск из корня проекта:
+    python -m benchmarks.calibration_benchmark
+"""
+import os
+import shutil
+import tempfile
+from math import exp
+from time import perf_counter
+
+import numpy as np
+
+from data import db_session
+from data.calibration import (ERROR_RATE, RASCH, calibrate, calibrate_types, error_rate_difficulty,
+                              load_answers)
+from data.consts import WORD
+from data.lessons import ensure_lesson_index, get_lesson_element_ids
+from data.models.words import Word
+
+USERS_COUNT = 5000
+ITEMS_COUNT = 2000
+ANSWERS_COUNT = 2_000_000
+LOOP_SAMPLE = 200_000  # ответов для измерения цикла Python
+
+
+def seed_database(session, random):
+    session.execute(Word.__table__.insert(), [
+        {'title': f'語{index}', 'reading': f'ご{index}', 'meaning': f'значение {index}'}
+        for index in range(ITEMS_COUNT)])
+    ability = random.normal(0, 1, USERS_COUNT)
+    difficulty = random.normal(0, 1.5, ITEMS_COUNT)
+    user_ids = random.integers(1, USERS_COUNT + 1, ANSWERS_COUNT)
+    # сильные пользователи чаще отвечают на трудные элементы (дальше проходят уроки)
+    rank = ((ability[user_ids - 1] + random.normal(0, 1, ANSWERS_COUNT)) / 4 + 0.5) * ITEMS_COUNT
+    element_ids = np.argsort(difficulty)[np.clip(rank.astype(np.int64), 0, ITEMS_COUNT - 1)] + 1
+    probability = 1 / (1 + np.exp(difficulty[element_ids - 1] - ability[user_ids - 1]))
+    correct = (random.random(ANSWERS_COUNT) < probability).astype(np.int64)
+    cursor = session.connection().connection.cursor()
+    cursor.executemany(
+        "INSERT INTO answer_events (user_id, element_type, element_id, chosen, correct, latency, answered_at) "
+        "VALUES (?, 'words', ?, NULL, ?, 1.0, 0)",
+        zip(user_ids.tolist(), element_ids.tolist(), correct.tolist()))
+    cursor.close()
+    return difficulty
+
+
+def python_loop_iteration(user_index, item_index, correct, ability, difficulty):
+    """Одна итерация модели Раша циклом по ответам (для сравнения)"""
+    residual_of_users = [0.0] * len(ability)
+    weight_of_users = [0.0] * len(ability)
+    residual_of_items = [0.0] * len(difficulty)
+    weight_of_items = [0.0] * len(difficulty)
+    for user, item, answer in zip(user_index, item_index, correct):
+        probability = 1 / (1 + exp(difficulty[item] - ability[user]))
+        residual_of_users[user] += answer - probability
+        weight_of_users[user] += probability * (1 - probability)
+        residual_of_items[item] += answer - probability
+        weight_of_items[item] += probability * (1 - probability)
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    random = np.random.default_rng(0)
+    try:
+        db_session.global_init(os.path.join(directory, 'bench.sqlite'), profile='fast_local')
+        with db_session.unit_of_work() as session:
+            true_difficulty = seed_database(session, random)
+            ensure_lesson_index(session)
+
+        with db_session.unit_of_work() as session:
+            start = perf_counter()
+            user_ids, element_ids, correct = load_answers(session.connection(), WORD)
+            print(f'Загрузка {len(correct)} ответов: {perf_counter() - start:.2f} с')
+            for method in (RASCH, ERROR_RATE):
+                start = perf_counter()
+                ids, difficulty, answers = calibrate(session.connection(), WORD, method)
+                spent = perf_counter() - start
+                correlation = np.corrcoef(difficulty, true_difficulty[ids - 1])[0, 1]
+                print(f'{method}: {spent:.2f} с вместе с загрузкой, '
+                      f'корреляция с истинной трудностью {correlation:.3f}')
+
+            users, user_index = np.unique(user_ids, return_inverse=True)
+            items, item_index = np.unique(element_ids, return_inverse=True)
+            ability = np.zeros(len(users)).tolist()
+            difficulty = error_rate_difficulty(item_index, correct, len(items)).tolist()
+            start = perf_counter()
+            python_loop_iteration(user_index[:LOOP_SAMPLE].tolist(), item_index[:LOOP_SAMPLE].tolist(),
+                                  correct[:LOOP_SAMPLE].tolist(), ability, difficulty)
+            spent = (perf_counter() - start) * len(correct) / LOOP_SAMPLE
+            print(f'Одна итерация циклом Python по {len(correct)} ответам: ~{spent:.1f} с')
+
+        with db_session.unit_of_work() as session:
+            calibrate_types(session, [WORD], RASCH, rebuild=True)
+            first_lesson = get_lesson_element_ids(session, WORD, 1, 1)
+            last_lesson = get_lesson_element_ids(session, WORD, ITEMS_COUNT // 15, ITEMS_COUNT // 15)
+        print(f'Средняя истинная трудность первого урока: {true_difficulty[np.array(first_lesson) - 1].mean():.2f}, '
+              f'урока {ITEMS_COUNT // 15}: {true_difficulty[np.array(last_lesson) - 1].mean():.2f}')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Сравнение памяти, занимаемой словами при загрузке через ORM и через каталог.
+Запуск из корня проекта:
+    python -m benchmarks.catalog_memory_benchmark
+"""
+import gc
+import os
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+import sqlalchemy as sa
+import sqlalchemy.orm as orm
+
+from data import all_models  # noqa: F401 регистрация всех моделей
+from data import lessons
+from data.catalog import Catalog
+from data.consts import WORD, Word
+from data.db_session import SqlAlchemyBase
+
+WORDS_COUNT = 100_000
+MEANINGS = ['вода', 'огонь', 'дерево', 'земля', 'металл', 'солнце', 'луна']
+
+
+def seed_words(engine, count):
+    rows = [{'title': f'語{index}', 'reading': f'ご{index % 500}',
+             'meaning': MEANINGS[index % len(MEANINGS)],
+             'path_to_image': None, 'path_to_sound': None}
+            for index in range(count)]
+    with engine.begin() as connection:
+        connection.execute(Word.__table__.insert(), rows)
+
+
+def measure(load):
+    gc.collect()
+    tracemalloc.start()
+    start = perf_counter()
+    result = load()
+    spent = perf_counter() - start
+    gc.collect()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, memory / 1024 / 1024, spent
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = sa.create_engine(f'sqlite:///{os.path.join(directory, "bench.sqlite")}')
+        SqlAlchemyBase.metadata.create_all(engine)
+        seed_words(engine, WORDS_COUNT)
+        factory = orm.sessionmaker(bind=engine)
+        session = factory()
+        lessons.ensure_lesson_index(session)
+        session.close()
+
+        orm_session = factory()
+        words, orm_memory, orm_time = measure(lambda: orm_session.query(Word).all())
+        print(f'ORM:     {len(words)} слов, {orm_memory:7.1f} МБ, {orm_time:5.2f} с')
+        del words
+        orm_session.close()
+
+        catalog_session = factory()
+        catalog = Catalog()
+        _, catalog_memory, catalog_time = measure(lambda: catalog.load(catalog_session))
+        catalog_session.close()
+        words = catalog.get_lessons(WORD, 1)
+        print(f'Каталог: {len(words)} слов, {catalog_memory:7.1f} МБ, {catalog_time:5.2f} с')
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Проверка того, что цикл событий Qt не останавливается во время входа.
+Запуск из корня проекта:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.credentials_responsiveness
+Таймер с интервалом TICK_INTERVAL мс должен срабатывать, пока пароль
+проверяется в фоновом потоке
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+from PyQt5.QtCore import QCoreApplication, QTimer
+
+from data import db_session
+from data.credentials import CredentialService, create_user
+
+TICK_INTERVAL = 5
+LOGIN = 'user'
+PASSWORD = 'password'
+
+
+def main():
+    app = QCoreApplication(sys.argv)
+    directory = tempfile.mkdtemp()
+    db_session.global_init(os.path.join(directory, 'bench.sqlite'))
+    with db_session.unit_of_work() as session:
+        create_user(session, LOGIN, PASSWORD)
+
+    service = CredentialService()
+    ticks = []
+    result = {}
+    timer = QTimer()
+    timer.setInterval(TICK_INTERVAL)
+    timer.timeout.connect(lambda: ticks.append(perf_counter()))
+
+    def finished(user):
+        result['user'] = user
+        result['time'] = perf_counter() - start
+        timer.stop()
+        app.quit()
+
+    service.login_finished.connect(finished)
+    timer.start()
+    start = perf_counter()
+    service.login(LOGIN, PASSWORD)
+    app.exec_()
+
+    gaps = [later - earlier for earlier, later in zip([start] + ticks, ticks)]
+    print(f'Вход: {result["time"] * 1000:.1f} мс, '
+          f'срабатываний таймера: {len(ticks)}, '
+          f'наибольшая пауза цикла событий: {max(gaps, default=0) * 1000:.1f} мс')
+    assert result['user'] is not None, 'пользователь не найден'
+    assert ticks, 'цикл событий был заблокирован на время входа'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Загрузка уроков и сохранение прогресса пользователя при разных
+профилях подключения к SQLite (data/db_profiles.py). Проверка открытия
+базы в режиме WAL профилем kiosk из папки только для чтения: файлы
+-shm и -wal не должны создаваться.
+Запуск из корня проекта:
+    python -m benchmarks.db_profiles_benchmark
+"""
+import os
+import shutil
+import tempfile
+from time import perf_counter
+
+import sqlalchemy as sa
+import sqlalchemy.orm as orm
+
+from data import all_models  # noqa: F401 регистрация всех моделей
+from data.consts import WORD
+from data.db_profiles import DB_PROFILES, KIOSK, is_wal_database
+from data.db_session import SqlAlchemyBase
+from data.lessons import load_lesson_elements, rebuild_lessons
+from data.migrations import migrate
+from data.models.users import User
+from data.models.words import Word
+
+WORDS_COUNT = 20_000
+USERS_COUNT = 100
+REPEATS = 300
+
+
+def seed_database(path):
+    engine = sa.create_engine(f'sqlite:///{path}')
+    SqlAlchemyBase.metadata.create_all(engine)
+    migrate(engine)
+    with engine.begin() as connection:
+        connection.execute(Word.__table__.insert(), [
+            {'title': f'語{index}', 'reading': f'ご{index}', 'meaning': f'значение {index}'}
+            for index in range(WORDS_COUNT)])
+        connection.execute(User.__table__.insert(), [
+            {'login': f'user_{index}', 'password_hash': 'hash'} for index in range(USERS_COUNT)])
+    session = orm.sessionmaker(bind=engine)()
+    rebuild_lessons(session, WORD, range(1, WORDS_COUNT + 1))
+    session.commit()
+    session.close()
+    engine.dispose()
+
+
+def measure(factory, function):
+    start = perf_counter()
+    for index in range(REPEATS):
+        session = factory()
+        function(session, index)
+        session.close()
+    return (perf_counter() - start) / REPEATS * 1000
+
+
+def fetch_lesson(session, index):
+    load_lesson_elements(session, WORD, index + 1, index + 1)
+
+
+def commit_progress(session, index):
+    user = session.query(User).filter(User.login == f'user_{index % USERS_COUNT}').first()
+    user.words_save += 1
+    session.commit()
+
+
+def check_kiosk_wal(source, directory):
+    """База, переведённая в WAL профилем fast_local, открывается профилем kiosk без записи в папку"""
+    directory = os.path.join(directory, 'kiosk_wal')
+    os.makedirs(directory)
+    path = os.path.join(directory, 'wal.sqlite')
+    shutil.copy(source, path)
+    engine = sa.create_engine(f'sqlite:///{path}')
+    with engine.connect() as connection:
+        connection.exec_driver_sql('PRAGMA journal_mode = WAL')
+    engine.dispose()  # журнал -wal переносится в файл базы и удаляется
+    assert is_wal_database(path), 'база не переведена в WAL'
+    os.chmod(directory, 0o555)
+    try:
+        engine = DB_PROFILES[KIOSK].create_engine(path)
+        session = orm.sessionmaker(bind=engine)()
+        elements = load_lesson_elements(session, WORD, 1, 1)
+        session.close()
+        engine.dispose()
+        created = sorted(set(os.listdir(directory)) - {'wal.sqlite'})
+    finally:
+        os.chmod(directory, 0o755)
+    assert elements, 'урок из базы WAL не загружен'
+    assert not created, f'kiosk создал файлы в папке базы: {created}'
+    print(f'kiosk, база WAL в папке только для чтения: урок из {len(elements)} элементов загружен')
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'source.sqlite')
+        seed_database(source)
+        for name, profile in DB_PROFILES.items():
+            path = os.path.join(directory, f'{name}.sqlite')
+            shutil.copy(source, path)
+            engine = profile.create_engine(path)
+            factory = orm.sessionmaker(bind=engine)
+            fetch_time = measure(factory, fetch_lesson)
+            if profile.read_only:
+                commit_text = 'только чтение'
+            else:
+                commit_text = f'{measure(factory, commit_progress):.3f} мс'
+            print(f'{name:>10}: урок {fetch_time:.3f} мс, сохранение прогресса {commit_text}')
+            engine.dispose()
+        check_kiosk_wal(source, directory)
+        engine = sa.create_engine(f'sqlite:///{source}')  # прежнее подключение без настроек
+        factory = orm.sessionmaker(bind=engine)
+        print(f'{"default":>10}: урок {measure(factory, fetch_lesson):.3f} мс, '
+              f'сохранение прогресса {measure(factory, commit_progress):.3f} мс')
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Потоковый импорт JMdict: пиковая память на файлах разного размера
+и продолжение прерванного импорта с контрольной точки.
+Запуск из корня проекта:
+    python -m benchmarks.dictionary_import_benchmark
+Пиковая память не должна расти вместе с размером файла
+"""
+import os
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+import sqlalchemy as sa
+import sqlalchemy.orm as orm
+
+from data import all_models  # noqa: F401 регистрация всех моделей
+from data import dictionary_import
+from data.db_session import SqlAlchemyBase
+from data.dictionary_import import JMDICT, import_dictionary
+from data.models.words import Word
+
+ENTRY_COUNTS = [10_000, 100_000]
+HEADER = '''<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE JMdict [
+<!ELEMENT JMdict (entry*)>
+<!ENTITY n "noun (common) (futsuumeishi)">
+]>
+<JMdict>
+'''
+
+
+def write_jmdict(path, count):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(HEADER)
+        for index in range(count):
+            file.write(f'<entry><ent_seq>{index}</ent_seq>'
+                       f'<k_ele><keb>語{index}</keb></k_ele>'
+                       f'<r_ele><reb>ご{index}</reb></r_ele>'
+                       f'<sense><pos>&n;</pos><gloss>word {index}</gloss>'
+                       f'<gloss xml:lang="rus">слово {index}</gloss></sense></entry>\n')
+        file.write('</JMdict>\n')
+
+
+def create_session(directory, name):
+    engine = sa.create_engine(f'sqlite:///{os.path.join(directory, name)}')
+    SqlAlchemyBase.metadata.create_all(engine)
+    return orm.sessionmaker(bind=engine)()
+
+
+def measure(directory, count):
+    path = os.path.join(directory, f'JMdict_{count}.xml')
+    write_jmdict(path, count)
+    session = create_session(directory, f'{count}.sqlite')
+    tracemalloc.start()
+    start = perf_counter()
+    result = import_dictionary(session, JMDICT, path, 'rus', checkpoint_path=None)
+    spent = perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'{count:>7} записей ({os.path.getsize(path) >> 20} МБ): {result}; '
+          f'{spent:.1f} с, пиковая память {peak / 2 ** 20:.1f} МБ')
+    session.close()
+
+
+def check_resume(directory):
+    count = 5000
+    path = os.path.join(directory, 'JMdict_resume.xml')
+    write_jmdict(path, count)
+    checkpoint_path = os.path.join(directory, 'checkpoint.json')
+    session = create_session(directory, 'resume.sqlite')
+    original_import_batch = dictionary_import.import_batch
+    calls = []
+
+    def failing_import_batch(*args):
+        calls.append(1)
+        if len(calls) == 3:
+            raise OSError('импорт прерван')
+        original_import_batch(*args)
+
+    dictionary_import.import_batch = failing_import_batch
+    try:
+        import_dictionary(session, JMDICT, path, 'rus', checkpoint_path=checkpoint_path)
+    except OSError as error:
+        print(f'{error}, слов в базе: {session.query(Word).count()}')
+    finally:
+        dictionary_import.import_batch = original_import_batch
+    result = import_dictionary(session, JMDICT, path, 'rus', checkpoint_path=checkpoint_path)
+    print(f'После продолжения: {result}; слов в базе: {session.query(Word).count()} из {count}, '
+          f'контрольная точка удалена: {not os.path.exists(checkpoint_path)}')
+    session.close()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for count in ENTRY_COUNTS:
+            measure(directory, count)
+        check_resume(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Время подбора вариантов ответа для теста из 10 000 вопросов.
+Запуск из корня проекта:
+    python -m benchmarks.distractors_benchmark
+"""
+from random import sample, shuffle
+from time import perf_counter
+
+from data.catalog import WordRecord
+from data.distractors import DistractorSampler
+
+QUESTIONS_COUNT = 10_000
+LEGACY_QUESTIONS_COUNT = 1_000
+
+
+def legacy_select_elements_for_question(elements, current_element):
+    """Прежний вариант: копирование всего пула на каждый вопрос"""
+    temporary = set(elements)
+    temporary.discard(current_element)
+    wrong_elements = sample(list(temporary), 3)
+    result = wrong_elements + [current_element]
+    shuffle(result)
+    return result
+
+
+def main():
+    elements = [WordRecord(index, f'語{index}', f'ご{index}', f'значение {index}', None, None)
+                for index in range(QUESTIONS_COUNT)]
+
+    start = perf_counter()
+    sampler = DistractorSampler(elements, seed=0)
+    for index in range(QUESTIONS_COUNT):
+        sampler.question_elements(index)
+    spent = perf_counter() - start
+    print(f'DistractorSampler: {QUESTIONS_COUNT} вопросов за {spent * 1000:.1f} мс, '
+          f'{spent / QUESTIONS_COUNT * 1e6:.2f} мкс на вопрос')
+
+    start = perf_counter()
+    for element in elements[:LEGACY_QUESTIONS_COUNT]:
+        legacy_select_elements_for_question(elements, element)
+    spent = perf_counter() - start
+    print(f'Прежний способ:    {LEGACY_QUESTIONS_COUNT} вопросов за {spent * 1000:.1f} мс, '
+          f'{spent / LEGACY_QUESTIONS_COUNT * 1e6:.2f} мкс на вопрос')
+
+    first = DistractorSampler(elements, seed=42)
+    second = DistractorSampler(elements, seed=42)
+    assert all(first.sample(index) == second.sample(index) for index in range(100))
+
+
+if __name__ == '__main__':
+    main()
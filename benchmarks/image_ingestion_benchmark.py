@@ -0,0 +1,52 @@
+"""
+Время, на которое добавление изображения блокирует поток интерфейса,
+и полное время создания миниатюры для большой фотографии.
+Запуск из корня проекта:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.image_ingestion_benchmark
+Исходный файл не должен измениться, повторное добавление - взять миниатюру из кеша
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+from PIL import Image
+from PyQt5.QtWidgets import QApplication
+
+from data.images import ImageIngestor, file_digest
+
+PHOTO_SIZE = (6000, 4000)
+
+
+def ingest_and_wait(app, ingestor, source):
+    results = []
+    ingestor.thumbnail_ready.connect(lambda *result: results.append(result))
+    start = perf_counter()
+    ingestor.ingest(source)
+    blocked = perf_counter() - start
+    while not results:
+        app.processEvents()
+    ingestor.thumbnail_ready.disconnect()
+    return blocked, perf_counter() - start, results[0][1]
+
+
+def main():
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'photo.jpg')
+        Image.effect_noise(PHOTO_SIZE, 64).convert('RGB').save(source, quality=95)
+        digest = file_digest(source)
+        ingestor = ImageIngestor(directory=os.path.join(directory, 'thumbnails'))
+        for attempt in ('первое', 'повторное'):
+            blocked, total, thumbnail = ingest_and_wait(app, ingestor, source)
+            print(f'{attempt.capitalize()} добавление: интерфейс занят {blocked * 1000:.2f} мс, '
+                  f'миниатюра готова через {total * 1000:.0f} мс ({os.path.basename(thumbnail)})')
+        start = perf_counter()
+        with Image.open(source) as image:
+            image.resize((240, 240), Image.LANCZOS)
+        print(f'Прежний способ (в потоке интерфейса): {(perf_counter() - start) * 1000:.0f} мс')
+        print(f'Исходный файл не изменён: {file_digest(source) == digest}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Скорость массового импорта слов из CSV (100 000 строк) в пустую базу
+и повторного импорта того же файла с обновлением существующих слов.
+Запуск из корня проекта:
+    python -m benchmarks.import_benchmark
+"""
+import csv
+import os
+import tempfile
+from time import perf_counter
+
+import sqlalchemy as sa
+import sqlalchemy.orm as orm
+
+from data import all_models  # noqa: F401 регистрация всех моделей
+from data.consts import WORD
+from data.db_session import SqlAlchemyBase
+from data.importer import SKIP, UPSERT, import_elements
+from data.media import MediaStore
+from data.models.lessons import LessonElement
+from data.models.words import Word
+
+ROWS_COUNT = 100_000
+MEDIA_COUNT = 50  # различных звуковых файлов на весь файл импорта
+
+
+def write_deck(directory):
+    for index in range(MEDIA_COUNT):
+        with open(os.path.join(directory, f'sound_{index}.mp3'), 'wb') as file:
+            file.write(os.urandom(64 * 1024))
+    path = os.path.join(directory, 'deck.csv')
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['title', 'reading', 'meaning', 'path_to_sound'])
+        for index in range(ROWS_COUNT):
+            writer.writerow([f'語{index}', f'ご{index}', f'значение {index}',
+                             f'sound_{index % MEDIA_COUNT}.mp3'])
+    return path
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_deck(directory)
+        engine = sa.create_engine(f'sqlite:///{os.path.join(directory, "bench.sqlite")}')
+        SqlAlchemyBase.metadata.create_all(engine)
+        session = orm.sessionmaker(bind=engine)()
+        store = MediaStore(os.path.join(directory, 'media'))
+        for policy in (SKIP, UPSERT):
+            start = perf_counter()
+            result = import_elements(session, WORD, path, policy, store=store)
+            spent = perf_counter() - start
+            print(f'{policy}: {result}; {spent:.2f} с, {ROWS_COUNT / spent:,.0f} строк/с')
+        print(f'Слов в базе: {session.query(Word).count()}, '
+              f'в уроках: {session.query(LessonElement).count()}')
+        session.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Проверка обновления (upsert) кандзи из файла без части столбцов:
+примеры, звук и картинка, сохранённые раньше, не должны стираться,
+в том числе при ошибке копирования медиафайла.
+Запуск из корня проекта:
+    python -m benchmarks.import_upsert_check
+"""
+import json
+import os
+import tempfile
+
+import sqlalchemy as sa
+import sqlalchemy.orm as orm
+
+from data import all_models  # noqa: F401 регистрация всех моделей
+from data.consts import KANJI
+from data.db_session import SqlAlchemyBase
+from data.importer import SKIP, UPSERT, import_elements
+from data.media import MediaStore
+from data.models.kanji import Kanji
+
+
+def write_deck(path, rows):
+    with open(path, 'w', encoding='utf-8') as file:
+        for row in rows:
+            file.write(json.dumps(row, ensure_ascii=False) + '\n')
+    return path
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ('mizu.mp3', 'mizu.png'):
+            with open(os.path.join(directory, name), 'wb') as file:
+                file.write(os.urandom(1024))
+        engine = sa.create_engine(f'sqlite:///{os.path.join(directory, "check.sqlite")}')
+        SqlAlchemyBase.metadata.create_all(engine)
+        session = orm.sessionmaker(bind=engine)()
+        store = MediaStore(os.path.join(directory, 'media'))
+        full = write_deck(os.path.join(directory, 'full.jsonl'), [
+            {'title': '水', 'onyomi_reading': 'スイ', 'kunyomi_reading': 'みず', 'meaning': 'вода',
+             'examples': '水曜日', 'path_to_sound': 'mizu.mp3', 'path_to_image': 'mizu.png'}])
+        import_elements(session, KANJI, full, SKIP, store=store)
+        before = session.query(Kanji).one()
+        saved = (before.examples, before.path_to_sound, before.path_to_image)
+
+        partial = write_deck(os.path.join(directory, 'partial.jsonl'), [
+            {'title': '水', 'onyomi_reading': 'スイ', 'kunyomi_reading': 'みず', 'meaning': 'вода, жидкость',
+             'path_to_image': 'missing.png'}])  # медиафайла нет: копирование завершится ошибкой
+        result = import_elements(session, KANJI, partial, UPSERT, store=store)
+        session.expire_all()
+        after = session.query(Kanji).one()
+        print(f'Результат обновления: {result}')
+        print(f'Значение обновлено: {after.meaning == "вода, жидкость"}')
+        print(f'Примеры, звук и картинка сохранены: '
+              f'{(after.examples, after.path_to_sound, after.path_to_image) == saved}')
+        session.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
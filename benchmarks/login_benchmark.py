@@ -0,0 +1,65 @@
+"""
+Замер времени входа и регистрации при разном количестве пользователей.
+Запуск из корня проекта:
+    python -m benchmarks.login_benchmark
+Время входа не должно расти вместе с количеством пользователей
+"""
+import os
+import tempfile
+from time import perf_counter
+
+import sqlalchemy as sa
+import sqlalchemy.orm as orm
+from werkzeug.security import generate_password_hash
+
+from data import all_models  # noqa: F401 регистрация всех моделей
+from data.credentials import authenticate, create_user
+from data.db_session import SqlAlchemyBase
+from data.models.users import User
+
+USER_COUNTS = [10_000, 50_000, 100_000]
+REPEATS = 20
+PASSWORD = 'password'
+
+
+def seed_users(engine, count):
+    # один хеш на всех: заполнение базы не должно занимать минуты
+    password_hash = generate_password_hash(PASSWORD)
+    rows = [{'login': f'user_{index}', 'password_hash': password_hash}
+            for index in range(count)]
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), rows)
+
+
+def measure(function, repeats=REPEATS):
+    start = perf_counter()
+    for index in range(repeats):
+        function(index)
+    return (perf_counter() - start) / repeats * 1000
+
+
+def run(count):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = sa.create_engine(f'sqlite:///{os.path.join(directory, "bench.sqlite")}')
+        SqlAlchemyBase.metadata.create_all(engine)
+        seed_users(engine, count)
+        factory = orm.sessionmaker(bind=engine)
+        session = factory()
+
+        def login(index):
+            assert authenticate(session, f'user_{count - 1 - index}', PASSWORD)
+
+        def register(index):
+            assert create_user(session, f'new_user_{index}', PASSWORD)[0]
+
+        login_time = measure(login)
+        register_time = measure(register)
+        session.close()
+        engine.dispose()
+    print(f'{count:>7} пользователей: вход {login_time:8.2f} мс, '
+          f'регистрация {register_time:8.2f} мс')
+
+
+if __name__ == '__main__':
+    for users_count in USER_COUNTS:
+        run(users_count)
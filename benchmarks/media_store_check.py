@@ -0,0 +1,70 @@
+"""
+Проверка хранилища медиафайлов: скорость сохранения, отсутствие копий
+одинаковых файлов и отсутствие повреждённых файлов при прерванном копировании.
+Запуск из корня проекта:
+    python -m benchmarks.media_store_check
+"""
+import os
+import tempfile
+from time import perf_counter
+
+from data import media
+from data.media import MediaStore, file_digest
+
+FILE_SIZE = 64 * 1024 * 1024
+WORDS_COUNT = 20  # одна картинка для нескольких слов
+
+
+class InterruptedSource:
+    """Файл, чтение которого обрывается на середине"""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+
+    def read(self, size):
+        if self.file.tell() > FILE_SIZE // 2:
+            raise OSError('чтение прервано')
+        return self.file.read(size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.file.close()
+
+
+def store_size(directory):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, directories, names in os.walk(directory) for name in names)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'picture.png')
+        with open(source, 'wb') as file:
+            file.write(os.urandom(FILE_SIZE))
+        store = MediaStore(os.path.join(directory, 'media'))
+        start = perf_counter()
+        references = {store.put(source) for word in range(WORDS_COUNT)}
+        spent = perf_counter() - start
+        reference = references.pop()
+        print(f'Сохранено {WORDS_COUNT} раз по {FILE_SIZE >> 20} МБ за {spent:.2f} с, '
+              f'{WORDS_COUNT * FILE_SIZE / spent / 2 ** 20:.0f} МБ/с')
+        print(f'Различных ссылок: {1 + len(references)}, '
+              f'размер хранилища: {store_size(store.directory) >> 20} МБ')
+        print(f'Содержимое совпадает: {file_digest(store.path(reference)) == file_digest(source)}')
+
+        os.remove(store.path(reference))
+        # чтение исходного файла в хранилище обрывается на середине
+        media.open = lambda path, *args: InterruptedSource(path)
+        try:
+            store.put(source)
+        except OSError as error:
+            print(f'Копирование прервано: {error}')
+        finally:
+            del media.open
+        print(f'Файлов в хранилище после сбоя: {sum(len(names) for root, directories, names in os.walk(store.directory))}')
+
+
+if __name__ == '__main__':
+    main()
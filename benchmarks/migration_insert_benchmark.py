@@ -0,0 +1,76 @@
+"""
+Скорость вставки слов, кандзи и пользователей в базу со старым набором
+индексов (индекс на каждом столбце) и после миграций.
+Запуск из корня проекта:
+    python -m benchmarks.migration_insert_benchmark
+"""
+import os
+import tempfile
+from time import perf_counter
+
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from data import all_models  # noqa: F401 регистрация всех моделей
+from data.db_session import SqlAlchemyBase
+from data.migrations import UNUSED_INDEXES, get_version, migrate
+from data.models.kanji import Kanji
+from data.models.users import User
+from data.models.words import Word
+
+ROWS_COUNT = 50_000
+BATCH_SIZE = 1000
+
+
+def create_legacy_database(path):
+    """База со схемой до миграций"""
+    engine = sa.create_engine(f'sqlite:///{path}')
+    SqlAlchemyBase.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text('DROP INDEX ix_word_title_reading'))
+        for name, (table, column) in UNUSED_INDEXES.items():
+            connection.execute(text(f'CREATE INDEX {name} ON {table} ({column})'))
+        connection.execute(text('PRAGMA user_version = 0'))
+    return engine
+
+
+def rows(table, start, count):
+    if table is Word.__table__:
+        return [{'title': f'語{index}', 'reading': f'ご{index}', 'meaning': f'значение {index}',
+                 'path_to_sound': f'{index:064x}.mp3'} for index in range(start, start + count)]
+    if table is Kanji.__table__:
+        return [{'title': f'字{index}', 'onyomi_reading': f'ジ{index}', 'kunyomi_reading': f'じ{index}',
+                 'meaning': f'знак {index}', 'examples': f'例{index}'} for index in range(start, start + count)]
+    return [{'login': f'user_{index}', 'password_hash': f'pbkdf2:sha256:1${index}${index:064x}'}
+            for index in range(start, start + count)]
+
+
+def measure_inserts(engine):
+    results = {}
+    for table in (Word.__table__, Kanji.__table__, User.__table__):
+        start = perf_counter()
+        for batch_start in range(0, ROWS_COUNT, BATCH_SIZE):
+            with engine.begin() as connection:
+                connection.execute(table.insert(), rows(table, batch_start, BATCH_SIZE))
+        results[table.name] = ROWS_COUNT / (perf_counter() - start)
+    return results
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for migrated in (False, True):
+            engine = create_legacy_database(os.path.join(directory, f'{migrated}.sqlite'))
+            if migrated:
+                migrate(engine)
+            with engine.connect() as connection:
+                version = get_version(connection)
+                indexes = connection.execute(text(
+                    "SELECT count(*) FROM sqlite_master WHERE type = 'index'")).scalar()
+            results = measure_inserts(engine)
+            print(f'Версия схемы {version}, индексов {indexes}: ' + ', '.join(
+                f'{table} {speed:,.0f} строк/с' for table, speed in results.items()))
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Время показа изображения карточки при переходе к следующей карточке
+с заранее загруженными изображениями и без них.
+Запуск из корня проекта:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.pixmap_cache_benchmark
+"""
+import os
+import sys
+import tempfile
+from statistics import mean
+from time import perf_counter
+
+from PIL import Image
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtWidgets import QApplication
+
+from data.pixmap_cache import PREFETCH_COUNT, PixmapCache
+
+CARDS_COUNT = 30
+READING_TIME = 0.2  # время чтения карточки пользователем (в секундах)
+
+
+def read_card(app):
+    start = perf_counter()
+    while perf_counter() - start < READING_TIME:
+        app.processEvents()
+
+
+def main():
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for index in range(CARDS_COUNT):
+            path = os.path.join(directory, f'{index}.png')
+            Image.effect_noise((1200, 1200), 64).convert('RGB').save(path)
+            paths.append(path)
+        without_cache = []
+        for path in paths:
+            start = perf_counter()
+            QPixmap(path)
+            without_cache.append(perf_counter() - start)
+        cache = PixmapCache()
+        with_cache = []
+        for lesson in range(2):  # урок проходится дважды
+            for index, path in enumerate(paths):
+                start = perf_counter()
+                cache.get(path)
+                with_cache.append(perf_counter() - start)
+                cache.prefetch(paths[index + 1:index + 1 + PREFETCH_COUNT])
+                read_card(app)
+        print(f'Без кэша: {mean(without_cache) * 1000:.2f} мс на карточку')
+        print(f'С кэшем и загрузкой заранее: {mean(with_cache) * 1000:.3f} мс на карточку')
+        print(f'Кэш: {cache.stats()}')
+
+
+if __name__ == '__main__':
+    main()
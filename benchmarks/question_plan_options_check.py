@@ -0,0 +1,42 @@
+"""
+Проверка вариантов ответа плана теста кандзи: у двух кандзи общее
+онное чтение, и индекс похожести предлагает их друг другу. В каждой
+строке вариантов тексты должны быть разными, а правильный индекс -
+указывать на ответ элемента вопроса.
+Запуск из корня проекта:
+    python -m benchmarks.question_plan_options_check
+"""
+from data.catalog import KanjiRecord
+from data.consts import KANJI
+from data.question_plan import answer_fields_of, build_question_plan
+
+SEEDS_COUNT = 200
+
+
+def make_kanji():
+    rows = [('日', 'ニチ', 'ひ', 'день'), ('二', 'ニ', 'ふた', 'два'), ('尼', 'ニ', 'あま', 'монахиня'),
+            ('月', 'ゲツ', 'つき', 'луна'), ('火', 'カ', 'ひ', 'огонь'), ('水', 'スイ', 'みず', 'вода')]
+    return [KanjiRecord(index + 1, title, onyomi, kunyomi, meaning, None, None, None)
+            for index, (title, onyomi, kunyomi, meaning) in enumerate(rows)]
+
+
+def main():
+    kanji = make_kanji()
+    by_id = {element.id: element for element in kanji}
+    # 二 и 尼 (ニ), 日 и 火 (ひ) - самые похожие друг для друга
+    similar = {2: [3], 3: [2], 1: [5], 5: [1]}
+    fields = answer_fields_of(KANJI)
+    for seed in range(SEEDS_COUNT):
+        plan = build_question_plan(KANJI, kanji, seed=seed,
+                                   confusable=lambda element_id: similar.get(element_id, []))
+        for question in plan:
+            element = by_id[question.element_id]
+            for field, row, correct in zip(fields, question.options, question.correct):
+                assert len(row) == len(set(row)), f'одинаковые варианты {row} (seed {seed})'
+                assert len(row) == 4, f'неполная строка {row} (seed {seed})'
+                assert row[correct] == getattr(element, field), f'неверный индекс ответа (seed {seed})'
+    print(f'Планов проверено: {SEEDS_COUNT}, одинаковых вариантов в строках нет')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Выбор элементов к повторению (data/reviews.py) при 1 000 000 строк
+review_states: запрос по индексу (пользователь, тип, время повторения),
+тот же запрос без этого индекса и полным просмотром таблицы,
+выборка из очереди в памяти.
+Запуск из корня проекта:
+    python -m benchmarks.review_queue_benchmark
+"""
+import os
+import shutil
+import tempfile
+from random import Random
+from time import perf_counter, time
+
+import sqlalchemy as sa
+import sqlalchemy.orm as orm
+
+from data import all_models  # noqa: F401 регистрация всех моделей
+from data.consts import WORD
+from data.db_session import SqlAlchemyBase
+from data.models.reviews import ReviewState
+from data.reviews import REVIEW_LIMIT, SECONDS_IN_DAY, DueQueue, due_element_ids, record_answers
+
+USERS_COUNT = 1000
+ITEMS_COUNT = 1000  # строк на пользователя, всего USERS_COUNT * ITEMS_COUNT
+BATCH_SIZE = 50_000
+REPEATS = 200
+FULL_SCAN_QUERY = sa.text(
+    'SELECT due_at, element_id FROM review_states NOT INDEXED '
+    'WHERE user_id = :user_id AND element_type = :type AND due_at <= :now '
+    'ORDER BY due_at LIMIT :limit')
+
+
+def seed_database(engine, now):
+    random = Random(0)
+    rows = []
+    with engine.begin() as connection:
+        for user_id in range(1, USERS_COUNT + 1):
+            for element_id in range(1, ITEMS_COUNT + 1):
+                rows.append({'user_id': user_id, 'element_type': WORD, 'element_id': element_id,
+                             'ease': 2.5, 'interval': 1, 'repetitions': 1,
+                             'due_at': now + random.uniform(-30, 30) * SECONDS_IN_DAY})
+                if len(rows) == BATCH_SIZE:
+                    connection.execute(ReviewState.__table__.insert(), rows)
+                    rows = []
+        if rows:
+            connection.execute(ReviewState.__table__.insert(), rows)
+
+
+def measure_queries(factory, now, repeats, limit):
+    random = Random(1)
+    session = factory()
+    start = perf_counter()
+    count = 0
+    for _ in range(repeats):
+        count += len(due_element_ids(session, random.randint(1, USERS_COUNT), WORD, now, limit))
+    spent = (perf_counter() - start) / repeats * 1000
+    session.close()
+    return spent, count / repeats
+
+
+def measure_full_scan(engine, now, repeats, limit):
+    random = Random(1)
+    with engine.connect() as connection:
+        start = perf_counter()
+        for _ in range(repeats):
+            connection.execute(FULL_SCAN_QUERY, {'user_id': random.randint(1, USERS_COUNT), 'type': WORD,
+                                                 'now': now, 'limit': limit}).fetchall()
+        return (perf_counter() - start) / repeats * 1000
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        engine = sa.create_engine(f'sqlite:///{os.path.join(directory, "bench.sqlite")}')
+        SqlAlchemyBase.metadata.create_all(engine)
+        factory = orm.sessionmaker(bind=engine)
+        now = time()
+        start = perf_counter()
+        seed_database(engine, now)
+        print(f'Заполнение {USERS_COUNT * ITEMS_COUNT} строк: {perf_counter() - start:.1f} с')
+
+        with engine.connect() as connection:
+            plan = connection.execute(sa.text(
+                'EXPLAIN QUERY PLAN SELECT due_at, element_id FROM review_states '
+                'WHERE user_id = 1 AND element_type = :type AND due_at <= :now '
+                'ORDER BY due_at LIMIT 1000'), {'type': WORD, 'now': now}).fetchall()
+        print('План запроса:', '; '.join(row[-1] for row in plan))
+        for limit in (REVIEW_LIMIT, ITEMS_COUNT):
+            spent, count = measure_queries(factory, now, REPEATS, limit)
+            print(f'С индексом, до {limit} элементов: {spent:.2f} мс на запрос, получено {count:.0f}')
+        spent_full_scan = measure_full_scan(engine, now, 5, REVIEW_LIMIT)
+        print(f'Полный просмотр таблицы, до {REVIEW_LIMIT} элементов: {spent_full_scan:.2f} мс на запрос')
+
+        with engine.begin() as connection:
+            connection.execute(sa.text('DROP INDEX ix_review_states_due'))
+        # остаётся уникальный индекс (пользователь, тип, элемент): все строки пользователя сортируются
+        spent_without_index, _ = measure_queries(factory, now, REPEATS, REVIEW_LIMIT)
+        print(f'Без индекса по времени повторения, до {REVIEW_LIMIT} элементов: '
+              f'{spent_without_index:.2f} мс на запрос')
+
+        session = factory()
+        queue = DueQueue(due_element_ids(session, 1, WORD, now))
+        answers = {element_id: element_id % 3 != 0 for element_id in queue.due(now)}
+        start = perf_counter()
+        for _ in range(REPEATS):
+            queue.due(now)
+        spent_queue = (perf_counter() - start) / REPEATS * 1000
+        scheduled = record_answers(session, 1, WORD, answers, now)
+        session.commit()
+        for element_id, due_at in scheduled:
+            queue.push(element_id, due_at)
+        print(f'Очередь в памяти: {spent_queue:.3f} мс на выборку, '
+              f'после ответа на {len(answers)} элементов к повторению осталось '
+              f'{len(queue.due(now, limit=ITEMS_COUNT))} из {len(queue)}')
+        session.close()
+        engine.dispose()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
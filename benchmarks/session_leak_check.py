@@ -0,0 +1,68 @@
+"""
+Проверка учёта сессий (data/db_session.py): счётчики открытых сессий и
+занятых соединений, откат unit_of_work при ошибке, запрет записи в
+read_only_session и отчёт о незакрытой сессии со стеком её создания.
+Запуск из корня проекта:
+    python -m benchmarks.session_leak_check
+"""
+import gc
+import logging
+import os
+import shutil
+import tempfile
+
+from data import db_session
+from data.models.users import User
+
+LOGIN = 'session_check'
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    messages = []
+    handler = logging.Handler()
+    handler.emit = lambda record: messages.append(record.getMessage())
+    logging.getLogger().addHandler(handler)
+    try:
+        db_session.set_debug(True)
+        db_session.global_init(os.path.join(directory, 'check.sqlite'))
+        print('после запуска:', db_session.statistics())
+
+        with db_session.unit_of_work() as session:
+            session.add(User(login=LOGIN, password_hash='hash'))
+            print('внутри unit_of_work:', db_session.statistics())
+        try:
+            with db_session.unit_of_work() as session:
+                session.add(User(login=f'{LOGIN}_2', password_hash='hash'))
+                session.flush()
+                raise KeyError('ошибка после записи')
+        except KeyError:
+            pass
+        with db_session.read_only_session() as session:
+            users = session.query(User).order_by(User.id).all()
+        print('пользователи после отката:', [user.login for user in users])
+        try:
+            with db_session.read_only_session() as session:
+                session.query(User).first().login = 'changed'
+                session.flush()
+        except RuntimeError as error:
+            print('запись в сессии только для чтения:', error)
+        print('после закрытия всех сессий:', db_session.statistics())
+
+        session = db_session.create_session()
+        session.query(User).first()
+        print('незакрытая сессия:', db_session.statistics())
+        print('отчёт о незакрытых сессиях:', db_session.report_leaks())
+        del session
+        gc.collect()
+        print('после сборки мусора:', db_session.statistics())
+        print('в журнале:', messages[-1].splitlines()[0])
+        print('место создания:', [line for line in messages[-1].splitlines()
+                                  if 'session_leak_check' in line][-1].strip())
+    finally:
+        logging.getLogger().removeHandler(handler)
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
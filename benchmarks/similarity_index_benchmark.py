@@ -0,0 +1,64 @@
+"""
+Построение индекса похожих слов (data/similarity.py) для словарей разного
+размера (до 200 000 слов, как после импорта JMdict), добавление одного
+слова и доля вариантов ответа урока из 15 слов, подобранных по похожести.
+Запуск из корня проекта:
+    python -m benchmarks.similarity_index_benchmark
+"""
+from random import Random
+from time import perf_counter
+
+from data.catalog import WordRecord
+from data.consts import COUNT_OF_LEARNING, WORD
+from data.distractors import COUNT_OF_DISTRACTORS, DistractorSampler
+from data.similarity import TypeIndex, similarity_index
+
+SIZES = [2000, 8000, 50_000, 200_000]
+KANA = 'あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわんがぎぐげご'
+KANJI = [chr(code) for code in range(0x4E00, 0x4E00 + 2000)]
+MEANING_WORDS = [f'слово{index}' for index in range(20_000)]
+
+
+def make_words(count, random):
+    return [WordRecord(index + 1,
+                       ''.join(random.choice(KANJI) for _ in range(random.randint(1, 3))),
+                       ''.join(random.choice(KANA) for _ in range(random.randint(2, 8))),
+                       ' '.join(random.choice(MEANING_WORDS) for _ in range(random.randint(1, 3))),
+                       None, None)
+            for index in range(count)]
+
+
+def similar_share(elements, confusable):
+    """Доля вариантов ответа, взятых из похожих элементов пула"""
+    sampler = DistractorSampler(elements, seed=0, confusable=confusable)
+    similar = 0
+    for index, element in enumerate(elements):
+        candidates = {sampler.index_by_id.get(element_id) for element_id in confusable(element.id)}
+        similar += sum(chosen in candidates for chosen in sampler.sample(index))
+    return similar / (len(elements) * COUNT_OF_DISTRACTORS)
+
+
+def main():
+    random = Random(0)
+    for size in SIZES:
+        words = make_words(size, random)
+        start = perf_counter()
+        index = TypeIndex(WORD, words)
+        spent = perf_counter() - start
+        new_word = make_words(1, random)[0]
+        new_word = WordRecord(size + 1, *(getattr(new_word, name) for name in WordRecord.__slots__[1:]))
+        start = perf_counter()
+        index.add(new_word)
+        added = perf_counter() - start
+        print(f'{size} слов: построение {spent:.1f} с, добавление слова {added * 1000:.1f} мс')
+
+    lesson = words[:COUNT_OF_LEARNING]
+    similarity_index.indexes[WORD] = index
+    by_index = similar_share(lesson, lambda element_id: index.confusable(element_id, 10))
+    by_pool = similar_share(lesson, similarity_index.pool_confusable(WORD, lesson))
+    print(f'Вариантов ответа урока по похожести: из индекса словаря {by_index:.0%}, '
+          f'попарно в пуле {by_pool:.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Скорость экспорта и импорта снимка базы данных с 1 000 000 слов
+и пиковая память, выделенная при экспорте (замеряется отдельным
+прогоном: tracemalloc замедляет работу в несколько раз).
+Запуск из корня проекта:
+    python -m benchmarks.snapshot_benchmark
+"""
+import os
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+import sqlalchemy as sa
+import sqlalchemy.orm as orm
+
+from data import all_models  # noqa: F401 регистрация всех моделей
+from data.db_session import SqlAlchemyBase
+from data.models.words import Word
+from data.snapshot import export_snapshot, import_snapshot
+
+WORDS_COUNT = 1_000_000
+SEED_BATCH = 50_000
+
+
+def measure(function):
+    start = perf_counter()
+    result = function()
+    return result, perf_counter() - start
+
+
+def peak_memory(function):
+    """Пиковая память (в МБ), выделенная при вызове function"""
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return peak
+
+
+def create_session(path):
+    engine = sa.create_engine(f'sqlite:///{path}')
+    SqlAlchemyBase.metadata.create_all(engine)
+    return engine, orm.sessionmaker(bind=engine)()
+
+
+def seed_words(engine):
+    with engine.begin() as connection:
+        for start in range(0, WORDS_COUNT, SEED_BATCH):
+            connection.execute(Word.__table__.insert(), [
+                {'title': f'語{index}', 'reading': f'ご{index}', 'meaning': f'значение {index}'}
+                for index in range(start, start + SEED_BATCH)])
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        engine, session = create_session(os.path.join(directory, 'source.sqlite'))
+        seed_words(engine)
+        snapshot_path = os.path.join(directory, 'deck.snapshot.gz')
+        counts, spent = measure(lambda: export_snapshot(session, snapshot_path))
+        print(f'Экспорт: {counts["word"]} слов за {spent:.1f} с, {counts["word"] / spent:,.0f} строк/с, '
+              f'файл {os.path.getsize(snapshot_path) >> 20} МБ')
+        print(f'Пиковая память экспорта: {peak_memory(lambda: export_snapshot(session, snapshot_path)):.1f} МБ')
+        session.close()
+
+        engine, session = create_session(os.path.join(directory, 'target.sqlite'))
+        counts, spent = measure(lambda: import_snapshot(session, snapshot_path))
+        print(f'Импорт: {counts["word"]} слов за {spent:.1f} с, {counts["word"] / spent:,.0f} строк/с')
+        print(f'Слов в новой базе: {session.query(Word).count()}')
+        session.close()
+
+
+if __name__ == '__main__':
+    main()
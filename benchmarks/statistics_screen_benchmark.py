@@ -0,0 +1,99 @@
+"""
+Обновление экрана статистики при разной длине истории ответов.
+Экран читает только итоги (category_statistics, item_statistics),
+поэтому время обновления не должно зависеть от количества ответов.
+Также измеряется запись пачки ответов вместе с итогами.
+Запуск из корня проекта:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.statistics_screen_benchmark
+"""
+import os
+import shutil
+import sys
+import tempfile
+from random import Random
+from time import perf_counter
+
+from PyQt5.QtWidgets import QApplication, QListWidget, QTableWidget
+
+from data import db_session
+from data.answer_log import AnswerLog
+from data.answer_statistics import rebuild_statistics
+from data.consts import WORD
+from data.models.answers import AnswerEvent
+from data.models.users import User
+from data.models.words import Word
+
+WORDS_COUNT = 1000
+HISTORY_SIZES = [10_000, 100_000, 1_000_000]
+INSERT_BATCH_SIZE = 50_000
+REFRESHES = 50
+LOGGED_ANSWERS = 10_000
+
+
+def add_history(count, random):
+    with db_session.unit_of_work() as session:
+        rows = []
+        for index in range(count):
+            element_id = random.randint(1, WORDS_COUNT)
+            rows.append({'user_id': 1, 'element_type': WORD, 'element_id': element_id,
+                         'chosen': 'вариант', 'correct': random.random() > element_id / WORDS_COUNT / 2,
+                         'latency': random.uniform(0.5, 4), 'answered_at': index})
+            if len(rows) == INSERT_BATCH_SIZE:
+                session.execute(AnswerEvent.__table__.insert(), rows)
+                rows = []
+        if rows:
+            session.execute(AnswerEvent.__table__.insert(), rows)
+
+
+def main():
+    app = QApplication(sys.argv)
+    directory = tempfile.mkdtemp()
+    try:
+        db_session.global_init(os.path.join(directory, 'bench.sqlite'))
+        with db_session.unit_of_work() as session:
+            session.execute(Word.__table__.insert(), [
+                {'title': f'語{index}', 'reading': f'ご{index}', 'meaning': f'значение {index}'}
+                for index in range(WORDS_COUNT)])
+            user = User(login='statistics', password_hash='hash')
+            session.add(user)
+
+        from data.Nihongo import STATISTICS, ProgramLearnJapaneseLanguage
+        window = ProgramLearnJapaneseLanguage()
+        window.current_user = user
+        random = Random(0)
+        history = 0
+        for size in HISTORY_SIZES:
+            add_history(size - history, random)
+            history = size
+            start = perf_counter()
+            with db_session.unit_of_work() as session:
+                rebuild_statistics(session.connection())
+            rebuilt = perf_counter() - start
+            start = perf_counter()
+            for _ in range(REFRESHES):
+                window.screens.show_screen(STATISTICS)
+                app.processEvents()
+            refresh = (perf_counter() - start) / REFRESHES * 1000
+            print(f'Ответов в истории: {size}: обновление экрана {refresh:.2f} мс, '
+                  f'пересчёт итогов по всей истории {rebuilt:.1f} с')
+
+        log = AnswerLog()
+        start = perf_counter()
+        for index in range(LOGGED_ANSWERS):
+            log.record(1, WORD, random.randint(1, WORDS_COUNT), 'вариант', index % 4 != 0, 1.0)
+        log.flush(wait=True)
+        spent = perf_counter() - start
+        log.stop()
+        print(f'Запись {LOGGED_ANSWERS} ответов с итогами: {spent:.2f} с, '
+              f'{spent / LOGGED_ANSWERS * 1_000_000:.0f} мкс на ответ в фоновом потоке')
+        screen = window.screens.show_screen(STATISTICS)
+        table = screen.findChild(QTableWidget)
+        row = [table.item(3, column).text() for column in range(table.columnCount())]
+        print('Строка раздела "Слова":', ', '.join(row))
+        print('Трудные элементы:', [screen.findChild(QListWidget).item(index).text() for index in range(2)])
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
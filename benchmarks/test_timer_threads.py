@@ -0,0 +1,76 @@
+"""
+Проверка таймера теста: 1000 повторов теста не должны создавать потоки
+и новые виджеты, таймер должен истекать вовремя, а истёкшее время
+на вопрос - пропускать ровно один вопрос.
+Запуск из корня проекта:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.test_timer_threads
+"""
+import sys
+import threading
+from time import monotonic
+
+from PyQt5.QtWidgets import QApplication, QMainWindow
+
+from data.catalog import HiraganaRecord
+from data.consts import HIRAGANA
+from data.test import Test
+
+RESETS_COUNT = 1000
+ELEMENTS_COUNT = 20
+QUESTION_DURATION = 0.5  # время на вопрос для проверки (в секундах)
+
+
+def wait_for_plan(app, test):
+    while not test.plan:
+        app.processEvents()
+
+
+def wait(app, seconds):
+    deadline = monotonic() + seconds
+    while monotonic() < deadline:
+        app.processEvents()
+
+
+def main():
+    app = QApplication(sys.argv)
+    parent = QMainWindow()
+    elements = [HiraganaRecord(index, f'か{index}', f'ka{index}', None, None)
+                for index in range(ELEMENTS_COUNT)]
+    test = Test(HIRAGANA, elements, False, None, parent, seed=0)
+    wait_for_plan(app, test)
+    # поток построения планов создаётся один раз и не учитывается
+    threads_before = threading.active_count()
+    children_before = len(test.children())
+    for index in range(RESETS_COUNT):
+        test.stop_test()
+        test.reset()
+        wait_for_plan(app, test)
+    threads_after, children_after = threading.active_count(), len(test.children())
+    print(f'Повторов теста: {RESETS_COUNT}')
+    print(f'Потоков: {threads_before} -> {threads_after}')
+    print(f'Дочерних объектов окна теста: {children_before} -> {children_after}')
+    assert threads_after == threads_before, 'повторы теста создали потоки'
+    assert children_after == children_before, 'повторы теста создали виджеты'
+
+    test.all_time = 1
+    start = monotonic()
+    test.stop_test()
+    test.reset()
+    while test.result_label.isHidden():
+        app.processEvents()
+    elapsed = monotonic() - start
+    print(f'Таймер на 1 с истёк через {elapsed:.3f} с: {test.result_label.text()}')
+    assert test.result_label.text() == 'Ваше время истекло' and elapsed < 1.5, 'таймер истёк не вовремя'
+
+    test.all_time = 60
+    test.timer.question_duration = QUESTION_DURATION
+    test.reset()
+    wait_for_plan(app, test)
+    wait(app, QUESTION_DURATION * 1.5)
+    print(f'Через {QUESTION_DURATION * 1.5} с при {QUESTION_DURATION} с на вопрос '
+          f'открыт вопрос {test.question_index + 1} (ожидается 2)')
+    assert test.question_index + 1 == 2, 'истёкшее время на вопрос пропустило не один вопрос'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Время показа одного вопроса теста на прогоне из 1000 вопросов.
+Запуск из корня проекта:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.test_view_benchmark
+Время на вопрос не должно расти к концу теста
+"""
+import sys
+from statistics import mean
+from time import perf_counter
+
+from PyQt5.QtWidgets import QApplication, QMainWindow
+
+from data.catalog import WordRecord
+from data.consts import WORD
+from data.question_plan import build_question_plan
+from data.test import Test
+
+QUESTIONS_COUNT = 1000
+WINDOW = 100
+
+
+def main():
+    app = QApplication(sys.argv)
+    parent = QMainWindow()
+    elements = [WordRecord(index, f'語{index}', f'ご{index}', f'значение {index}', None, None)
+                for index in range(QUESTIONS_COUNT)]
+    plan = build_question_plan(WORD, elements, seed=0)
+    test = Test(WORD, elements, False, None, parent, plan=plan)
+    times = []
+    for index in range(QUESTIONS_COUNT - 1):
+        start = perf_counter()
+        test.buttons[index % 4].click()
+        test.continue_test()
+        app.processEvents()
+        times.append(perf_counter() - start)
+    test.stop_test(prematurely=True)
+    print(f'Вопросов: {len(times)}, среднее время: {mean(times) * 1000:.3f} мс')
+    print(f'Первые {WINDOW}: {mean(times[:WINDOW]) * 1000:.3f} мс, '
+          f'последние {WINDOW}: {mean(times[-WINDOW:]) * 1000:.3f} мс')
+    print(f'Дочерних объектов окна теста: {len(test.children())}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,127 +1,181 @@
 import logging
-import os
-from shutil import copy2
-import winsound
 
-from PIL import Image
 from PyQt5 import QtCore
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtWidgets import *
-from werkzeug.security import check_password_hash
 
 import data.register
 import data.test
-from data import db_session
+from data import db_session, lessons
+from data.answer_log import get_answer_log
+from data.answer_statistics import category_summary, weakest_items
+from data.audio import AudioPlayer
+from data.catalog import catalog
 from data.consts import *
+from data.credentials import CredentialService
+from data.images import ImageIngestor
+from data.lesson_cache import lesson_cache
+from data.media import media_store
 from data.models.users import User
+from data.pixmap_cache import PREFETCH_COUNT, PixmapCache
+from data.question_plan import load_saved_test, remove_saved_plan
+from data.reviews import review_queues
+from data.screens import ScreenManager
+from data.similarity import similarity_index
 from data.style import *
 
+MAIN_MENU = 'main_menu'
+HELP = 'help'
+LEARN_TYPES = 'learn_types'
+CHECK_TYPES = 'check_types'
+LEARN_MENU = 'learn_menu'
+CHECK_MENU = 'check_menu'
+VIEW_LEARNED = 'view_learned'
+SETUP_MENU = 'setup_menu'
+ADD_KANJI = 'add_kanji'
+ADD_WORD = 'add_word'
+KANA_CARD = 'kana_card'
+KANJI_CARD = 'kanji_card'
+WORD_CARD = 'word_card'
+LESSON_END = 'lesson_end'
+STATISTICS = 'statistics'
+CATEGORY_NAMES = {HIRAGANA: 'Хирагана', KATAKANA: 'Катакана', KANJI: 'Кандзи', WORD: 'Слова'}
+
 
 class ProgramLearnJapaneseLanguage(QMainWindow):
     def __init__(self):
         super().__init__()
         db_session.global_init(f'db/{DB_FILE_NAME}')
+        with db_session.unit_of_work() as session:
+            if not db_session.is_read_only():
+                lessons.ensure_lesson_index(session)
+            catalog.load(session)
+        similarity_index.build_in_background()  # тесты не ждут построения индекса
         self.temporary_files = {'sound': None, 'image': None}
         self.current_user = None
-        self.path = os.getcwd()  # Путь к текущей папке программы
-        self.ui_list = []
+        self.credentials = CredentialService(self)
+        self.credentials.login_finished.connect(self.set_current_user)
+        self.images = ImageIngestor(self)
+        self.images.thumbnail_ready.connect(self.on_thumbnail_ready)
+        self.image_label = None  # поле формы, ожидающее миниатюру
+        self.pixmaps = PixmapCache(self)
+        self.audio = AudioPlayer()
+        self.temporary_elements_for_learn = []
+        self.learn_position = 0  # индекс следующей карточки урока
+        self.learn_lesson_type = CONTINUE
+        self.forms = {}  # поля ввода экранов добавления: {KANJI: {...}, WORD: {...}}
+        self.cards = {}  # виджеты карточек обучения: {HIRAGANA: {...}, ...}
+        self.current_card_element = None
         self.setupUi()
         self.login_menu()
-        self.set_style_and_show_all()
 
     def setupUi(self):
         self.resize(700, 450)
         self.setWindowTitle("Программа для помощи в изучении японского языка")
-        self.centralwidget = QWidget(self)
-        self.setCentralWidget(self.centralwidget)
-        start_learn_button = QPushButton("Обучение", self)
-        start_learn_button.setGeometry(25, 58, 650, 40)
+        self.screens = ScreenManager(self)
+        self.setCentralWidget(self.screens)
+        self.screens.register(MAIN_MENU, self.create_main_menu_screen)
+        self.screens.register(HELP, self.create_help_screen)
+        self.screens.register(LEARN_TYPES, lambda screen: self.create_types_screen(screen, self.learn_menu))
+        self.screens.register(CHECK_TYPES, lambda screen: self.create_types_screen(screen, self.menu_of_checking))
+        self.screens.register(LEARN_MENU, self.create_learn_menu_screen)
+        self.screens.register(CHECK_MENU, self.create_check_menu_screen)
+        self.screens.register(VIEW_LEARNED, self.create_view_learned_screen)
+        self.screens.register(SETUP_MENU, self.create_setup_menu_screen)
+        self.screens.register(ADD_KANJI, self.create_add_kanji_screen)
+        self.screens.register(ADD_WORD, self.create_add_word_screen)
+        self.screens.register(KANA_CARD, self.create_kana_card_screen)
+        self.screens.register(KANJI_CARD, self.create_kanji_card_screen)
+        self.screens.register(WORD_CARD, self.create_word_card_screen)
+        self.screens.register(LESSON_END, self.create_lesson_end_screen)
+        self.screens.register(STATISTICS, self.create_statistics_screen)
+        self.screens.show_screen(MAIN_MENU)
+
+    def create_main_menu_screen(self, screen):
+        start_learn_button = QPushButton("Обучение", screen)
+        start_learn_button.setGeometry(25, 40, 650, 40)
         start_learn_button.setFont(FONT_14)
         start_learn_button.clicked.connect(self.start_learn)
-        start_checking_button = QPushButton("Тест", self)
-        start_checking_button.setGeometry(25, 156, 650, 40)
+        start_checking_button = QPushButton("Тест", screen)
+        start_checking_button.setGeometry(25, 120, 650, 40)
         start_checking_button.setFont(FONT_14)
         start_checking_button.clicked.connect(self.checking)
-        setup_button = QPushButton("Настройка", self)
-        setup_button.setGeometry(25, 254, 650, 40)
+        statistics_button = QPushButton("Статистика", screen)
+        statistics_button.setGeometry(25, 200, 650, 40)
+        statistics_button.setFont(FONT_14)
+        statistics_button.clicked.connect(self.open_statistics)
+        setup_button = QPushButton("Настройка", screen)
+        setup_button.setGeometry(25, 280, 650, 40)
         setup_button.setFont(FONT_14)
         setup_button.clicked.connect(self.open_setup_menu)
-        answer_button = QPushButton("Справка", self)
-        answer_button.setGeometry(25, 352, 650, 40)
+        setup_button.setEnabled(not db_session.is_read_only())  # добавление слов и кандзи
+        answer_button = QPushButton("Справка", screen)
+        answer_button.setGeometry(25, 360, 650, 40)
         answer_button.setFont(FONT_14)
         answer_button.clicked.connect(self.answer_of_users_questions)
-        self.ui_list.extend(
-            [start_checking_button, start_learn_button, answer_button, setup_button]
-        )
 
     def get_lesson_elements_by_type(self, elements_type, lesson_type=CONTINUE, lesson_number=1):
         """
         Данная функция принимает в качестве аргументов: тип элемента и
         продолжение обучения
         Если тип обучения не был указан, то будет выбран 1 урок.
-        Функция возвращат список объектов модели указанного элемента
+        Функция возвращат список записей каталога указанного элемента
         Например:
         result = get_lesson_elements_by_type(HIRAGANA, CONTINUE)
-        result == [Hiragana, Hiragana ...Hiragana]
-        result[0] == Hiragana(id=1, title='あ', reading='А')
-        result[7] == Hiragana(id=7, title='ま', reading='Ма')
+        result == [HiraganaRecord, HiraganaRecord ...HiraganaRecord]
+        result[0] == HiraganaRecord(id=1, title='あ', reading='А')
+        result[7] == HiraganaRecord(id=7, title='ま', reading='Ма')
         """
 
+        if lesson_type == REVIEW:  # очередь повторения не кэшируется, она меняется после теста
+            return self.get_review_elements(elements_type)
         # получение номера последнего урока, 1-й урок по умолчанию
         last_lesson = getattr(self.current_user, f'{elements_type}_save', 1)
         if lesson_type == CONTINUE:  # продолжить с последнего
-            start_id = COUNT_OF_LEARNING * (last_lesson - 1) + 1
+            first_lesson, end_lesson = last_lesson, last_lesson
         elif lesson_type == NUMERABLE:  # выбранный урок
-            start_id = COUNT_OF_LEARNING * (lesson_number - 1) + 1
-        else:  # все уроки, с самого начала
-            start_id = 1
-        if lesson_type == CONTINUE:  # текущий конец
-            end_id = COUNT_OF_LEARNING * last_lesson
-        elif lesson_type == NUMERABLE:  # конец в выбранном уроке
-            end_id = COUNT_OF_LEARNING * lesson_number
-        else:  # lesson_type == HARD  все уроки
-            end_id = float('inf')
-        class_of_element = CLASSES_BY_TYPES_OF_ELEMENTS.get(elements_type, None)
-        if not class_of_element:
+            first_lesson, end_lesson = lesson_number, lesson_number
+        else:  # lesson_type == HARD  все уроки, с самого начала
+            first_lesson, end_lesson = 1, None
+        if elements_type not in CLASSES_BY_TYPES_OF_ELEMENTS:
             return logging.error('Type of element not found in classes list')
-        session = db_session.create_session()
-        elements = session.query(class_of_element).filter(
-            class_of_element.id >= start_id, class_of_element.id <= end_id).all()
-        if not isinstance(elements, list):
-            elements = [elements]  # type(elements) == 'list'
+        cache_key = (elements_type, lesson_type, lesson_number, last_lesson)
+        elements = lesson_cache.get(cache_key)
+        if elements is not None:
+            return elements
+        elements = catalog.get_lessons(elements_type, first_lesson, end_lesson)
+        lesson_cache.put(cache_key, elements)
         return elements
 
-    def create_small_main_menu_button(self):
-        return_button = QPushButton('Меню', self)
+    def get_review_elements(self, element_type):
+        """Записи каталога, время повторения которых наступило (без пользователя - пусто)"""
+        if not self.current_user:
+            return []
+        with db_session.read_only_session() as session:
+            queue = review_queues.get(session, self.current_user.id, element_type)
+        elements = (catalog.get(element_type, element_id) for element_id in queue.due())
+        return [element for element in elements if element]
+
+    def update_review_button(self, review_button, element_type):
+        count = len(self.get_review_elements(element_type))
+        review_button.setText(f'Повторить элементы к повторению ({count})')
+        review_button.setEnabled(count > 0)
+
+    def create_small_main_menu_button(self, screen):
+        return_button = QPushButton('Меню', screen)
         return_button.setGeometry(660, 0, 40, 40)
         return_button.clicked.connect(self.return_to_start_menu)
-        self.ui_list.append(return_button)
 
     def return_to_start_menu(self):
-        self.disable_ui()
-        self.setupUi()
-        self.set_style_and_show_all()
-
-    def disable_ui(self):
-        for ui_item in self.ui_list:
-            ui_item.setParent(None)
-            del ui_item
-
-    def set_style_and_show_all(self):
-        for ui_object in self.children():
-            if hasattr(ui_object, 'setStyleSheet'):
-                if isinstance(ui_object, QPushButton):
-                    set_color(ui_object, MAIN_COLORS['main_button'])
-                else:
-                    set_color(ui_object, MAIN_COLORS['menu'])
-            if hasattr(ui_object, 'show'):
-                ui_object.show()
+        self.screens.show_screen(MAIN_MENU)
 
     def answer_of_users_questions(self):
-        self.disable_ui()
-        self.create_small_main_menu_button()
-        answer_label = QLabel(self)
+        self.screens.show_screen(HELP)
+
+    def create_help_screen(self, screen):
+        self.create_small_main_menu_button(screen)
+        answer_label = QLabel(screen)
         answer_label.setAlignment(Qt.AlignTop)
         answer_label.setGeometry(25, 25, 630, 430)
         # добавить пункт о регистрации!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -153,8 +207,58 @@ class ProgramLearnJapaneseLanguage(QMainWindow):
         font = QFont()
         font.setPointSize(11)
         answer_label.setFont(font)
-        self.ui_list.extend([answer_label])
-        self.set_style_and_show_all()
+
+    def open_statistics(self):
+        self.screens.show_screen(STATISTICS)
+
+    def create_statistics_screen(self, screen):
+        self.create_small_main_menu_button(screen)
+        info_label = QLabel(screen)
+        info_label.setGeometry(25, 5, 620, 30)
+        info_label.setFont(FONT_14)
+        table = QTableWidget(len(CATEGORY_NAMES), 5, screen)
+        table.setGeometry(25, 40, 650, 180)
+        table.setHorizontalHeaderLabels(['Ответов', 'Точность', 'Время ответа', 'Серия', 'Лучшая серия'])
+        table.setVerticalHeaderLabels(list(CATEGORY_NAMES.values()))
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        weakest_label = QLabel('Самые трудные элементы', screen)
+        weakest_label.setGeometry(25, 225, 650, 30)
+        weakest_label.setFont(FONT_14)
+        weakest_list = QListWidget(screen)
+        weakest_list.setGeometry(25, 255, 650, 185)
+        return lambda: self.update_statistics(info_label, table, weakest_list)
+
+    def update_statistics(self, info_label, table, weakest_list):
+        """Экран читает только итоги: по строке на раздел и WEAKEST_COUNT элементов"""
+        table.clearContents()
+        weakest_list.clear()
+        if not self.current_user:
+            info_label.setText('Статистика доступна после входа')
+            return
+        get_answer_log().flush(wait=True)  # ответы последнего теста
+        with db_session.read_only_session() as session:
+            categories = category_summary(session, self.current_user.id)
+            weakest = {element_type: weakest_items(session, self.current_user.id, element_type)
+                       for element_type in CATEGORY_NAMES}
+        info_label.setText(f'Пользователь: {self.current_user.login}')
+        for row, element_type in enumerate(CATEGORY_NAMES):
+            category = categories.get(element_type)
+            if not category or not category.answers:
+                continue
+            values = [category.answers,
+                      f'{category.correct / category.answers:.0%}',
+                      f'{category.latency_sum / category.answers:.1f} с',
+                      category.streak,
+                      category.best_streak]
+            for column, value in enumerate(values):
+                table.setItem(row, column, QTableWidgetItem(str(value)))
+        for element_type, items in weakest.items():
+            for item in items:
+                element = catalog.get(element_type, item.element_id)
+                if element:
+                    weakest_list.addItem(f'{CATEGORY_NAMES[element_type]}: {element.title} - '
+                                         f'ошибок {item.answers - item.correct} из {item.answers}')
 
     def login_menu(self):
         self.hide()
@@ -163,145 +267,140 @@ class ProgramLearnJapaneseLanguage(QMainWindow):
         self.show()
 
     def checking(self):
-        self.disable_ui()
-        self.create_small_main_menu_button()
-        self.create_main_types_of_learning_button_with_function(self.menu_of_checking)
-        self.set_style_and_show_all()
+        self.screens.show_screen(CHECK_TYPES)
 
     def menu_of_checking(self, type_of_checking):
-        self.disable_ui()
-        self.create_small_main_menu_button()
-        continue_test_button = QPushButton('Пройти тест по последнему уроку', self)
-        continue_test_button.setGeometry(100, 40, 500, 50)
+        self.screens.show_screen(CHECK_MENU, type_of_checking)
+
+    def create_check_menu_screen(self, screen, type_of_checking):
+        self.create_small_main_menu_button(screen)
+        continue_test_button = QPushButton('Пройти тест по последнему уроку', screen)
+        continue_test_button.setGeometry(100, 30, 500, 50)
         continue_test_button.clicked.connect(
             lambda: self.start_test_by_type(type_of_checking, CONTINUE)
         )
-        number_of_lesson_obj = QSpinBox(self)
-        number_of_lesson_obj.setGeometry(610, 140, 30, 50)
+        number_of_lesson_obj = QSpinBox(screen)
+        number_of_lesson_obj.setGeometry(610, 110, 30, 50)
         number_of_lesson_obj.setMinimum(1)
-        maximum = getattr(self.current_user, f'{type_of_checking}_save', 1)
-        number_of_lesson_obj.setMaximum(maximum)
 
-        past_test_button = QPushButton('Пройти тест по предыдущим урокам', self)
-        past_test_button.setGeometry(100, 140, 500, 50)
+        past_test_button = QPushButton('Пройти тест по предыдущим урокам', screen)
+        past_test_button.setGeometry(100, 110, 500, 50)
         past_test_button.clicked.connect(
-            lambda: self.start_test_by_type(type_of_checking, number_of_lesson_obj.value(), NUMERABLE)
+            lambda: self.start_test_by_type(type_of_checking, NUMERABLE, number_of_lesson_obj.value())
         )
-        hard_test_button = QPushButton('Начать тест по всему изученному в данном разделе', self)
-        hard_test_button.setGeometry(100, 240, 500, 50)
+        hard_test_button = QPushButton('Начать тест по всему изученному в данном разделе', screen)
+        hard_test_button.setGeometry(100, 190, 500, 50)
         hard_test_button.clicked.connect(
             lambda: self.start_test_by_type(type_of_checking, HARD))
-        view_learned_words = QPushButton('Посмотреть изученное', self)
-        view_learned_words.setGeometry(100, 340, 500, 50)
-        ui = [continue_test_button, past_test_button, hard_test_button,
-              number_of_lesson_obj, view_learned_words]
+        review_test_button = QPushButton(screen)
+        review_test_button.setGeometry(100, 270, 500, 50)
+        review_test_button.clicked.connect(
+            lambda: self.start_test_by_type(type_of_checking, REVIEW))
+        view_learned_words = QPushButton('Посмотреть изученное', screen)
+        view_learned_words.setGeometry(100, 350, 500, 50)
         view_learned_words.clicked.connect(
             lambda: self.view_learned(type_of_checking))
-        self.ui_list.extend(ui)
-        self.set_style_and_show_all()
+
+        def refresh():
+            self.update_lesson_maximum(number_of_lesson_obj, type_of_checking)
+            self.update_review_button(review_test_button, type_of_checking)
+        return refresh
+
+    def update_lesson_maximum(self, number_of_lesson_obj, element_type):
+        maximum = getattr(self.current_user, f'{element_type}_save', 1)
+        number_of_lesson_obj.setMaximum(maximum)
 
     def start_test_by_type(self, checking_type, lesson_type, lesson_number=1):
         """Метод передаёт необходимые параметры в процесс тестирования
         (возможно этот метод не нужен)"""
-        if self.current_user and (checking_type == HARD or checking_type == CONTINUE):
+        if self.current_user and (lesson_type == HARD or lesson_type == CONTINUE):
             is_upgrading_test = True
         else:
             is_upgrading_test = False
         test_elements = self.get_lesson_elements_by_type(checking_type, lesson_type, lesson_number)
         self.test_of_learned_elements(checking_type, test_elements, is_upgrading_test)
 
-    def save_images_or_sounds(self, writing, way, type_symb, file_type):
-        """
-        Данная функция сохраняет файл по указанном пути
-        return save_images_or_sounds('学校', 'C:\\images\\image_1.png', KANJI, IMAGE)
-        == 'C:\\Programs\\Nihongo\\images_and_sounds\\Kanji\\学校\\image.png'
-        Путь для использования данной программой, исходный файл сохраняется
-        """
-        if not os.path.isdir(f'{self.path}\\images_and_sounds\\{type_symb}\\{writing}'):
-            os.makedirs(f'{self.path}\\images_and_sounds\\{type_symb}\\{writing}')
-        file_format = way.split('\\')[-1].split('.')[-1]
-        if file_type == IMAGE:
-            new_image_way = f'images_and_sounds\\{type_symb}\\{writing}\\image.{file_format}'
-            copy2(way, new_image_way)  # копирование без удаления исходного файла
-            return new_image_way
-        else:
-            new_sound_way = f'images_and_sounds\\{type_symb}\\{writing}\\sound.{file_format}'
-            copy2(way, new_sound_way)  # копирование без удаления исходного файла
-            return new_sound_way
-
     def save_new_kanji(self):
-        writing = self.line_edit_of_writing.text()
-        onyomi_reading = self.line_edit_of_onyomi_reading.text()
-        kunyomi_reading = self.line_edit_of_kunyomi_reading.text()
-        meaning = self.line_edit_of_meaning.text()
-        path_to_image = self.temporary_files.get('image', '')
-        path_to_sound = self.temporary_files.get('sound', '')
-        if path_to_image:
-            path_to_image = self.save_images_or_sounds(writing, path_to_image, KANJI, IMAGE)
-        if path_to_sound:
-            path_to_sound = self.save_images_or_sounds(writing, path_to_sound, KANJI, SOUND)
-        session = db_session.create_session()
-        kanji = session.query(Kanji).filter(Kanji.writing == writing, Kanji.meaning == meaning).first()
-        if not kanji:
-            kanji = Kanji(
-                writing=writing,
-                onyomi_reading=onyomi_reading,
-                kunyomi_reading=kunyomi_reading,
-                meaning=meaning,
-                path_to_image=path_to_image,
-                path_to_sound=path_to_sound
-            )
-            session.add(kanji)
-            session.commit()
-            self.line_edit_of_writing.setText('Добавлено!')
+        form = self.forms[KANJI]
+        writing = form['writing'].text()
+        onyomi_reading = form['onyomi_reading'].text()
+        kunyomi_reading = form['kunyomi_reading'].text()
+        meaning = form['meaning'].text()
+        with db_session.unit_of_work() as session:
+            exists = session.query(Kanji.id).filter(Kanji.title == writing).first()
+            if not exists:  # медиафайлы отклонённого кандзи в хранилище не попадают
+                path_to_image, path_to_sound = self.store_media()
+                kanji = Kanji(
+                    title=writing,
+                    onyomi_reading=onyomi_reading,
+                    kunyomi_reading=kunyomi_reading,
+                    meaning=meaning,
+                    path_to_image=path_to_image,
+                    path_to_sound=path_to_sound
+                )
+                session.add(kanji)
+                session.flush()  # получение id для индекса уроков
+                lesson_element = lessons.add_element_to_lessons(session, KANJI, kanji.id)
+        if not exists:
+            record = catalog.add_element(KANJI, kanji, lesson_element)
+            similarity_index.add(KANJI, record)
+            lesson_cache.invalidate()
+            form['writing'].setText('Добавлено!')
         else:
-            self.line_edit_of_writing.setText(
+            form['writing'].setText(
                 'Такой кандзи уже существует, пожалуйста, воспользуйтесь редактированием!'
             )
         self.open_setup_menu()
 
     def add_kanji(self):
-        self.disable_ui()
-        self.create_small_main_menu_button()
-        info_label_about_kanji_writing = QLabel('Введите написание иероглифа', self)
+        self.screens.show_screen(ADD_KANJI)
+
+    def create_add_kanji_screen(self, screen):
+        self.create_small_main_menu_button(screen)
+        info_label_about_kanji_writing = QLabel('Введите написание иероглифа', screen)
         info_label_about_kanji_writing.setGeometry(10, 20, 400, 30)
-        self.line_edit_of_writing = QLineEdit(self)
-        self.line_edit_of_writing.setGeometry(10, 60, 400, 40)
-        info_label_about_kanji_onyomi_reading = QLabel('Введите онное чтение кандзи', self)
+        line_edit_of_writing = QLineEdit(screen)
+        line_edit_of_writing.setGeometry(10, 60, 400, 40)
+        info_label_about_kanji_onyomi_reading = QLabel('Введите онное чтение кандзи', screen)
         info_label_about_kanji_onyomi_reading.setGeometry(10, 110, 400, 30)
-        self.line_edit_of_onyomi_reading = QLineEdit(self)
-        self.line_edit_of_onyomi_reading.setGeometry(10, 150, 400, 40)
-        info_label_about_kanji_kunyomi_reading = QLabel('Введите кунное чтение кандзи', self)
+        line_edit_of_onyomi_reading = QLineEdit(screen)
+        line_edit_of_onyomi_reading.setGeometry(10, 150, 400, 40)
+        info_label_about_kanji_kunyomi_reading = QLabel('Введите кунное чтение кандзи', screen)
         info_label_about_kanji_kunyomi_reading.setGeometry(10, 200, 400, 30)
-        self.line_edit_of_kunyomi_reading = QLineEdit(self)
-        self.line_edit_of_kunyomi_reading.setGeometry(10, 240, 400, 40)
-        info_label_about_kanji_meaning = QLabel('Введите значение', self)
+        line_edit_of_kunyomi_reading = QLineEdit(screen)
+        line_edit_of_kunyomi_reading.setGeometry(10, 240, 400, 40)
+        info_label_about_kanji_meaning = QLabel('Введите значение', screen)
         info_label_about_kanji_meaning.setGeometry(10, 290, 400, 30)
-        self.line_edit_of_meaning = QLineEdit(self)
-        self.line_edit_of_meaning.setGeometry(10, 330, 400, 40)
+        line_edit_of_meaning = QLineEdit(screen)
+        line_edit_of_meaning.setGeometry(10, 330, 400, 40)
 
-        image_label = QLabel('', self)
+        image_label = QLabel('', screen)
         image_label.setGeometry(430, 60, 240, 240)
-        image_button = QPushButton('Добавить изображение', self)
+        image_button = QPushButton('Добавить изображение', screen)
         image_button.setGeometry(460, 20, 180, 30)
         image_button.clicked.connect(lambda: self.add_image(image_label))
 
-        sound_label = QLabel('', self)
+        sound_label = QLabel('', screen)
         sound_label.setGeometry(460, 350, 180, 30)
-        sound_button = QPushButton('Добавить звук', self)
+        sound_button = QPushButton('Добавить звук', screen)
         sound_button.setGeometry(460, 310, 180, 30)
         sound_button.clicked.connect(lambda: self.add_sound(sound_label))
 
-        confirm_button = QPushButton('Добавить кандзи', self)
+        confirm_button = QPushButton('Добавить кандзи', screen)
         confirm_button.setGeometry(50, 380, 600, 40)
         confirm_button.clicked.connect(self.save_new_kanji)
-        ui = [info_label_about_kanji_writing, info_label_about_kanji_meaning,
-              info_label_about_kanji_kunyomi_reading, info_label_about_kanji_onyomi_reading,
-              self.line_edit_of_meaning, self.line_edit_of_onyomi_reading,
-              self.line_edit_of_writing, image_button, sound_button,
-              confirm_button, image_label, sound_label, self.line_edit_of_kunyomi_reading]
-        self.ui_list.extend(ui)
-        self.set_style_and_show_all()
+        self.forms[KANJI] = {'writing': line_edit_of_writing,
+                             'onyomi_reading': line_edit_of_onyomi_reading,
+                             'kunyomi_reading': line_edit_of_kunyomi_reading,
+                             'meaning': line_edit_of_meaning,
+                             'image': image_label,
+                             'sound': sound_label}
+        return lambda: self.clear_form(KANJI)
+
+    def clear_form(self, element_type):
+        self.temporary_files = {'sound': None, 'image': None}
+        for ui_item in self.forms[element_type].values():
+            ui_item.clear()
 
     def learn(self, element_type, lesson_type, lesson_number=1):
         info_methods = {
@@ -311,33 +410,64 @@ class ProgramLearnJapaneseLanguage(QMainWindow):
             WORD: lambda: self.create_word_info()
         }
         elements = self.get_lesson_elements_by_type(element_type, lesson_type, lesson_number)
-        self.temporary_elements_for_learn = iter(elements)
+        self.temporary_elements_for_learn = elements
+        self.learn_position = 0
+        self.learn_lesson_type = lesson_type
+        self.audio.preload([media_store.path(element.path_to_sound) for element in elements
+                            if getattr(element, 'path_to_sound', None)])
         learning_method = info_methods.get(element_type)
         learning_method()
 
+    def next_card_element(self):
+        """
+        Следующий элемент урока или None в конце урока.
+        Изображения PREFETCH_COUNT следующих карточек загружаются заранее
+        """
+        if self.learn_position >= len(self.temporary_elements_for_learn):
+            self.pixmaps.log_stats()
+            return None
+        element = self.temporary_elements_for_learn[self.learn_position]
+        self.learn_position += 1
+        upcoming = self.temporary_elements_for_learn[self.learn_position:self.learn_position + PREFETCH_COUNT]
+        self.pixmaps.prefetch([media_store.path(upcoming_element.path_to_image)
+                               for upcoming_element in upcoming
+                               if getattr(upcoming_element, 'path_to_image', None)])
+        return element
+
+    def card_pixmap(self, element):
+        return self.pixmaps.get(media_store.path(element.path_to_image)) if element.path_to_image else QPixmap()
+
     def open_setup_menu(self):
+        self.screens.show_screen(SETUP_MENU)
+
+    def create_setup_menu_screen(self, screen):
         """Доработать!!!!!!!!!!!!!"""
-        self.disable_ui()
-        self.create_small_main_menu_button()
+        self.create_small_main_menu_button(screen)
 
-        add_word_button = QPushButton('Добавить новое слово в программу', self)
+        add_word_button = QPushButton('Добавить новое слово в программу', screen)
         add_word_button.setGeometry(50, 50, 600, 40)
         add_word_button.clicked.connect(self.add_word)
-        add_kanji_button = QPushButton('Добавить новый кандзи в программу', self)
+        add_kanji_button = QPushButton('Добавить новый кандзи в программу', screen)
         add_kanji_button.setGeometry(50, 150, 600, 40)
         add_kanji_button.clicked.connect(self.add_kanji)
-        self.ui_list.extend([add_kanji_button, add_word_button])
-        self.set_style_and_show_all()
 
     def add_image(self, image_label):
         file_name, pressed = QFileDialog.getOpenFileName(self, 'Выберите изображение', '')
         if pressed:
             self.temporary_files['image'] = file_name
-            image = Image.open(file_name)
-            image = image.resize((240, 240), Image.LANCZOS)
-            image.save(file_name)
-            pixmap = QPixmap(file_name)
-            image_label.setPixmap(pixmap)
+            self.image_label = image_label
+            image_label.setText('Обработка изображения...')
+            self.images.ingest(file_name)  # миниатюра придёт в on_thumbnail_ready
+
+    def on_thumbnail_ready(self, source, thumbnail):
+        if source != self.temporary_files.get('image'):  # пользователь выбрал другой файл
+            return
+        if not thumbnail:
+            self.temporary_files['image'] = None
+            self.image_label.setText('Не удалось открыть изображение')
+            return
+        self.temporary_files['image'] = thumbnail
+        self.image_label.setPixmap(QPixmap(thumbnail))
 
     def add_sound(self, sound_label):
         file_name, pressed = QFileDialog.getOpenFileName(self, 'Выберите звуковой файл', '')
@@ -347,81 +477,132 @@ class ProgramLearnJapaneseLanguage(QMainWindow):
             sound_label.setFont(FONT_14)
 
     def listen(self, way_to_sound):
-        """возможно не работает//////////////////////"""
-        winsound.PlaySound(way_to_sound, winsound.SND_FILENAME)
+        """Воспроизведение без ожидания окончания звука"""
+        self.audio.play(way_to_sound)
 
     def save_new_word(self):
-        writing = self.line_edit_of_writing.text()
-        reading = self.line_edit_of_reading.text()
-        meaning = self.line_edit_of_meaning.text()
+        form = self.forms[WORD]
+        writing = form['writing'].text()
+        reading = form['reading'].text()
+        meaning = form['meaning'].text()
+        with db_session.unit_of_work() as session:
+            exists = session.query(Word.id).filter(Word.title == writing, Word.reading == reading).first()
+            if not exists:  # медиафайлы отклонённого слова в хранилище не попадают
+                path_to_image, path_to_sound = self.store_media()
+                word = Word(
+                    title=writing,
+                    reading=reading,
+                    meaning=meaning,
+                    path_to_image=path_to_image,
+                    path_to_sound=path_to_sound
+                )
+                session.add(word)
+                session.flush()  # получение id для индекса уроков
+                lesson_element = lessons.add_element_to_lessons(session, WORD, word.id)
+        if not exists:
+            record = catalog.add_element(WORD, word, lesson_element)
+            similarity_index.add(WORD, record)
+            lesson_cache.invalidate()
+            form['writing'].setText('Добавлено!')
+        else:
+            form['writing'].setText(
+                'Такое слово уже существует, пожалуйста, воспользуйтесь редактированием!'
+            )
+        self.open_setup_menu()
+
+    def store_media(self):
+        """
+        Сохранение выбранных картинки и звука в хранилище медиафайлов,
+        в базе данных хранится только ссылка на файл хранилища
+        """
         path_to_image = self.temporary_files.get('image', '')
         path_to_sound = self.temporary_files.get('sound', '')
         if path_to_image:
-            path_to_image = self.save_images_or_sounds(writing, path_to_image, WORD, IMAGE)
+            path_to_image = media_store.put(path_to_image)
         if path_to_sound:
-            path_to_sound = self.save_images_or_sounds(writing, path_to_sound, WORD, SOUND)
-        session = db_session.create_session()
-        word = Word(
-            writing=writing,
-            reading=reading,
-            meaning=meaning,
-            path_to_image=path_to_image,
-            path_to_sound=path_to_sound
-        )
-        session.add(word)
-        session.commit()
-        self.open_setup_menu()
+            path_to_sound = media_store.put(path_to_sound)
+        return path_to_image, path_to_sound
 
     def add_word(self):
-        self.disable_ui()
-        self.create_small_main_menu_button()
+        self.screens.show_screen(ADD_WORD)
 
-        info_label_about_word_writing = QLabel('Введите написание слова', self)
+    def create_add_word_screen(self, screen):
+        self.create_small_main_menu_button(screen)
+
+        info_label_about_word_writing = QLabel('Введите написание слова', screen)
         info_label_about_word_writing.setGeometry(10, 50, 400, 40)
-        self.line_edit_of_writing = QLineEdit(self)
-        self.line_edit_of_writing.setGeometry(10, 100, 400, 50)
-        info_label_about_word_reading = QLabel('Введите написание слова каной (чтение)', self)
+        line_edit_of_writing = QLineEdit(screen)
+        line_edit_of_writing.setGeometry(10, 100, 400, 50)
+        info_label_about_word_reading = QLabel('Введите написание слова каной (чтение)', screen)
         info_label_about_word_reading.setGeometry(10, 160, 400, 40)
-        self.line_edit_of_reading = QLineEdit(self)
-        self.line_edit_of_reading.setGeometry(10, 210, 400, 50)
-        info_label_about_word_meaning = QLabel('Введите значние слова', self)
+        line_edit_of_reading = QLineEdit(screen)
+        line_edit_of_reading.setGeometry(10, 210, 400, 50)
+        info_label_about_word_meaning = QLabel('Введите значние слова', screen)
         info_label_about_word_meaning.setGeometry(10, 260, 400, 40)
-        self.line_edit_of_meaning = QLineEdit(self)
-        self.line_edit_of_meaning.setGeometry(10, 310, 400, 50)
+        line_edit_of_meaning = QLineEdit(screen)
+        line_edit_of_meaning.setGeometry(10, 310, 400, 50)
 
-        image_label = QLabel('', self)
+        image_label = QLabel('', screen)
         image_label.setGeometry(430, 60, 240, 240)
-        image_button = QPushButton('Добавить изображение', self)
+        image_button = QPushButton('Добавить изображение', screen)
         image_button.setGeometry(460, 20, 180, 30)
         image_button.clicked.connect(lambda: self.add_image(image_label))
 
-        sound_label = QLabel('', self)
+        sound_label = QLabel('', screen)
         sound_label.setGeometry(460, 350, 180, 30)
-        sound_button = QPushButton('Добавить звук', self)
+        sound_button = QPushButton('Добавить звук', screen)
         sound_button.setGeometry(460, 310, 180, 30)
         sound_button.clicked.connect(lambda: self.add_sound(sound_label))
 
-        confirm_button = QPushButton('Добавить слово', self)
+        confirm_button = QPushButton('Добавить слово', screen)
         confirm_button.setGeometry(50, 380, 600, 40)
         confirm_button.clicked.connect(self.save_new_word)
-        temporary_ui = [info_label_about_word_writing, info_label_about_word_meaning,
-                        info_label_about_word_reading, self.line_edit_of_meaning,
-                        self.line_edit_of_reading, self.line_edit_of_writing, image_button,
-                        sound_button, confirm_button, image_label, sound_label]
-        self.ui_list.extend(temporary_ui)
-        self.set_style_and_show_all()
+        self.forms[WORD] = {'writing': line_edit_of_writing,
+                            'reading': line_edit_of_reading,
+                            'meaning': line_edit_of_meaning,
+                            'image': image_label,
+                            'sound': sound_label}
+        return lambda: self.clear_form(WORD)
 
     def load_user(self, login, password, hashed=False):
-        session = db_session.create_session()
         if not hashed:
-            user = session.query(User).filter(
-                User.login == login,
-                check_password_hash(User.password_hash, password)).first()
+            # проверка пароля в фоне, пользователь придёт в set_current_user
+            self.credentials.login(login, password)
         else:
-            user = session.query(User).filter(
-                User.login == login,
-                User.password_hash == password).first()
+            with db_session.read_only_session() as session:
+                user = session.query(User).filter(
+                    User.login == login,
+                    User.password_hash == password).first()
+            self.set_current_user(user)
+
+    def set_current_user(self, user):
         self.current_user = user
+        if user:
+            self.offer_saved_test()
+
+    def offer_saved_test(self):
+        """Предложение продолжить тест пользователя, прерванный сбоем программы"""
+        saved = load_saved_test()
+        if not saved:
+            return
+        plan, progress = saved
+        elements = [catalog.get(plan.element_type, question.element_id) for question in plan]
+        if progress.user_id != self.current_user.id or not all(elements):
+            return
+        answer = QMessageBox.question(self, 'Незавершённый тест',
+                                      f'Тест прерван на вопросе {progress.question_index + 1} '
+                                      f'из {len(plan)}. Продолжить его?')
+        if answer == QMessageBox.Yes:
+            self.resume_test(plan, progress, elements)
+        else:
+            remove_saved_plan()
+
+    def resume_test(self, plan, progress, elements):
+        self.hide()
+        test = data.test.Test(plan.element_type, elements, progress.upgrade, self.current_user, self,
+                              seed=plan.seed, plan=plan, progress=progress)
+        test.show()
+        self.show()
 
     def test_of_learned_elements(self, element_type, elements, is_upgrading_test=False):
         self.hide()
@@ -431,314 +612,295 @@ class ProgramLearnJapaneseLanguage(QMainWindow):
         self.show()
 
     def create_kana_info(self, type_of_kana):
-        self.disable_ui()
-        self.create_small_main_menu_button()
-
-        kana_label = QLabel(self)
+        self.screens.show_screen(KANA_CARD, type_of_kana)
+        card = self.cards[type_of_kana]
+        symbol = self.next_card_element()
+        if not symbol:
+            self.screens.show_screen(LESSON_END, type_of_kana)
+            return
+        card['kana'].setText(symbol.title)
+        card['reading'].setText(symbol.reading)
+
+    def create_kana_card_screen(self, screen, type_of_kana):
+        self.create_small_main_menu_button(screen)
+
+        kana_label = QLabel(screen)
         kana_label.setGeometry(0, 50, 440, 60)
         kana_label.setFont(FONT_20)
         kana_label.setAlignment(QtCore.Qt.AlignCenter)
 
-        transliteration_reading_label = QLabel(self)
+        transliteration_reading_label = QLabel(screen)
         transliteration_reading_label.setGeometry(0, 160, 440, 60)
         transliteration_reading_label.setFont(FONT_20)
         transliteration_reading_label.setAlignment(QtCore.Qt.AlignCenter)
 
-        info_label_about_kana = QLabel(self)
+        info_label_about_kana = QLabel(screen)
         info_label_about_kana.setGeometry(0, 10, 440, 30)
         info_label_about_kana.setFont(FONT_14)
         info_label_about_kana.setAlignment(QtCore.Qt.AlignCenter)
         info_label_about_kana.setText('Иероглиф')
 
-        info_label_about_read = QLabel(self)
+        info_label_about_read = QLabel(screen)
         info_label_about_read.setGeometry(QtCore.QRect(0, 120, 440, 30))
         info_label_about_read.setFont(FONT_14)
         info_label_about_read.setAlignment(QtCore.Qt.AlignCenter)
         info_label_about_read.setText('Чтение (транслитерация на русский)')
 
-        kana_next_button = QPushButton('Следующий иероглиф', self)
+        kana_next_button = QPushButton('Следующий иероглиф', screen)
         kana_next_button.clicked.connect(lambda: self.create_kana_info(type_of_kana))
         kana_next_button.setFont(FONT_14)
         kana_next_button.setGeometry(50, 400, 600, 30)
-
-        ui = [kana_label, kana_next_button, info_label_about_kana,
-              info_label_about_read, transliteration_reading_label]
-        self.ui_list.extend(ui)
-        self.set_style_and_show_all()
-        try:
-            symbol = next(self.temporary_elements_for_learn)
-            kana_label.setText(symbol.title)
-            transliteration_reading_label.setText(symbol.reading)
-
-        except StopIteration:
-            self.disable_ui()
-
-            kana_symbols = self.get_lesson_elements_by_type(type_of_kana, CONTINUE)
-            return_to_menu_button = QPushButton('Вернуться в исходное меню', self)
-            return_to_menu_button.setGeometry(50, 100, 600, 50)
-            return_to_menu_button.clicked.connect(self.return_to_start_menu)
-            return_to_menu_button.setFont(FONT_20)
-
-            checking_button = QPushButton('Пройти тест', self)
-            checking_button.setGeometry(50, 100, 600, 50)
-            checking_button.clicked.connect(lambda: self.test_of_learned_elements(type_of_kana, kana_symbols, True))
-            checking_button.setFont(FONT_20)
-            ui = [checking_button, return_to_menu_button]
-            self.ui_list.extend(ui)
-            self.set_style_and_show_all()
+        self.cards[type_of_kana] = {'kana': kana_label,
+                                    'reading': transliteration_reading_label}
+
+    def create_lesson_end_screen(self, screen, element_type):
+        return_to_menu_button = QPushButton('Вернуться в исходное меню', screen)
+        return_to_menu_button.setGeometry(50, 200, 600, 50)
+        return_to_menu_button.clicked.connect(self.return_to_start_menu)
+        return_to_menu_button.setFont(FONT_20)
+
+        checking_button = QPushButton('Пройти тест', screen)
+        checking_button.setGeometry(50, 100, 600, 50)
+        checking_button.clicked.connect(lambda: self.test_after_lesson(element_type))
+        checking_button.setFont(FONT_20)
+
+    def test_after_lesson(self, element_type):
+        if self.learn_lesson_type == REVIEW:  # тест по повторённым элементам
+            self.test_of_learned_elements(element_type, self.temporary_elements_for_learn)
+        else:
+            self.test_of_learned_elements(
+                element_type, self.get_lesson_elements_by_type(element_type, CONTINUE), True)
 
     def create_kanji_info(self):
-        self.disable_ui()
-        self.create_small_main_menu_button()
-
-        kanji_label = QLabel(self)
+        self.screens.show_screen(KANJI_CARD)
+        card = self.cards[KANJI]
+        kanji = self.next_card_element()
+        if not kanji:
+            self.screens.show_screen(LESSON_END, KANJI)
+            return
+        self.current_card_element = kanji
+        card['image'].setPixmap(self.card_pixmap(kanji))
+        card['listen'].setText('Прослушать' if kanji.path_to_sound else 'Нет звукового файла')
+        card['examples'].clear()
+        if kanji.examples:
+            try:
+                for example in kanji.examples.split(','):
+                    card['examples'].addItem(QListWidgetItem(f'{example}'))
+            except Exception:
+                pass
+        card['kanji'].setText(kanji.title)
+        card['onyomi_reading'].setText(kanji.onyomi_reading)
+        card['kunyomi_reading'].setText(kanji.kunyomi_reading)
+        card['meaning'].setText(kanji.meaning)
+
+    def create_kanji_card_screen(self, screen):
+        self.create_small_main_menu_button(screen)
+
+        kanji_label = QLabel(screen)
         kanji_label.setGeometry(0, 20, 420, 60)
         kanji_label.setFont(FONT_20)
         kanji_label.setAlignment(QtCore.Qt.AlignCenter)
 
-        kanji_image_label = QLabel(self)
+        kanji_image_label = QLabel(screen)
         kanji_image_label.setGeometry(441, 50, 240, 240)
 
-        kanji_onyomi_reading_label = QLabel(self)
+        kanji_onyomi_reading_label = QLabel(screen)
         kanji_onyomi_reading_label.setGeometry(0, 110, 440, 40)
         kanji_onyomi_reading_label.setFont(FONT_20)
         kanji_onyomi_reading_label.setAlignment(QtCore.Qt.AlignCenter)
 
-        kanji_kunyomi_reading_label = QLabel(self)
+        kanji_kunyomi_reading_label = QLabel(screen)
         kanji_kunyomi_reading_label.setGeometry(0, 180, 440, 40)
         kanji_kunyomi_reading_label.setFont(FONT_20)
         kanji_kunyomi_reading_label.setAlignment(QtCore.Qt.AlignCenter)
 
-        kanji_meaning_label = QLabel(self)
+        kanji_meaning_label = QLabel(screen)
         kanji_meaning_label.setGeometry(0, 270, 500, 60)
         kanji_meaning_label.setFont(FONT_20)
         kanji_meaning_label.setAlignment(QtCore.Qt.AlignCenter)
 
-        info_label_about_kanji = QLabel(self)
+        info_label_about_kanji = QLabel(screen)
         info_label_about_kanji.setGeometry(0, 0, 440, 18)
         info_label_about_kanji.setFont(FONT_14)
         info_label_about_kanji.setAlignment(QtCore.Qt.AlignCenter)
         info_label_about_kanji.setText('Слово')
 
-        info_label_about_read_onyomi = QLabel(self)
+        info_label_about_read_onyomi = QLabel(screen)
         info_label_about_read_onyomi.setGeometry(QtCore.QRect(0, 90, 440, 18))
         info_label_about_read_onyomi.setFont(FONT_14)
         info_label_about_read_onyomi.setAlignment(QtCore.Qt.AlignCenter)
         info_label_about_read_onyomi.setText('Чтение (онъёми)')
 
-        info_label_about_read_kunyomi = QLabel(self)
+        info_label_about_read_kunyomi = QLabel(screen)
         info_label_about_read_kunyomi.setGeometry(QtCore.QRect(0, 160, 440, 18))
         info_label_about_read_kunyomi.setFont(FONT_14)
         info_label_about_read_kunyomi.setAlignment(QtCore.Qt.AlignCenter)
         info_label_about_read_kunyomi.setText('Чтение (куннъёми)')
 
-        info_label_about_meaning = QLabel(self)
+        info_label_about_meaning = QLabel(screen)
         info_label_about_meaning.setGeometry(0, 230, 440, 30)
         info_label_about_meaning.setFont(FONT_14)
         info_label_about_meaning.setAlignment(QtCore.Qt.AlignCenter)
         info_label_about_meaning.setText('Значение')
 
-        kanji_reading_button = QPushButton(self)
+        kanji_reading_button = QPushButton(screen)
         kanji_reading_button.setGeometry(441, 280, 240, 40)
         kanji_reading_button.setFont(FONT_14)
         kanji_reading_button.setText('Прослушать')
+        kanji_reading_button.clicked.connect(self.listen_current_card)
 
-        kanji_next_button = QPushButton('Следующий кандзи', self)
+        kanji_next_button = QPushButton('Следующий кандзи', screen)
         kanji_next_button.clicked.connect(self.create_kanji_info)
         kanji_next_button.setFont(FONT_14)
         kanji_next_button.setGeometry(50, 400, 600, 30)
 
-        kanji_use_examples_list = QListWidget(self)
+        kanji_use_examples_list = QListWidget(screen)
         kanji_use_examples_list.setGeometry(50, 330, 600, 60)
-
-        ui = [kanji_use_examples_list, kanji_image_label, kanji_kunyomi_reading_label,
-              kanji_onyomi_reading_label, kanji_reading_button, kanji_next_button,
-              kanji_label, kanji_meaning_label, info_label_about_kanji,
-              info_label_about_meaning, info_label_about_read_onyomi,
-              info_label_about_read_kunyomi]
-        self.ui_list.extend(ui)
-        self.set_style_and_show_all()
-        try:
-            kanji = next(self.temporary_elements_for_learn)
-            if kanji.path_to_image:
-                pixmap = QPixmap(kanji.path_to_image)
-                kanji_image_label.setPixmap(pixmap)
-            if kanji.path_to_sound:
-                kanji_reading_button.clicked.connect(lambda: self.listen(kanji.path_to_sound))
-            else:
-                kanji_reading_button.setText('Нет звукового файла')
-            if kanji.examples:
-                try:
-                    for example in kanji.examples.split(','):
-                        kanji_use_examples_list.addItem(QListWidgetItem(f'{example}'))
-                except Exception:
-                    pass
-            kanji_label.setText(kanji.title)
-            kanji_onyomi_reading_label.setText(kanji.onyomi_reading)
-            kanji_kunyomi_reading_label.setText(kanji.kunyomi_reading)
-            kanji_meaning_label.setText(kanji.meaning)
-        except StopIteration:
-            self.disable_ui()
-
-            kanji = self.get_lesson_elements_by_type(KANJI, CONTINUE)
-            return_to_menu_button = QPushButton('Вернуться в исходное меню', self)
-            return_to_menu_button.setGeometry(50, 100, 600, 50)
-            return_to_menu_button.clicked.connect(self.return_to_start_menu)
-            return_to_menu_button.setFont(FONT_20)
-
-            checking_button = QPushButton('Пройти тест', self)
-            checking_button.setGeometry(50, 100, 600, 50)
-            checking_button.clicked.connect(lambda: self.test_of_learned_elements(KANJI, kanji, True))
-            checking_button.setFont(FONT_20)
-            ui = [checking_button, return_to_menu_button]
-            self.ui_list.extend(ui)
-            self.set_style_and_show_all()
+        self.cards[KANJI] = {'kanji': kanji_label,
+                             'image': kanji_image_label,
+                             'onyomi_reading': kanji_onyomi_reading_label,
+                             'kunyomi_reading': kanji_kunyomi_reading_label,
+                             'meaning': kanji_meaning_label,
+                             'listen': kanji_reading_button,
+                             'examples': kanji_use_examples_list}
 
     def create_word_info(self):
-        self.disable_ui()
-        self.create_small_main_menu_button()
-        word_label = QLabel(self)
+        self.screens.show_screen(WORD_CARD)
+        card = self.cards[WORD]
+        word = self.next_card_element()
+        if not word:
+            self.screens.show_screen(LESSON_END, WORD)
+            return
+        self.current_card_element = word
+        card['image'].setPixmap(self.card_pixmap(word))
+        card['listen'].setText('Прослушать' if word.path_to_sound else 'Нет звукового файла')
+        card['word'].setText(word.title)
+        card['reading'].setText(word.reading)
+        card['meaning'].setText(word.meaning)
+
+    def create_word_card_screen(self, screen):
+        self.create_small_main_menu_button(screen)
+        word_label = QLabel(screen)
         word_label.setGeometry(0, 50, 420, 60)
         word_label.setFont(FONT_20)
         word_label.setAlignment(QtCore.Qt.AlignCenter)
 
-        word_image_label = QLabel(self)
+        word_image_label = QLabel(screen)
         word_image_label.setGeometry(441, 50, 240, 240)
 
-        word_hiragana_reading_label = QLabel(self)
+        word_hiragana_reading_label = QLabel(screen)
         word_hiragana_reading_label.setGeometry(0, 160, 440, 60)
         word_hiragana_reading_label.setFont(FONT_20)
         word_hiragana_reading_label.setAlignment(QtCore.Qt.AlignCenter)
 
-        word_meaning_label = QLabel(self)
+        word_meaning_label = QLabel(screen)
         word_meaning_label.setGeometry(20, 270, 660, 60)
         word_meaning_label.setFont(FONT_20)
         word_meaning_label.setAlignment(QtCore.Qt.AlignCenter)
 
-        info_label_about_word = QLabel(self)
+        info_label_about_word = QLabel(screen)
         info_label_about_word.setGeometry(0, 10, 440, 30)
         info_label_about_word.setFont(FONT_14)
         info_label_about_word.setAlignment(QtCore.Qt.AlignCenter)
         info_label_about_word.setText('Слово')
 
-        info_label_about_read = QLabel(self)
+        info_label_about_read = QLabel(screen)
         info_label_about_read.setGeometry(QtCore.QRect(0, 120, 440, 30))
         info_label_about_read.setFont(FONT_14)
         info_label_about_read.setAlignment(QtCore.Qt.AlignCenter)
         info_label_about_read.setText('Чтение (кана)')
 
-        info_label_about_meaning = QLabel(self)
+        info_label_about_meaning = QLabel(screen)
         info_label_about_meaning.setGeometry(0, 230, 440, 30)
         info_label_about_meaning.setFont(FONT_14)
         info_label_about_meaning.setAlignment(QtCore.Qt.AlignCenter)
         info_label_about_meaning.setText('Значение')
 
-        word_reading_button = QPushButton(self)
+        word_reading_button = QPushButton(screen)
         word_reading_button.setGeometry(441, 340, 240, 40)
         word_reading_button.setFont(FONT_14)
         word_reading_button.setText('Прослушать')
+        word_reading_button.clicked.connect(self.listen_current_card)
 
-        word_next_button = QPushButton('Следующее слово', self)
+        word_next_button = QPushButton('Следующее слово', screen)
         word_next_button.clicked.connect(self.create_word_info)
         word_next_button.setFont(FONT_14)
         word_next_button.setGeometry(50, 400, 600, 30)
+        self.cards[WORD] = {'word': word_label,
+                            'image': word_image_label,
+                            'reading': word_hiragana_reading_label,
+                            'meaning': word_meaning_label,
+                            'listen': word_reading_button}
 
-        ui = [word_image_label, word_reading_button,
-              word_label, word_hiragana_reading_label,
-              word_meaning_label, info_label_about_meaning,
-              info_label_about_read, info_label_about_word,
-              word_next_button]
-        self.ui_list.extend(ui)
-        self.set_style_and_show_all()
-        try:
-            word = next(self.temporary_elements_for_learn)
-            if word.path_to_image:
-                pixmap = QPixmap(word.path_to_image)
-                word_image_label.setPixmap(pixmap)
-            if word.path_to_sound:
-                word_reading_button.clicked.connect(lambda: self.listen(word.path_to_sound))
-            else:
-                word_reading_button.setText('Нет звукового файла')
-            word_label.setText(word.title)
-            word_hiragana_reading_label.setText(word.reading)
-            word_meaning_label.setText(word.meaning)
-
-        except StopIteration:
-            self.disable_ui()
-
-            words = self.get_lesson_elements_by_type(WORD, CONTINUE)
-            return_to_menu_button = QPushButton('Вернуться в исходное меню', self)
-            return_to_menu_button.setGeometry(50, 100, 600, 50)
-            return_to_menu_button.clicked.connect(self.return_to_start_menu)
-            return_to_menu_button.setFont(FONT_20)
-
-            checking_button = QPushButton('Пройти тест', self)
-            checking_button.setGeometry(50, 100, 600, 50)
-            checking_button.clicked.connect(lambda: self.test_of_learned_elements(WORD, words, True))
-            checking_button.setFont(FONT_20)
-            ui = [checking_button, return_to_menu_button]
-            self.ui_list.extend(ui)
-            self.set_style_and_show_all()
+    def listen_current_card(self):
+        if self.current_card_element and self.current_card_element.path_to_sound:
+            self.listen(media_store.path(self.current_card_element.path_to_sound))
 
     def view_learned(self, learn_type):
-        self.disable_ui()
-        self.create_small_main_menu_button()
+        self.screens.show_screen(VIEW_LEARNED, learn_type)
 
-        elements = self.get_lesson_elements_by_type(learn_type, lesson_type=HARD)
-        list_widget = QListWidget(self)
+    def create_view_learned_screen(self, screen, learn_type):
+        self.create_small_main_menu_button(screen)
+
+        list_widget = QListWidget(screen)
         list_widget.setGeometry(0, 0, 700, 380)
-        for element in elements:
-            list_widget.addItem(QListWidgetItem(f'{element.title}'))
-        return_button = QPushButton('Вернуться к выбору', self)
+        return_button = QPushButton('Вернуться к выбору', screen)
         return_button.setGeometry(50, 400, 600, 50)
         return_button.setFont(FONT_14)
         return_button.clicked.connect(lambda: self.learn_menu(learn_type))
-        self.ui_list.extend([return_button, list_widget])
-        self.set_style_and_show_all()
+        return lambda: self.update_learned_list(list_widget, learn_type)
+
+    def update_learned_list(self, list_widget, learn_type):
+        elements = self.get_lesson_elements_by_type(learn_type, lesson_type=HARD)
+        if list_widget.count() != len(elements):
+            list_widget.clear()
+            list_widget.addItems([f'{element.title}' for element in elements])
 
     def learn_menu(self, learn_type):
-        self.disable_ui()
-        self.create_small_main_menu_button()
-        continue_learn_button = QPushButton('Продолжить', self)
+        self.screens.show_screen(LEARN_MENU, learn_type)
+
+    def create_learn_menu_screen(self, screen, learn_type):
+        self.create_small_main_menu_button(screen)
+        continue_learn_button = QPushButton('Продолжить', screen)
         continue_learn_button.setGeometry(100, 40, 500, 50)
         continue_learn_button.clicked.connect(lambda: self.learn(learn_type, CONTINUE))
-        number_of_lesson_obj = QSpinBox(self)
+        number_of_lesson_obj = QSpinBox(screen)
         number_of_lesson_obj.setGeometry(610, 140, 30, 50)
         number_of_lesson_obj.setMinimum(1)
-        maximum = getattr(self.current_user, f'{learn_type}_save', 1)
-        number_of_lesson_obj.setMaximum(maximum)
-        past_learn_button = QPushButton('Повторить предыдущую часть', self)
+        past_learn_button = QPushButton('Повторить предыдущую часть', screen)
         past_learn_button.setGeometry(100, 140, 500, 50)
         past_learn_button.clicked.connect(
             lambda: self.learn(learn_type, NUMERABLE, number_of_lesson_obj.value())
         )
-        view_learned_words = QPushButton('Посмотреть изученное', self)
+        review_learn_button = QPushButton(screen)
+        review_learn_button.setGeometry(100, 240, 500, 50)
+        review_learn_button.clicked.connect(lambda: self.learn(learn_type, REVIEW))
+        view_learned_words = QPushButton('Посмотреть изученное', screen)
         view_learned_words.setGeometry(100, 340, 500, 50)
-        ui = [continue_learn_button, past_learn_button,
-              number_of_lesson_obj, view_learned_words]
         view_learned_words.clicked.connect(lambda: self.view_learned(learn_type))
-        self.ui_list.extend(ui)
-        self.set_style_and_show_all()
 
-    def create_main_types_of_learning_button_with_function(self, function):
-        hiragana_button = QPushButton('Хирагана', self)
+        def refresh():
+            self.update_lesson_maximum(number_of_lesson_obj, learn_type)
+            self.update_review_button(review_learn_button, learn_type)
+        return refresh
+
+    def create_types_screen(self, screen, function):
+        self.create_small_main_menu_button(screen)
+        self.create_main_types_of_learning_button_with_function(screen, function)
+
+    def create_main_types_of_learning_button_with_function(self, screen, function):
+        hiragana_button = QPushButton('Хирагана', screen)
         hiragana_button.setGeometry(50, 50, 600, 40)
         hiragana_button.clicked.connect(lambda: function(HIRAGANA))
-        katakana_button = QPushButton('Катакана', self)
+        katakana_button = QPushButton('Катакана', screen)
         katakana_button.setGeometry(50, 130, 600, 40)
         katakana_button.clicked.connect(lambda: function(KATAKANA))
-        kanji_button = QPushButton('Кандзи', self)
+        kanji_button = QPushButton('Кандзи', screen)
         kanji_button.setGeometry(50, 210, 600, 40)
         kanji_button.clicked.connect(lambda: function(KANJI))
-        words_button = QPushButton('Слова', self)
+        words_button = QPushButton('Слова', screen)
         words_button.setGeometry(50, 290, 600, 40)
         words_button.clicked.connect(lambda: function(WORD))
-        ui = [hiragana_button, katakana_button,
-              kanji_button, words_button]
-        self.ui_list.extend(ui)
 
     def start_learn(self):
-        self.disable_ui()
-        self.create_small_main_menu_button()
-        self.create_main_types_of_learning_button_with_function(self.learn_menu)
-        self.set_style_and_show_all()
+        self.screens.show_screen(LEARN_TYPES)
@@ -1 +1 @@
-from .models import users, hiragana, katakana, kanji, words
+from .models import users, hiragana, katakana, kanji, words, lessons, reviews, answers, answer_statistics, difficulty
@@ -0,0 +1,99 @@
+"""
+Журнал ответов на вопросы тестов с отложенной записью.
+Ответ помещается в очередь в памяти, фоновый поток записывает накопленные
+ответы в базу данных пачками, одной транзакцией на пачку вместе с итогами
+статистики (answer_statistics). Поэтому нажатие на вариант ответа
+не ждёт диска. Пачка записывается, когда набрано
+BATCH_SIZE ответов, прошло FLUSH_INTERVAL секунд или вызван flush().
+При сбое теряются только ответы последних FLUSH_INTERVAL секунд,
+уже записанные пачки сохраняются целиком
+"""
+import logging
+import threading
+from queue import Empty, Queue
+from time import monotonic, time
+
+from data import db_session
+from data.answer_statistics import apply_events
+from data.models.answers import AnswerEvent
+
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 1.0  # наибольшая задержка записи ответа (в секундах)
+STOP_TIMEOUT = 10  # ожидание записи оставшихся ответов при выходе (в секундах)
+
+_FLUSH = object()
+_STOP = object()
+
+__answer_log = None
+
+
+class AnswerLog:
+    def __init__(self, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = Queue()
+        self.written = 0
+        self.thread = threading.Thread(target=self._run, name='answer_log', daemon=True)
+        self.thread.start()
+
+    def record(self, user_id, element_type, element_id, chosen, correct, latency):
+        """Добавляет ответ в очередь записи, не обращаясь к базе данных"""
+        self.queue.put({'user_id': user_id, 'element_type': element_type, 'element_id': element_id,
+                        'chosen': chosen, 'correct': correct, 'latency': latency,
+                        'answered_at': time()})
+
+    def flush(self, wait=False):
+        """Немедленная запись очереди; wait - дождаться окончания записи"""
+        self.queue.put(_FLUSH)
+        if wait:
+            self.queue.join()
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """Запись оставшихся ответов и остановка потока записи"""
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join(timeout)
+
+    def _run(self):
+        running = True
+        while running:
+            items = [self.queue.get()]  # поток ждёт первый ответ пачки
+            deadline = monotonic() + self.flush_interval
+            while items[-1] not in (_FLUSH, _STOP) and len(items) < self.batch_size:
+                try:
+                    items.append(self.queue.get(timeout=max(deadline - monotonic(), 0)))
+                except Empty:
+                    break
+            running = _STOP not in items
+            events = [item for item in items if item is not _FLUSH and item is not _STOP]
+            if events:
+                self._write(events)
+            for _ in items:
+                self.queue.task_done()
+
+    def _write(self, events):
+        start = monotonic()
+        try:
+            with db_session.unit_of_work() as session:
+                session.execute(AnswerEvent.__table__.insert(), events)
+                apply_events(session, events)  # итоги обновляются в той же транзакции
+        except Exception as error:
+            logging.error(f'{len(events)} answer events were not saved: {error}')
+            return
+        self.written += len(events)
+        logging.info(f'{len(events)} answer events saved in {(monotonic() - start) * 1000:.1f} ms')
+
+
+def get_answer_log():
+    global __answer_log
+    if not __answer_log:
+        __answer_log = AnswerLog()
+    return __answer_log
+
+
+def stop_answer_log():
+    """Вызывается при выходе из программы"""
+    global __answer_log
+    if __answer_log:
+        __answer_log.stop()
+        __answer_log = None
@@ -0,0 +1,134 @@
+"""
+Статистика ответов: точность, серии верных ответов и самые трудные элементы.
+Итоги по разделам и элементам хранятся в таблицах category_statistics и
+item_statistics и обновляются в той же транзакции, что и запись пачки
+ответов (answer_log), поэтому экран статистики не просматривает историю
+ответов и строится за время, не зависящее от её длины
+"""
+from sqlalchemy import select
+
+from data.lessons import SQL_VARIABLES_LIMIT
+from data.models.answer_statistics import CategoryStatistics, ItemStatistics
+from data.models.answers import AnswerEvent
+
+WEAKEST_COUNT = 5  # трудных элементов на экране статистики
+REBUILD_BATCH_SIZE = 5000
+
+
+def new_statistics(class_of_statistics, **keys):
+    return class_of_statistics(answers=0, correct=0, latency_sum=0, streak=0, best_streak=0, **keys)
+
+
+def add_answer(statistics, correct, latency):
+    statistics.answers += 1
+    statistics.latency_sum += latency
+    if correct:
+        statistics.correct += 1
+        statistics.streak += 1
+        statistics.best_streak = max(statistics.best_streak, statistics.streak)
+    else:
+        statistics.streak = 0
+
+
+def load_item_statistics(session, user_id, element_type, element_ids):
+    element_ids = list(element_ids)
+    items = {}
+    for start in range(0, len(element_ids), SQL_VARIABLES_LIMIT):
+        chunk = element_ids[start:start + SQL_VARIABLES_LIMIT]
+        for item in session.query(ItemStatistics).filter(
+                ItemStatistics.user_id == user_id, ItemStatistics.element_type == element_type,
+                ItemStatistics.element_id.in_(chunk)):
+            items[item.element_id] = item
+    return items
+
+
+def apply_events(session, events):
+    """
+    Добавляет пачку ответов (словари столбцов answer_events, по порядку ответов)
+    к итогам. Изменения не фиксируются (commit)
+    """
+    groups = {}
+    for event in events:
+        groups.setdefault((event['user_id'], event['element_type']), []).append(event)
+    for (user_id, element_type), group in groups.items():
+        category = session.query(CategoryStatistics).filter(
+            CategoryStatistics.user_id == user_id, CategoryStatistics.element_type == element_type).first()
+        if category is None:
+            category = new_statistics(CategoryStatistics, user_id=user_id, element_type=element_type)
+            session.add(category)
+        items = load_item_statistics(session, user_id, element_type,
+                                     {event['element_id'] for event in group})
+        for event in group:
+            item = items.get(event['element_id'])
+            if item is None:
+                item = new_statistics(ItemStatistics, user_id=user_id, element_type=element_type,
+                                      element_id=event['element_id'])
+                items[item.element_id] = item
+                session.add(item)
+            add_answer(category, event['correct'], event['latency'])
+            add_answer(item, event['correct'], event['latency'])
+            item.last_answered_at = event['answered_at']
+
+
+class Totals:
+    """Итоги в памяти для пересчёта по всей истории, поля как у таблиц статистики"""
+    __slots__ = ('answers', 'correct', 'latency_sum', 'streak', 'best_streak', 'last_answered_at')
+
+    def __init__(self):
+        self.answers = self.correct = self.streak = self.best_streak = 0
+        self.latency_sum = 0.0
+        self.last_answered_at = None
+
+
+def totals_rows(class_of_statistics, key_names, totals_by_key):
+    """Строки таблицы статистики: ключ (user_id, ...) и поля итогов, которые в ней есть"""
+    names = [name for name in Totals.__slots__ if name in class_of_statistics.__table__.c]
+    return [dict(zip(key_names, key), **{name: getattr(totals, name) for name in names})
+            for key, totals in totals_by_key.items()]
+
+
+def rebuild_statistics(connection):
+    """
+    Пересчёт итогов по всей истории ответов (миграция базы данных).
+    Ответы читаются потоково, итоги накапливаются в памяти и записываются
+    одной вставкой на таблицу
+    """
+    categories, items = {}, {}
+    table = AnswerEvent.__table__
+    result = connection.execution_options(stream_results=True).execute(select(
+        table.c.user_id, table.c.element_type, table.c.element_id, table.c.correct,
+        table.c.latency, table.c.answered_at).order_by(table.c.id))
+    for partition in result.partitions(REBUILD_BATCH_SIZE):
+        for user_id, element_type, element_id, correct, latency, answered_at in partition:
+            category = categories.get((user_id, element_type))
+            if category is None:
+                category = categories[user_id, element_type] = Totals()
+            item = items.get((user_id, element_type, element_id))
+            if item is None:
+                item = items[user_id, element_type, element_id] = Totals()
+            add_answer(category, correct, latency)
+            add_answer(item, correct, latency)
+            item.last_answered_at = answered_at
+    connection.execute(ItemStatistics.__table__.delete())
+    connection.execute(CategoryStatistics.__table__.delete())
+    if categories:
+        connection.execute(CategoryStatistics.__table__.insert(), totals_rows(
+            CategoryStatistics, ('user_id', 'element_type'), categories))
+    if items:
+        connection.execute(ItemStatistics.__table__.insert(), totals_rows(
+            ItemStatistics, ('user_id', 'element_type', 'element_id'), items))
+
+
+def category_summary(session, user_id):
+    """{тип: CategoryStatistics} разделов, в которых пользователь отвечал"""
+    return {category.element_type: category for category in session.query(CategoryStatistics).filter(
+        CategoryStatistics.user_id == user_id)}
+
+
+def weakest_items(session, user_id, element_type, limit=WEAKEST_COUNT):
+    """Элементы с наибольшей долей ошибок (ItemStatistics)"""
+    mistakes = ItemStatistics.answers - ItemStatistics.correct
+    return session.query(ItemStatistics).filter(
+        ItemStatistics.user_id == user_id, ItemStatistics.element_type == element_type,
+        mistakes > 0).order_by((mistakes * 1.0 / ItemStatistics.answers).desc(),
+                               mistakes.desc()).limit(limit).all()
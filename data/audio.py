@@ -0,0 +1,106 @@
+"""
+Воспроизведение звуков карточек без блокировки интерфейса.
+Звуки урока заранее читаются в память, воспроизведение выполняет
+подключаемый модуль (backend): Qt Multimedia или NullAudioBackend,
+который только запоминает воспроизведённые звуки (для запуска без звука)
+"""
+import logging
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QUrl
+
+try:
+    from PyQt5.QtMultimedia import QMediaContent, QMediaPlayer
+except ImportError:  # нет модуля Qt Multimedia или системных библиотек звука
+    QMediaContent = QMediaPlayer = None
+
+
+class NullAudioBackend:
+    """Ничего не воспроизводит, запоминает запросы воспроизведения"""
+
+    def __init__(self):
+        self.played = []
+        self.restarts = 0
+        self.current = None
+
+    def load(self, path):
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def play(self, path, clip):
+        if self.current == path:
+            self.restarts += 1
+        self.current = path
+        self.played.append(path)
+
+    def stop(self):
+        self.current = None
+
+
+class QtAudioBackend:
+    """
+    Воспроизведение через QMediaPlayer из буфера в памяти.
+    Повторный запуск того же звука начинает его сначала, а не ставит в очередь
+    """
+
+    def __init__(self):
+        self.player = QMediaPlayer()
+        self.buffer = None
+        self.current = None
+
+    def load(self, path):
+        with open(path, 'rb') as file:
+            return QByteArray(file.read())
+
+    def play(self, path, clip):
+        if self.current == path:
+            self.player.setPosition(0)
+        else:
+            self.player.stop()
+            self.buffer = QBuffer()
+            self.buffer.setData(clip)
+            self.buffer.open(QIODevice.ReadOnly)
+            # путь передаётся только для определения формата, данные читаются из буфера
+            self.player.setMedia(QMediaContent(QUrl.fromLocalFile(path)), self.buffer)
+            self.current = path
+        self.player.play()
+
+    def stop(self):
+        self.player.stop()
+
+
+def create_backend():
+    if QMediaPlayer is None:
+        logging.warning('Qt Multimedia is not available, sounds are disabled')
+        return NullAudioBackend()
+    return QtAudioBackend()
+
+
+class AudioPlayer:
+    """Звуки текущего урока в памяти: путь -> данные для backend"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or create_backend()
+        self.clips = {}
+
+    def load(self, path):
+        try:
+            return self.backend.load(path)
+        except OSError as error:
+            logging.error(f'Sound was not loaded: {error}')
+            return None
+
+    def preload(self, paths):
+        """Загружает звуки урока, звуки предыдущего урока освобождаются"""
+        self.clips = {path: self.clips.get(path) or self.load(path) for path in paths}
+
+    def play(self, path):
+        clip = self.clips.get(path)
+        if clip is None:
+            clip = self.clips[path] = self.load(path)
+        if clip is None:
+            return False
+        self.backend.play(path, clip)
+        return True
+
+    def stop(self):
+        self.backend.stop()
@@ -0,0 +1,153 @@
+"""
+Оценка трудности элементов по истории ответов (answer_events).
+История загружается в массивы NumPy, модель Раша (вероятность верного
+ответа = sigmoid(умение пользователя - трудность элемента)) подбирается
+шагами Ньютона, суммы по пользователям и элементам считаются np.bincount,
+без циклов Python по ответам. Вместо модели можно использовать долю ошибок.
+Трудность записывается в item_difficulty, по ней перестраиваются уроки:
+сначала лёгкие элементы, элементы без ответов - после них в прежнем порядке.
+Уроки программа читает из индекса уроков, поэтому новый порядок
+действует со следующего запуска. Номера уроков, сохранённые у
+пользователей, не изменяются.
+Запуск из корня проекта:
+    python -m data.calibration --types kanji words --method rasch --rebuild-lessons
+"""
+import argparse
+import logging
+from time import perf_counter, time
+
+import numpy as np
+
+from data import db_session, lessons
+from data.consts import *
+from data.models.difficulty import ItemDifficulty
+
+RASCH = 'rasch'
+ERROR_RATE = 'error_rate'
+LOAD_BATCH_SIZE = 100_000
+RASCH_ITERATIONS = 50
+RASCH_PRIOR = 1.0  # вес нормального априорного распределения умений и трудностей
+RASCH_TOLERANCE = 1e-4  # наибольшее изменение трудности для остановки
+MIN_ANSWERS = 5  # элементы с меньшим числом ответов не калибруются
+
+
+def load_answers(connection, element_type, batch_size=LOAD_BATCH_SIZE):
+    """
+    Ответы по элементам типа element_type: массивы id пользователей,
+    id элементов и верности ответа (0 / 1)
+    """
+    cursor = connection.connection.cursor()  # курсор DBAPI: строки без объектов ORM
+    cursor.execute('SELECT user_id, element_id, correct FROM answer_events WHERE element_type = ?',
+                   (element_type,))
+    parts = []
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        parts.append(np.array(rows, dtype=np.int64))
+    cursor.close()
+    answers = np.concatenate(parts) if parts else np.zeros((0, 3), dtype=np.int64)
+    return answers[:, 0], answers[:, 1], answers[:, 2].astype(np.float64)
+
+
+def error_rate_difficulty(item_index, correct, count_of_items):
+    """Логит сглаженной доли ошибок: (ошибки + 1) / (ответы + 2)"""
+    answers = np.bincount(item_index, minlength=count_of_items)
+    mistakes = answers - np.bincount(item_index, weights=correct, minlength=count_of_items)
+    rate = (mistakes + 1) / (answers + 2)
+    return np.log(rate / (1 - rate))
+
+
+def rasch_difficulty(user_index, item_index, correct, count_of_users, count_of_items,
+                     iterations=RASCH_ITERATIONS, prior=RASCH_PRIOR, tolerance=RASCH_TOLERANCE):
+    """
+    Совместная оценка умений и трудностей модели Раша с априорным
+    распределением N(0, 1 / prior): поочерёдные шаги Ньютона для умений
+    и трудностей по всем ответам сразу
+    """
+    difficulty = error_rate_difficulty(item_index, correct, count_of_items)
+    ability = np.zeros(count_of_users)
+    for iteration in range(iterations):
+        probability = 1 / (1 + np.exp(difficulty[item_index] - ability[user_index]))
+        residual = correct - probability
+        weight = probability * (1 - probability)
+        ability += (np.bincount(user_index, weights=residual, minlength=count_of_users) - prior * ability) \
+            / (np.bincount(user_index, weights=weight, minlength=count_of_users) + prior)
+
+        probability = 1 / (1 + np.exp(difficulty[item_index] - ability[user_index]))
+        residual = correct - probability
+        weight = probability * (1 - probability)
+        step = (np.bincount(item_index, weights=residual, minlength=count_of_items) + prior * difficulty) \
+            / (np.bincount(item_index, weights=weight, minlength=count_of_items) + prior)
+        difficulty -= step
+        if np.abs(step).max(initial=0) < tolerance:
+            break
+    logging.info(f'Rasch model fitted in {iteration + 1} iterations')
+    return difficulty
+
+
+def calibrate(connection, element_type, method=RASCH, min_answers=MIN_ANSWERS):
+    """Возвращает массивы id элементов, их трудности и количества ответов"""
+    user_ids, element_ids, correct = load_answers(connection, element_type)
+    items, item_index = np.unique(element_ids, return_inverse=True)
+    if method == RASCH:
+        users, user_index = np.unique(user_ids, return_inverse=True)
+        difficulty = rasch_difficulty(user_index, item_index, correct, len(users), len(items))
+    else:
+        difficulty = error_rate_difficulty(item_index, correct, len(items))
+    answers = np.bincount(item_index, minlength=len(items))
+    enough = answers >= min_answers
+    return items[enough], difficulty[enough], answers[enough]
+
+
+def save_difficulty(session, element_type, element_ids, difficulty, answers):
+    """Заменяет трудности элементов типа. Изменения не фиксируются (commit)"""
+    session.query(ItemDifficulty).filter(
+        ItemDifficulty.element_type == element_type).delete(synchronize_session=False)
+    calibrated_at = time()
+    session.bulk_insert_mappings(ItemDifficulty, [
+        {'element_type': element_type, 'element_id': element_id, 'difficulty': value,
+         'answers': count, 'calibrated_at': calibrated_at}
+        for element_id, value, count in zip(element_ids.tolist(), difficulty.tolist(), answers.tolist())])
+
+
+def ordered_by_difficulty(session, element_type):
+    """id элементов уроков: оценённые - от лёгких к трудным, остальные - в прежнем порядке"""
+    difficulty = dict(session.query(ItemDifficulty.element_id, ItemDifficulty.difficulty).filter(
+        ItemDifficulty.element_type == element_type))
+    ids = lessons.get_lesson_element_ids(session, element_type, 1)
+    calibrated = sorted((element_id for element_id in ids if element_id in difficulty),
+                        key=difficulty.get)
+    return calibrated + [element_id for element_id in ids if element_id not in difficulty]
+
+
+def calibrate_types(session, element_types, method=RASCH, rebuild=False):
+    """Калибровка типов элементов, при rebuild - перестроение их уроков"""
+    for element_type in element_types:
+        start = perf_counter()
+        element_ids, difficulty, answers = calibrate(session.connection(), element_type, method)
+        save_difficulty(session, element_type, element_ids, difficulty, answers)
+        if rebuild:
+            lessons.rebuild_lessons(session, element_type, ordered_by_difficulty(session, element_type))
+        logging.info(f'{element_type}: {len(element_ids)} items calibrated from {answers.sum()} answers '
+                     f'in {perf_counter() - start:.2f} s')
+        print(f'{element_type}: оценено элементов: {len(element_ids)}, ответов: {answers.sum()}, '
+              f'{perf_counter() - start:.2f} с')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Оценка трудности элементов по истории ответов')
+    parser.add_argument('--types', nargs='+', choices=list(CLASSES_BY_TYPES_OF_ELEMENTS),
+                        default=[KANJI, WORD])
+    parser.add_argument('--method', choices=[RASCH, ERROR_RATE], default=RASCH)
+    parser.add_argument('--rebuild-lessons', action='store_true',
+                        help='перестроить уроки от лёгких элементов к трудным')
+    parser.add_argument('--database', default=f'db/{DB_FILE_NAME}')
+    arguments = parser.parse_args()
+    db_session.global_init(arguments.database)
+    with db_session.unit_of_work() as session:
+        calibrate_types(session, arguments.types, arguments.method, arguments.rebuild_lessons)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Каталог каны, кандзи и слов в памяти.
+Каждая таблица загружается один раз запросом Core (без ORM) в компактные
+записи со __slots__, строки интернируются. Уроки, просмотр изученного
+и тесты получают элементы отсюда, не обращаясь к базе данных
+"""
+import logging
+from bisect import insort
+from sys import intern
+
+from sqlalchemy import select
+
+from data.consts import *
+from data.models.lessons import LessonElement
+
+
+class Record:
+    """Запись каталога только для чтения, поля совпадают со столбцами таблицы"""
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            if isinstance(value, str):
+                value = intern(value)
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Записи каталога доступны только для чтения')
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+    @classmethod
+    def from_model(cls, element):
+        return cls(*(getattr(element, name) for name in cls.__slots__))
+
+
+def columns_of(model):
+    return tuple(column.name for column in model.__table__.columns)
+
+
+class HiraganaRecord(Record):
+    __slots__ = columns_of(Hiragana)
+
+
+class KatakanaRecord(Record):
+    __slots__ = columns_of(Katakana)
+
+
+class KanjiRecord(Record):
+    __slots__ = columns_of(Kanji)
+
+
+class WordRecord(Record):
+    __slots__ = columns_of(Word)
+
+
+RECORDS_BY_TYPES_OF_ELEMENTS = {HIRAGANA: HiraganaRecord,
+                                KATAKANA: KatakanaRecord,
+                                KANJI: KanjiRecord,
+                                WORD: WordRecord}
+
+
+class Catalog:
+    def __init__(self):
+        self.elements = {element_type: {} for element_type in CLASSES_BY_TYPES_OF_ELEMENTS}
+        # тип -> {номер урока: [(позиция, id), ...]}
+        self.lessons = {element_type: {} for element_type in CLASSES_BY_TYPES_OF_ELEMENTS}
+        self.loaded = False
+
+    def load(self, session):
+        """Загрузка всех таблиц элементов и индекса уроков"""
+        for element_type, class_of_element in CLASSES_BY_TYPES_OF_ELEMENTS.items():
+            record_class = RECORDS_BY_TYPES_OF_ELEMENTS[element_type]
+            table = class_of_element.__table__
+            rows = session.execute(table.select()).fetchall()
+            self.elements[element_type] = {row[0]: record_class(*row) for row in rows}
+            self.lessons[element_type] = {}
+        table = LessonElement.__table__
+        query = select(
+            table.c.element_type, table.c.lesson_number, table.c.position, table.c.element_id
+        ).order_by(table.c.element_type, table.c.lesson_number, table.c.position)
+        for element_type, lesson_number, position, element_id in session.execute(query):
+            if element_type in self.lessons:
+                self.lessons[element_type].setdefault(lesson_number, []).append((position, element_id))
+        self.loaded = True
+        logging.info('Catalog loaded: ' + ', '.join(
+            f'{element_type}: {len(elements)}' for element_type, elements in self.elements.items()))
+
+    def add_element(self, element_type, element, lesson_element):
+        """Добавление нового элемента (модели ORM) и его места в уроках"""
+        record = RECORDS_BY_TYPES_OF_ELEMENTS[element_type].from_model(element)
+        self.elements[element_type][record.id] = record
+        lesson = self.lessons[element_type].setdefault(lesson_element.lesson_number, [])
+        insort(lesson, (lesson_element.position, record.id))
+        return record
+
+    def get(self, element_type, element_id):
+        return self.elements[element_type].get(element_id)
+
+    def get_lessons(self, element_type, first_lesson, last_lesson=None):
+        """Элементы уроков с first_lesson по last_lesson (None - до последнего)"""
+        lessons = self.lessons[element_type]
+        elements = self.elements[element_type]
+        result = []
+        for lesson_number in sorted(lessons):
+            if lesson_number < first_lesson:
+                continue
+            if last_lesson is not None and lesson_number > last_lesson:
+                break
+            result.extend(elements[element_id] for position, element_id in lessons[lesson_number]
+                          if element_id in elements)
+        return result
+
+
+catalog = Catalog()
@@ -12,6 +12,7 @@ SOUND = 21
 HARD = 2
 CONTINUE = 1
 NUMERABLE = -1
+REVIEW = 3  # элементы, время повторения которых наступило
 CLASSES_BY_TYPES_OF_ELEMENTS = {HIRAGANA: Hiragana,
                                 KATAKANA: Katakana,
                                 KANJI: Kanji,
@@ -23,6 +24,13 @@ TIME_FOR_ONE_ELEMENT = {  # допустимое время тестирован
     WORD: 4,
     KANJI: 7
 }
+# допустимое время ответа на один вопрос (в секундах), None - без ограничения
+TIME_FOR_ONE_QUESTION = {
+    HIRAGANA: None,
+    KATAKANA: None,
+    WORD: None,
+    KANJI: None
+}
 ERROR_PERCENT_FOR_TEST = 10  # допустимый процент ошибок для зачёта тестирования
 DB_FILE_NAME = 'Main.sqlite'
 LOG_FILE = 'Log.log'
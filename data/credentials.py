@@ -0,0 +1,126 @@
+"""Хеширование и проверка паролей вне потока интерфейса"""
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from data import db_session
+from data.models.users import User
+
+PASSWORD_HASH_TIME = 0.1  # желаемое время вычисления одного хеша (в секундах)
+MIN_HASH_ITERATIONS = 100_000
+MAX_HASH_ITERATIONS = 2_000_000
+CREDENTIAL_WORKERS = 2
+
+__hash_method = None
+__executor = None
+
+
+def calibrate_hash_method(target_time=PASSWORD_HASH_TIME):
+    """
+    Подбирает число итераций PBKDF2 так, чтобы хеширование на данном
+    компьютере занимало около target_time секунд.
+    Возвращает строку метода для generate_password_hash, например:
+    calibrate_hash_method() == 'pbkdf2:sha256:250000'
+    """
+    probe_iterations = 20_000
+    start = perf_counter()
+    hashlib.pbkdf2_hmac('sha256', b'password', b'calibration', probe_iterations)
+    spent = max(perf_counter() - start, 1e-6)
+    iterations = int(probe_iterations * target_time / spent)
+    iterations = min(max(iterations, MIN_HASH_ITERATIONS), MAX_HASH_ITERATIONS)
+    return f'pbkdf2:sha256:{iterations}'
+
+
+def get_hash_method():
+    global __hash_method
+    if not __hash_method:
+        __hash_method = calibrate_hash_method()
+        logging.info(f'Password hash method: {__hash_method}')
+    return __hash_method
+
+
+def hash_password(password):
+    return generate_password_hash(password, method=get_hash_method())
+
+
+def find_user_by_login(session, login):
+    """Поиск пользователя по уникальному индексу логина (одна строка)"""
+    return session.query(User).filter(User.login == login).first()
+
+
+def authenticate(session, login, password):
+    """
+    Возвращает пользователя (User) с указанными логином и паролем или None.
+    Проверяется хеш только одной найденной строки, поэтому время входа
+    не зависит от количества зарегистрированных пользователей
+    """
+    user = find_user_by_login(session, login)
+    if user and check_password_hash(user.password_hash, password):
+        return user
+    return None
+
+
+def create_user(session, login, password):
+    """Возвращает (User, '') или (None, описание ошибки)"""
+    if find_user_by_login(session, login):
+        return None, 'Такой логин уже занят!'
+    user = User(login=login, password_hash=hash_password(password))
+    session.add(user)
+    session.commit()
+    session.refresh(user)  # загрузка полей, пока сессия в рабочем потоке
+    return user, ''
+
+
+def get_executor():
+    global __executor
+    if not __executor:
+        __executor = ThreadPoolExecutor(max_workers=CREDENTIAL_WORKERS,
+                                        thread_name_prefix='credentials')
+    return __executor
+
+
+class CredentialService(QObject):
+    """
+    Выполняет вход и регистрацию в пуле потоков.
+    Результат возвращается в поток интерфейса сигналами:
+    login_finished(User или None)
+    register_finished(User или None, текст ошибки)
+    """
+    login_finished = pyqtSignal(object)
+    register_finished = pyqtSignal(object, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.busy = False
+
+    def login(self, login, password):
+        self.busy = True
+        get_executor().submit(self._login, login, password)
+
+    def register(self, login, password):
+        self.busy = True
+        get_executor().submit(self._register, login, password)
+
+    def _login(self, login, password):
+        user = None
+        try:
+            with db_session.read_only_session() as session:
+                user = authenticate(session, login, password)
+        except Exception as error:
+            logging.error(f'Login failed: {error}')
+        self.busy = False
+        self.login_finished.emit(user)
+
+    def _register(self, login, password):
+        user, message = None, 'Не удалось зарегистрироваться'
+        try:
+            with db_session.unit_of_work() as session:
+                user, message = create_user(session, login, password)
+        except Exception as error:
+            logging.error(f'Registration failed: {error}')
+        self.busy = False
+        self.register_finished.emit(user, message)
@@ -0,0 +1,113 @@
+"""
+Профили подключения к SQLite: режим журнала, синхронизация, размер кэша,
+отображение файла в память (mmap) и пул соединений.
+Настройки PRAGMA применяются к каждому новому соединению.
+Профиль выбирается переменной окружения NIHONGO_DB_PROFILE
+(durable, fast_local или kiosk), по умолчанию - durable.
+Профиль kiosk открывает базу только для чтения: таблицы не создаются
+и миграции не выполняются, поэтому база должна быть заранее подготовлена
+запуском с другим профилем. В нём недоступны регистрация, добавление
+слов и кандзи, а прогресс, ответы тестов и повторения не сохраняются.
+Режим журнала WAL включается только профилем fast_local: он меняет файл
+базы навсегда и ненадёжен на сетевых дисках, остальные профили сохраняют
+режим журнала файла
+"""
+import os
+
+import sqlalchemy as sa
+from sqlalchemy.pool import NullPool, QueuePool
+
+DURABLE = 'durable'
+FAST_LOCAL = 'fast_local'
+KIOSK = 'kiosk'
+DB_PROFILE_VARIABLE = 'NIHONGO_DB_PROFILE'
+
+
+def is_wal_database(db_file):
+    """Файл базы в режиме WAL (версии записи и чтения в заголовке равны 2)"""
+    try:
+        with open(db_file, 'rb') as file:
+            header = file.read(20)
+    except OSError:
+        return False
+    return len(header) == 20 and header[18] == header[19] == 2
+
+
+class EngineProfile:
+    """
+    journal_mode: 'WAL', 'DELETE' ... (None - не изменять)
+    synchronous: 'FULL', 'NORMAL', 'OFF'
+    cache_size: размер кэша страниц (отрицательный - в килобайтах)
+    mmap_size: размер отображаемой в память части файла (в байтах)
+    pool_size: соединений в пуле (0 - новое соединение на каждую сессию)
+    read_only: база открывается только для чтения
+    """
+
+    def __init__(self, journal_mode=None, synchronous=None, cache_size=None, mmap_size=None,
+                 pool_size=5, read_only=False):
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+        self.pool_size = pool_size
+        self.read_only = read_only
+
+    def pragmas(self):
+        pragmas = []
+        if self.journal_mode and not self.read_only:
+            pragmas.append(f'PRAGMA journal_mode = {self.journal_mode}')
+        if self.synchronous:
+            pragmas.append(f'PRAGMA synchronous = {self.synchronous}')
+        if self.cache_size is not None:
+            pragmas.append(f'PRAGMA cache_size = {self.cache_size}')
+        if self.mmap_size is not None:
+            pragmas.append(f'PRAGMA mmap_size = {self.mmap_size}')
+        if self.read_only:
+            pragmas.append('PRAGMA query_only = ON')
+        return pragmas
+
+    def url(self, db_file):
+        if self.read_only:
+            # базе WAL при чтении нужен файл -shm, который в папке только для чтения
+            # не создать; если незаписанного журнала -wal нет, файл читается как неизменяемый
+            if is_wal_database(db_file) and not os.path.exists(f'{db_file}-wal'):
+                return f'sqlite:///file:{db_file}?mode=ro&immutable=1&uri=true'
+            return f'sqlite:///file:{db_file}?mode=ro&uri=true'
+        return f'sqlite:///{db_file}'
+
+    def create_engine(self, db_file):
+        if self.pool_size:
+            pool_arguments = {'poolclass': QueuePool, 'pool_size': self.pool_size, 'max_overflow': 10}
+        else:
+            pool_arguments = {'poolclass': NullPool}
+        engine = sa.create_engine(self.url(db_file), echo=False,
+                                  connect_args={'check_same_thread': False}, **pool_arguments)
+        pragmas = self.pragmas()
+
+        @sa.event.listens_for(engine, 'connect')
+        def configure(connection, record):
+            cursor = connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+        return engine
+
+
+DB_PROFILES = {
+    # режим журнала файла без изменений, без потери зафиксированных транзакций при сбое питания
+    DURABLE: EngineProfile(synchronous='FULL', cache_size=-16_000, mmap_size=64 * 2 ** 20),
+    # локальная база, которую можно восстановить: WAL, при сбое теряются последние транзакции
+    FAST_LOCAL: EngineProfile(journal_mode='WAL', synchronous='NORMAL', cache_size=-64_000,
+                              mmap_size=256 * 2 ** 20),
+    # учебный компьютер в классе: только чтение каталога, результаты не сохраняются
+    KIOSK: EngineProfile(synchronous='OFF', cache_size=-64_000, mmap_size=256 * 2 ** 20,
+                         read_only=True),
+}
+
+
+def get_profile(name=None):
+    name = name or os.environ.get(DB_PROFILE_VARIABLE) or DURABLE
+    if name not in DB_PROFILES:
+        raise ValueError(f'Неизвестный профиль базы данных: {name}')
+    return name, DB_PROFILES[name]
@@ -1,16 +1,85 @@
-import sqlalchemy as sa
+import logging
+import os
+import threading
+import traceback
+import weakref
+from contextlib import contextmanager
+
 import sqlalchemy.orm as orm
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 import sqlalchemy.ext.declarative as dec
 
 SqlAlchemyBase = dec.declarative_base()
+DB_DEBUG_VARIABLE = 'NIHONGO_DB_DEBUG'  # 1 - запоминать, где создана каждая сессия
 
 __factory = None
+__read_only = False
+__debug = bool(os.environ.get(DB_DEBUG_VARIABLE))
+__lock = threading.Lock()
+__open_sessions = {}  # id сессии -> стек её создания (в режиме отладки) или None
+__checked_out_connections = 0
+
+
+class TrackedSession(Session):
+    """Сессия, учитываемая в счётчике открытых сессий до вызова close()"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        _session_opened(self)
+
+    def close(self):
+        super().close()
+        _session_closed(id(self))
+
+
+def _session_opened(session):
+    stack = ''.join(traceback.format_stack()[:-3]) if __debug else None
+    with __lock:
+        __open_sessions[id(session)] = stack
+    weakref.finalize(session, _session_collected, id(session))
+
+
+def _session_closed(session_id):
+    with __lock:
+        return __open_sessions.pop(session_id, None)
+
+
+def _session_collected(session_id):
+    """Сессия удалена сборщиком мусора без close() - утечка"""
+    with __lock:
+        if session_id not in __open_sessions:
+            return
+    stack = _session_closed(session_id)
+    logging.error('Database session was not closed' + (f', created at:\n{stack}' if stack else ''))
+
+
+def _check_out(*args):
+    global __checked_out_connections
+    with __lock:
+        __checked_out_connections += 1
+
+
+def _check_in(*args):
+    global __checked_out_connections
+    with __lock:
+        __checked_out_connections -= 1
+
 
+def _forbid_flush(session, flush_context, instances):
+    if session.info.get('read_only'):
+        raise RuntimeError('Изменение данных в сессии только для чтения')
 
-def global_init(db_file):
+
+event.listen(TrackedSession, 'before_flush', _forbid_flush)
+
+
+def global_init(db_file, profile=None):
+    """profile: имя профиля подключения из db_profiles.DB_PROFILES"""
     from . import all_models
-    global __factory
+    from .db_profiles import get_profile
+    from .migrations import check_schema, migrate
+    global __factory, __read_only
 
     if __factory:
         return
@@ -18,15 +87,82 @@ def global_init(db_file):
     if not db_file or not db_file.strip():
         raise Exception("Необходимо указать файл базы данных.")
 
-    conn_str = f'sqlite:///{db_file.strip()}?check_same_thread=False'
-    print(f"Подключение к базе данных по адресу {conn_str}")
+    profile_name, engine_profile = get_profile(profile)
+    engine = engine_profile.create_engine(db_file.strip())
+    print(f"Подключение к базе данных по адресу {engine.url} (профиль {profile_name})")
+    event.listen(engine, 'checkout', _check_out)
+    event.listen(engine, 'checkin', _check_in)
 
-    engine = sa.create_engine(conn_str, echo=False)
-    __factory = orm.sessionmaker(bind=engine)
+    if engine_profile.read_only:
+        check_schema(engine, SqlAlchemyBase.metadata)
+    else:
+        SqlAlchemyBase.metadata.create_all(engine)
+        migrate(engine)
 
-    SqlAlchemyBase.metadata.create_all(engine)
+    __factory = orm.sessionmaker(bind=engine, class_=TrackedSession)
+    __read_only = engine_profile.read_only
+
+
+def is_read_only():
+    """База открыта только для чтения: регистрация, прогресс и ответы не сохраняются"""
+    return __read_only
 
 
 def create_session() -> Session:
     global __factory
     return __factory()
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Сессия для изменения данных: при выходе из блока изменения фиксируются,
+    при исключении - откатываются, сессия закрывается в любом случае.
+    Объекты после закрытия сессии сохраняют загруженные значения
+    """
+    session = __factory(expire_on_commit=False)
+    try:
+        yield session
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+@contextmanager
+def read_only_session():
+    """
+    Сессия для чтения: изменения запрещены, после блока загруженные
+    объекты отсоединяются от сессии и используются без обращения к базе
+    """
+    session = __factory()
+    session.info['read_only'] = True
+    try:
+        yield session
+    finally:
+        session.expunge_all()
+        session.rollback()
+        session.close()
+
+
+def set_debug(enabled):
+    """Режим отладки: для каждой сессии запоминается стек её создания"""
+    global __debug
+    __debug = enabled
+
+
+def statistics():
+    with __lock:
+        return {'open_sessions': len(__open_sessions),
+                'checked_out_connections': __checked_out_connections}
+
+
+def report_leaks():
+    """Записывает в журнал незакрытые сессии, возвращает их количество"""
+    with __lock:
+        stacks = list(__open_sessions.values())
+    for stack in stacks:
+        logging.error('Database session is still open' + (f', created at:\n{stack}' if stack else ''))
+    return len(stacks)
@@ -0,0 +1,157 @@
+"""
+Заполнение таблиц word и kanji из словарей JMdict и KANJIDIC2.
+Файлы словарей разбираются потоково (iterparse), обработанные записи
+сразу освобождаются, поэтому потребление памяти не зависит от размера файла.
+После каждой пачки сохраняется контрольная точка, прерванный импорт
+продолжается с неё.
+Запуск из корня проекта:
+    python -m data.dictionary_import jmdict JMdict.xml --language rus
+    python -m data.dictionary_import kanjidic kanjidic2.xml --language en
+"""
+import argparse
+import json
+import logging
+import os
+import xml.etree.ElementTree as ElementTree
+from itertools import islice
+
+from data import db_session, lessons
+from data.consts import *
+from data.importer import BATCH_SIZE, SKIP, UPSERT, ImportResult, batches, clean_row, import_batch
+
+JMDICT = 'jmdict'
+KANJIDIC = 'kanjidic'
+CHECKPOINT_FILE = 'db/dictionary_import.json'
+XML_LANGUAGE = '{http://www.w3.org/XML/1998/namespace}lang'
+MEANINGS_COUNT = 3  # количество значений, сохраняемых в meaning
+MISSING_READING = '-'  # у части кандзи нет онъёми или кунъёми
+
+
+def iterate_elements(path, tag):
+    """
+    Элементы tag верхнего уровня по одному.
+    После обработки элемент удаляется из дерева, дерево не растёт
+    """
+    events = ElementTree.iterparse(path, events=('start', 'end'))
+    event, root = next(events)
+    for event, element in events:
+        if event == 'end' and element.tag == tag:
+            yield element
+            root.clear()
+
+
+def jmdict_rows(path, language='eng'):
+    """Слова JMdict: написание, первое чтение и значения на языке language"""
+    for entry in iterate_elements(path, 'entry'):
+        readings = [reb.text for reb in entry.iter('reb')]
+        writings = [keb.text for keb in entry.iter('keb')]
+        meanings = [gloss.text for gloss in entry.iter('gloss')
+                    if gloss.get(XML_LANGUAGE, 'eng') == language and gloss.text]
+        yield {'title': writings[0] if writings else readings[0] if readings else None,
+               'reading': readings[0] if readings else None,
+               'meaning': '; '.join(meanings[:MEANINGS_COUNT]) or None}
+
+
+def kanjidic_rows(path, language='en'):
+    """Кандзи KANJIDIC2: онъёми, кунъёми и значения на языке language"""
+    for character in iterate_elements(path, 'character'):
+        readings = {'ja_on': [], 'ja_kun': []}
+        for reading in character.iter('reading'):
+            if reading.get('r_type') in readings:
+                readings[reading.get('r_type')].append(reading.text)
+        meanings = [meaning.text for meaning in character.iter('meaning')
+                    if meaning.get('m_lang', 'en') == language]
+        yield {'title': character.findtext('literal'),
+               'onyomi_reading': ', '.join(readings['ja_on']) or MISSING_READING,
+               'kunyomi_reading': ', '.join(readings['ja_kun']) or MISSING_READING,
+               'meaning': ', '.join(meanings[:MEANINGS_COUNT]) or None}
+
+
+ROWS_BY_DICTIONARIES = {JMDICT: (WORD, jmdict_rows), KANJIDIC: (KANJI, kanjidic_rows)}
+
+
+class Checkpoint:
+    """Количество записей файла словаря, уже записанных в базу данных"""
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = os.path.abspath(source)
+        self.size = os.path.getsize(source)
+        self.entries = 0
+        self.result = ImportResult()
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get('source') == self.source and data.get('size') == self.size:
+                self.entries = data['entries']
+                self.result.__dict__.update(data['result'])
+
+    def save(self):
+        if not self.path:
+            return
+        temporary_path = f'{self.path}.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump({'source': self.source, 'size': self.size, 'entries': self.entries,
+                       'result': self.result.__dict__}, file)
+        os.replace(temporary_path, self.path)
+
+    def remove(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def import_dictionary(session, dictionary, path, language=None, policy=SKIP,
+                      batch_size=BATCH_SIZE, checkpoint_path=CHECKPOINT_FILE):
+    """
+    Импортирует словарь JMDICT или KANJIDIC из файла path.
+    Каждая пачка фиксируется вместе с контрольной точкой, при повторном
+    запуске уже записанные записи пропускаются без обращения к базе данных
+    """
+    element_type, rows_of_dictionary = ROWS_BY_DICTIONARIES[dictionary]
+    rows = rows_of_dictionary(path, language) if language else rows_of_dictionary(path)
+    checkpoint = Checkpoint(checkpoint_path, path)
+    if checkpoint.entries:
+        logging.info(f'Dictionary import of {path} resumed after {checkpoint.entries} entries')
+    for row in islice(rows, checkpoint.entries):
+        pass  # записи, сохранённые при прошлом запуске, только разбираются
+    for batch in batches(rows, batch_size):
+        cleaned = []
+        for row in batch:
+            row = clean_row(element_type, row)
+            if row:
+                cleaned.append(row)
+            else:
+                checkpoint.result.invalid += 1
+        try:
+            import_batch(session, element_type, cleaned, policy, checkpoint.result)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        checkpoint.entries += len(batch)
+        checkpoint.save()
+    checkpoint.remove()
+    logging.info(f'Dictionary import of {path} finished: {checkpoint.result}')
+    return checkpoint.result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Импорт словаря JMdict или KANJIDIC2')
+    parser.add_argument('dictionary', choices=list(ROWS_BY_DICTIONARIES))
+    parser.add_argument('path')
+    parser.add_argument('--language', help='язык значений: rus, eng (JMdict) или en, fr (KANJIDIC2)')
+    parser.add_argument('--policy', choices=[SKIP, UPSERT], default=SKIP)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE)
+    parser.add_argument('--database', default=f'db/{DB_FILE_NAME}')
+    arguments = parser.parse_args()
+    db_session.global_init(arguments.database)
+    with db_session.unit_of_work() as session:
+        lessons.ensure_lesson_index(session)
+        result = import_dictionary(session, arguments.dictionary, arguments.path, arguments.language,
+                                   arguments.policy, arguments.batch_size, arguments.checkpoint)
+    print(result)
+
+
+if __name__ == '__main__':
+    main()
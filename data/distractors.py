@@ -0,0 +1,49 @@
+"""Выбор неправильных вариантов ответа (дистракторов) для вопросов теста"""
+from random import Random
+
+COUNT_OF_DISTRACTORS = 3
+
+
+class DistractorSampler:
+    """
+    Создаётся один раз на тест. Выбор вариантов для вопроса выполняется
+    за O(1): случайные индексы пула выбираются без копирования списка.
+    Если передана функция confusable (id -> id похожих элементов),
+    сначала берутся самые похожие элементы пула, остальные - случайно.
+    При одинаковом seed результат всегда одинаков
+    """
+
+    def __init__(self, elements, seed=None, random=None, confusable=None):
+        self.elements = elements
+        self.random = random or Random(seed)
+        self.confusable = confusable
+        self.index_by_id = {}
+        if confusable:
+            self.index_by_id = {element.id: index for index, element in enumerate(elements)}
+
+    def sample(self, correct_index, count=COUNT_OF_DISTRACTORS):
+        """Индексы count различных элементов пула, кроме correct_index"""
+        count = min(count, len(self.elements) - 1)
+        chosen = []
+        if self.confusable:
+            for element_id in self.confusable(self.elements[correct_index].id):
+                index = self.index_by_id.get(element_id)
+                if index is not None and index != correct_index and index not in chosen:
+                    chosen.append(index)
+                    if len(chosen) == count:
+                        break
+        while len(chosen) < count:
+            index = self.random.randrange(len(self.elements))
+            if index != correct_index and index not in chosen:
+                chosen.append(index)
+        return chosen
+
+    def question_elements(self, correct_index, count=COUNT_OF_DISTRACTORS):
+        """
+        Возвращает список из count + 1 элементов в случайном порядке,
+        включая элемент correct_index (правильный ответ)
+        """
+        result = [self.elements[index] for index in self.sample(correct_index, count)]
+        result.append(self.elements[correct_index])
+        self.random.shuffle(result)
+        return result
@@ -0,0 +1,72 @@
+"""
+Обработка изображений, выбранных пользователем, вне потока интерфейса.
+Декодирование и уменьшение выполняются в пуле процессов, результат
+сохраняется в кеш миниатюр под именем по хешу содержимого исходного файла.
+Исходный файл не изменяется
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from data.media import file_digest
+
+THUMBNAIL_SIZE = (240, 240)
+THUMBNAILS_DIRECTORY = os.path.join('images_and_sounds', 'thumbnails')
+IMAGE_WORKERS = 2
+
+__executor = None
+
+
+def make_thumbnail(source, directory=THUMBNAILS_DIRECTORY, size=THUMBNAIL_SIZE):
+    """
+    Возвращает путь к миниатюре изображения source.
+    Одинаковые изображения дают одну миниатюру, повторно она не создаётся
+    """
+    width, height = size
+    path = os.path.join(directory, f'{file_digest(source)}_{width}x{height}.png')
+    if os.path.exists(path):
+        return path
+    os.makedirs(directory, exist_ok=True)
+    with Image.open(source) as image:
+        thumbnail = image.resize(size, Image.LANCZOS)
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    thumbnail.save(temporary_path, 'PNG')
+    os.replace(temporary_path, path)
+    return path
+
+
+def get_executor():
+    global __executor
+    if not __executor:
+        # процессы запускаются заново (spawn), а не копией программы с потоками Qt (fork)
+        __executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS,
+                                         mp_context=multiprocessing.get_context('spawn'))
+    return __executor
+
+
+class ImageIngestor(QObject):
+    """
+    Создаёт миниатюры в фоне и отправляет сигнал thumbnail_ready(исходный путь,
+    путь к миниатюре). При ошибке путь к миниатюре - пустая строка
+    """
+    thumbnail_ready = pyqtSignal(str, str)
+
+    def __init__(self, parent=None, directory=THUMBNAILS_DIRECTORY):
+        super().__init__(parent)
+        self.directory = directory
+
+    def ingest(self, source):
+        future = get_executor().submit(make_thumbnail, source, self.directory)
+        future.add_done_callback(lambda done: self._finish(source, done))
+
+    def _finish(self, source, future):
+        try:
+            path = future.result()
+        except Exception as error:
+            logging.error(f'Thumbnail was not created for {source}: {error}')
+            path = ''
+        self.thumbnail_ready.emit(source, path)
@@ -0,0 +1,213 @@
+"""
+Массовый импорт слов и кандзи из файлов CSV или JSONL.
+Файл читается построчно, строки записываются пачками (одна транзакция
+на пачку), медиафайлы копируются в хранилище параллельно.
+Столбцы файла совпадают со столбцами таблиц word и kanji, пути
+к медиафайлам указываются относительно файла импорта. При обновлении
+(upsert) изменяются только столбцы, заполненные в строке файла.
+Запуск из корня проекта:
+    python -m data.importer words deck.csv --policy upsert
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from sqlalchemy import bindparam, func, select
+
+from data import db_session, lessons
+from data.consts import *
+from data.media import media_store
+
+BATCH_SIZE = 1000
+MEDIA_WORKERS = 4
+SKIP = 'skip'  # существующие элементы не изменяются
+UPSERT = 'upsert'  # существующие элементы обновляются
+IMPORT_COLUMNS = {
+    WORD: ('title', 'reading', 'meaning', 'path_to_sound', 'path_to_image'),
+    KANJI: ('title', 'onyomi_reading', 'kunyomi_reading', 'meaning', 'examples',
+            'path_to_sound', 'path_to_image')
+}
+REQUIRED_COLUMNS = {
+    WORD: ('title', 'reading', 'meaning'),
+    KANJI: ('title', 'onyomi_reading', 'kunyomi_reading', 'meaning')
+}
+KEY_COLUMNS = {  # столбцы, по которым элемент считается уже существующим
+    WORD: ('title', 'reading'),
+    KANJI: ('title',)
+}
+MEDIA_COLUMNS = ('path_to_sound', 'path_to_image')
+
+
+class ImportResult:
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.skipped = 0
+        self.invalid = 0
+
+    def __str__(self):
+        return (f'добавлено: {self.inserted}, обновлено: {self.updated}, '
+                f'пропущено: {self.skipped}, с ошибками: {self.invalid}')
+
+
+def read_rows(path):
+    """Строки файла CSV (с заголовком) или JSONL в виде словарей, по одной"""
+    with open(path, encoding='utf-8', newline='') as file:
+        if path.lower().endswith('.csv'):
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def clean_row(element_type, row):
+    """Строка только со столбцами таблицы или None, если не хватает обязательных"""
+    row = {column: (row.get(column) or '').strip() or None for column in IMPORT_COLUMNS[element_type]}
+    if not all(row[column] for column in REQUIRED_COLUMNS[element_type]):
+        return None
+    return row
+
+
+class MediaCopier:
+    """Параллельное копирование медиафайлов в хранилище, каждый файл копируется один раз"""
+
+    def __init__(self, base_directory, workers=MEDIA_WORKERS, store=media_store):
+        self.base_directory = base_directory
+        self.media = store
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='import_media')
+        self.references = {}
+
+    def put(self, path):
+        try:
+            return self.media.put(os.path.join(self.base_directory, path))
+        except OSError as error:
+            logging.error(f'Media file was not imported: {error}')
+            return None
+
+    def store(self, rows):
+        paths = {row[column] for row in rows for column in MEDIA_COLUMNS if row[column]}
+        paths -= self.references.keys()
+        self.references.update(zip(paths, self.executor.map(self.put, paths)))
+        for row in rows:
+            for column in MEDIA_COLUMNS:
+                if row[column]:
+                    row[column] = self.references[row[column]]
+
+    def close(self):
+        self.executor.shutdown()
+
+
+def existing_ids(session, element_type, keys):
+    """Ключ -> id для уже сохранённых элементов с данными ключами"""
+    table = CLASSES_BY_TYPES_OF_ELEMENTS[element_type].__table__
+    key_columns = [table.c[column] for column in KEY_COLUMNS[element_type]]
+    keys = set(keys)
+    titles = list({key[0] for key in keys})
+    result = {}
+    for start in range(0, len(titles), lessons.SQL_VARIABLES_LIMIT):
+        query = select(table.c.id, *key_columns).where(
+            table.c.title.in_(titles[start:start + lessons.SQL_VARIABLES_LIMIT]))
+        for element_id, *key in session.execute(query):
+            if tuple(key) in keys:
+                result[tuple(key)] = element_id
+    return result
+
+
+def import_batch(session, element_type, rows, policy, result):
+    class_of_element = CLASSES_BY_TYPES_OF_ELEMENTS[element_type]
+    table = class_of_element.__table__
+    key_columns = KEY_COLUMNS[element_type]
+    rows_by_key = {}
+    for row in rows:  # повтор ключа внутри файла: при UPSERT побеждает последняя строка
+        key = tuple(row[column] for column in key_columns)
+        if key in rows_by_key:
+            result.skipped += 1
+        if key not in rows_by_key or policy == UPSERT:
+            rows_by_key[key] = row
+    ids = existing_ids(session, element_type, rows_by_key)
+    new_rows = [row for key, row in rows_by_key.items() if key not in ids]
+    if new_rows:
+        last_id = session.execute(select(func.max(table.c.id))).scalar() or 0
+        session.execute(table.insert(), new_rows)
+        # новые строки получают id больше прежнего максимального в порядке вставки
+        new_ids = session.execute(select(table.c.id).where(table.c.id > last_id).order_by(table.c.id))
+        lessons.append_elements_to_lessons(session, element_type, [row.id for row in new_ids])
+        result.inserted += len(new_rows)
+    if policy == UPSERT and ids:
+        columns = [column for column in IMPORT_COLUMNS[element_type] if column not in key_columns]
+        # имена параметров не должны совпадать с именами столбцов; пустое значение
+        # (нет столбца в файле, медиафайл не скопирован) не стирает сохранённое
+        statement = table.update().where(table.c.id == bindparam('element_id')).values(
+            {column: func.coalesce(bindparam(f'new_{column}'), table.c[column]) for column in columns})
+        session.execute(statement, [
+            dict({f'new_{column}': rows_by_key[key][column] for column in columns}, element_id=element_id)
+            for key, element_id in ids.items()])
+        result.updated += len(ids)
+    elif ids:
+        result.skipped += len(ids)
+
+
+def import_elements(session, element_type, path, policy=SKIP, batch_size=BATCH_SIZE,
+                    media_workers=MEDIA_WORKERS, store=media_store):
+    """
+    Импортирует слова (WORD) или кандзи (KANJI) из файла path.
+    Каждая пачка из batch_size строк фиксируется отдельной транзакцией.
+    Работающая программа увидит новые элементы после перезагрузки каталога
+    """
+    if policy not in (SKIP, UPSERT):
+        raise ValueError(f'Неизвестная политика импорта: {policy}')
+    result = ImportResult()
+    copier = MediaCopier(os.path.dirname(os.path.abspath(path)), media_workers, store)
+    try:
+        for batch in batches(read_rows(path), batch_size):
+            rows = []
+            for row in batch:
+                row = clean_row(element_type, row)
+                if row:
+                    rows.append(row)
+                else:
+                    result.invalid += 1
+            copier.store(rows)
+            import_batch(session, element_type, rows, policy, result)
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        copier.close()
+    logging.info(f'Import of {path} finished: {result}')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Импорт слов или кандзи из CSV или JSONL')
+    parser.add_argument('element_type', choices=[WORD, KANJI])
+    parser.add_argument('path')
+    parser.add_argument('--policy', choices=[SKIP, UPSERT], default=SKIP)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--database', default=f'db/{DB_FILE_NAME}')
+    arguments = parser.parse_args()
+    db_session.global_init(arguments.database)
+    with db_session.unit_of_work() as session:
+        lessons.ensure_lesson_index(session)
+        result = import_elements(session, arguments.element_type, arguments.path,
+                                 arguments.policy, arguments.batch_size)
+    print(result)
+
+
+if __name__ == '__main__':
+    main()
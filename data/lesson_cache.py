@@ -0,0 +1,45 @@
+"""Кэш уроков, чтобы повтор урока или теста не обращался к базе данных"""
+import logging
+from collections import OrderedDict
+
+LESSON_CACHE_SIZE = 32  # количество хранимых уроков
+
+
+class LessonCache:
+    """
+    LRU-кэш списков элементов уроков.
+    Ключ: (тип элемента, тип урока, номер урока, прогресс пользователя)
+    После любого изменения элементов или прогресса вызывается invalidate()
+    """
+
+    def __init__(self, max_size=LESSON_CACHE_SIZE):
+        self.max_size = max_size
+        self.lessons = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Возвращает копию списка элементов урока или None"""
+        elements = self.lessons.get(key)
+        if elements is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.lessons.move_to_end(key)
+        return list(elements)  # тест перемешивает полученный список
+
+    def put(self, key, elements):
+        self.lessons[key] = list(elements)
+        self.lessons.move_to_end(key)
+        while len(self.lessons) > self.max_size:
+            self.lessons.popitem(last=False)
+
+    def invalidate(self):
+        self.lessons.clear()
+        logging.info(f'Lesson cache invalidated, {self.stats()}')
+
+    def stats(self):
+        return f'hits: {self.hits}, misses: {self.misses}, lessons: {len(self.lessons)}'
+
+
+lesson_cache = LessonCache()
@@ -0,0 +1,106 @@
+"""
+Индекс уроков: упорядоченное соответствие (тип, номер урока) -> id элементов.
+Урок больше не вычисляется по диапазону id, поэтому пропуски id после
+удаления строк не сдвигают уроки, а уроки можно переупорядочить
+или изменить их размер без перенумерации строк
+"""
+from sqlalchemy import func
+
+from data.consts import CLASSES_BY_TYPES_OF_ELEMENTS, COUNT_OF_LEARNING
+from data.models.lessons import LessonElement
+
+SQL_VARIABLES_LIMIT = 500  # ограничение на количество параметров в одном IN (...)
+
+
+def rebuild_lessons(session, element_type, ordered_ids, lesson_size=COUNT_OF_LEARNING):
+    """
+    Перестраивает уроки данного типа по списку id в нужном порядке.
+    Строки таблиц элементов не изменяются. Изменения не фиксируются (commit)
+    """
+    session.query(LessonElement).filter(
+        LessonElement.element_type == element_type).delete(synchronize_session=False)
+    session.bulk_insert_mappings(LessonElement, [
+        {'element_type': element_type,
+         'lesson_number': index // lesson_size + 1,
+         'position': index % lesson_size,
+         'element_id': element_id}
+        for index, element_id in enumerate(ordered_ids)
+    ])
+
+
+def ensure_lesson_index(session):
+    """Строит индекс уроков для типов, у которых его ещё нет (порядок по id)"""
+    for element_type, class_of_element in CLASSES_BY_TYPES_OF_ELEMENTS.items():
+        indexed = session.query(LessonElement.id).filter(
+            LessonElement.element_type == element_type).first()
+        if not indexed:
+            ids = [row.id for row in session.query(class_of_element.id).order_by(class_of_element.id)]
+            rebuild_lessons(session, element_type, ids)
+    session.commit()
+
+
+def last_lesson_state(session, element_type):
+    """Номер последнего урока, количество элементов в нём и последняя позиция"""
+    return session.query(
+        LessonElement.lesson_number, func.count(LessonElement.id), func.max(LessonElement.position)
+    ).filter(LessonElement.element_type == element_type).group_by(
+        LessonElement.lesson_number).order_by(LessonElement.lesson_number.desc()).first() or (1, 0, -1)
+
+
+def add_element_to_lessons(session, element_type, element_id, lesson_size=COUNT_OF_LEARNING):
+    """
+    Добавляет элемент в конец последнего урока (или открывает новый урок,
+    если последний заполнен). Возвращает созданный LessonElement.
+    Изменения не фиксируются (commit)
+    """
+    last_lesson, count, last_position = last_lesson_state(session, element_type)
+    if count >= lesson_size:
+        last_lesson, last_position = last_lesson + 1, -1
+    lesson_element = LessonElement(element_type=element_type, lesson_number=last_lesson,
+                                   position=last_position + 1, element_id=element_id)
+    session.add(lesson_element)
+    return lesson_element
+
+
+def append_elements_to_lessons(session, element_type, element_ids, lesson_size=COUNT_OF_LEARNING):
+    """
+    Добавляет элементы в конец уроков одной вставкой, как последовательные
+    вызовы add_element_to_lessons. Изменения не фиксируются (commit)
+    """
+    last_lesson, count, last_position = last_lesson_state(session, element_type)
+    rows = []
+    for element_id in element_ids:
+        if count >= lesson_size:
+            last_lesson, count, last_position = last_lesson + 1, 0, -1
+        count += 1
+        last_position += 1
+        rows.append({'element_type': element_type, 'lesson_number': last_lesson,
+                     'position': last_position, 'element_id': element_id})
+    session.bulk_insert_mappings(LessonElement, rows)
+
+
+def get_lesson_element_ids(session, element_type, first_lesson, last_lesson=None):
+    """id элементов уроков с first_lesson по last_lesson (None - до последнего)"""
+    query = session.query(LessonElement.element_id).filter(
+        LessonElement.element_type == element_type,
+        LessonElement.lesson_number >= first_lesson)
+    if last_lesson is not None:
+        query = query.filter(LessonElement.lesson_number <= last_lesson)
+    query = query.order_by(LessonElement.lesson_number, LessonElement.position)
+    return [row.element_id for row in query]
+
+
+def load_lesson_elements(session, element_type, first_lesson, last_lesson=None):
+    """
+    Возвращает элементы уроков в порядке индекса:
+    один запрос к индексу уроков и загрузка строк по первичному ключу
+    """
+    class_of_element = CLASSES_BY_TYPES_OF_ELEMENTS[element_type]
+    ids = get_lesson_element_ids(session, element_type, first_lesson, last_lesson)
+    elements_by_id = {}
+    for start in range(0, len(ids), SQL_VARIABLES_LIMIT):
+        chunk = ids[start:start + SQL_VARIABLES_LIMIT]
+        for element in session.query(class_of_element).filter(class_of_element.id.in_(chunk)):
+            elements_by_id[element.id] = element
+    return [elements_by_id[element_id] for element_id in ids if element_id in elements_by_id]
+
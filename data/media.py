@@ -0,0 +1,78 @@
+"""
+Хранилище изображений и звуков с адресацией по содержимому.
+Файл сохраняется под именем SHA-256 своего содержимого, поэтому одинаковые
+файлы хранятся один раз. В базе данных хранится только ссылка
+'<хеш>.<расширение>', путь к файлу получается через MediaStore.path
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+MEDIA_DIRECTORY = os.path.join('images_and_sounds', 'media')
+HASH_CHUNK_SIZE = 1024 * 1024
+REFERENCE_PATTERN = re.compile(r'^[0-9a-f]{64}(\.\w+)?$')
+
+
+def file_digest(path, chunk_size=HASH_CHUNK_SIZE):
+    """SHA-256 содержимого файла, файл читается частями"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_reference(value):
+    return bool(value) and bool(REFERENCE_PATTERN.match(value))
+
+
+class MediaStore:
+    def __init__(self, directory=MEDIA_DIRECTORY):
+        self.directory = directory
+
+    def path(self, reference):
+        """
+        Путь к файлу по ссылке из базы данных.
+        Пути, сохранённые до появления хранилища, возвращаются как есть
+        (с разделителями текущей системы):
+        path('images_and_sounds\\Kanji\\本\\image.jpg') == 'images_and_sounds/Kanji/本/image.jpg'
+        """
+        if not reference:
+            return ''
+        if not is_reference(reference):
+            return reference.replace('\\', os.sep).replace('/', os.sep)
+        return os.path.join(self.directory, reference[:2], reference)
+
+    def put(self, source, chunk_size=HASH_CHUNK_SIZE):
+        """
+        Копирует файл source в хранилище и возвращает ссылку на него.
+        Копирование и хеширование выполняются за один проход частями,
+        файл появляется в хранилище только целиком
+        """
+        extension = os.path.splitext(source)[1].lower()
+        os.makedirs(self.directory, exist_ok=True)
+        digest = hashlib.sha256()
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with open(source, 'rb') as source_file, os.fdopen(descriptor, 'wb') as file:
+                for chunk in iter(lambda: source_file.read(chunk_size), b''):
+                    digest.update(chunk)
+                    file.write(chunk)
+                file.flush()
+                os.fsync(file.fileno())
+            reference = f'{digest.hexdigest()}{extension}'
+            path = self.path(reference)
+            if os.path.exists(path):  # такой файл уже сохранён
+                os.remove(temporary_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temporary_path, path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        return reference
+
+
+media_store = MediaStore()
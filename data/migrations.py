@@ -0,0 +1,108 @@
+"""
+Версионные миграции схемы базы данных.
+Версия схемы хранится в PRAGMA user_version файла SQLite, при запуске
+программы (db_session.global_init) применяются миграции с номером больше
+сохранённого. Новая версия записывается после выполнения миграции,
+а миграции можно выполнять повторно, поэтому прерванная миграция
+просто повторяется при следующем запуске
+"""
+import logging
+
+from sqlalchemy import text
+
+from data.answer_statistics import rebuild_statistics
+
+# индексы, по которым программа никогда не ищет: {имя: (таблица, столбец)}
+UNUSED_INDEXES = {
+    'ix_users_password_hash': ('users', 'password_hash'),
+    'ix_users_hiragana_save': ('users', 'hiragana_save'),
+    'ix_users_katakana_save': ('users', 'katakana_save'),
+    'ix_users_kanji_save': ('users', 'kanji_save'),
+    'ix_users_words_save': ('users', 'words_save'),
+    'ix_hiragana_reading': ('hiragana', 'reading'),
+    'ix_hiragana_path_to_sound': ('hiragana', 'path_to_sound'),
+    'ix_katakana_reading': ('katakana', 'reading'),
+    'ix_katakana_path_to_sound': ('katakana', 'path_to_sound'),
+    'ix_kanji_onyomi_reading': ('kanji', 'onyomi_reading'),
+    'ix_kanji_kunyomi_reading': ('kanji', 'kunyomi_reading'),
+    'ix_kanji_meaning': ('kanji', 'meaning'),
+    'ix_kanji_examples': ('kanji', 'examples'),
+    'ix_kanji_path_to_sound': ('kanji', 'path_to_sound'),
+    'ix_kanji_path_to_image': ('kanji', 'path_to_image'),
+    'ix_word_title': ('word', 'title'),  # заменён индексом (title, reading)
+    'ix_word_reading': ('word', 'reading'),
+    'ix_word_meaning': ('word', 'meaning'),
+    'ix_word_path_to_sound': ('word', 'path_to_sound'),
+    'ix_word_path_to_image': ('word', 'path_to_image'),
+}
+
+
+def is_unique_index(connection, table, name):
+    for row in connection.execute(text(f'PRAGMA index_list({table})')):
+        if row.name == name:
+            return bool(row.unique)
+    return False
+
+
+def drop_unused_indexes(connection):
+    for name in UNUSED_INDEXES:
+        connection.execute(text(f'DROP INDEX IF EXISTS {name}'))
+
+
+def add_lookup_indexes(connection):
+    """Уникальный индекс логина и индекс поиска слова по написанию и чтению"""
+    if not is_unique_index(connection, 'users', 'ix_users_login'):
+        duplicates = connection.execute(text(
+            'SELECT login FROM users GROUP BY login HAVING count(*) > 1')).scalars().all()
+        connection.execute(text('DROP INDEX IF EXISTS ix_users_login'))
+        if duplicates:  # уникальность нарушена старыми данными, индекс только ускоряет поиск
+            logging.error(f'Duplicate logins, login index is not unique: {duplicates}')
+            connection.execute(text('CREATE INDEX ix_users_login ON users (login)'))
+        else:
+            connection.execute(text('CREATE UNIQUE INDEX ix_users_login ON users (login)'))
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_word_title_reading ON word (title, reading)'))
+
+
+MIGRATIONS = [  # (версия, описание, функция(connection)), по возрастанию версий
+    (1, 'drop unused indexes', drop_unused_indexes),
+    (2, 'add lookup indexes', add_lookup_indexes),
+    (3, 'build answer statistics', rebuild_statistics),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(connection):
+    return connection.execute(text('PRAGMA user_version')).scalar()
+
+
+def check_schema(engine, metadata):
+    """
+    Проверка базы, открытой только для чтения: миграции не выполняются,
+    поэтому схема уже должна быть последней версии
+    """
+    with engine.connect() as connection:
+        version = get_version(connection)
+        tables = set(connection.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")).scalars())
+    missing = sorted(set(metadata.tables) - tables)
+    if version < SCHEMA_VERSION or missing:
+        raise RuntimeError(
+            f'База данных {engine.url.database} не подготовлена для работы только для чтения: '
+            f'версия схемы {version} из {SCHEMA_VERSION}'
+            + (f', нет таблиц {", ".join(missing)}' if missing else '')
+            + '. Запустите программу один раз с профилем durable')
+
+
+def migrate(engine):
+    """Применяет недостающие миграции, возвращает итоговую версию схемы"""
+    with engine.connect() as connection:
+        version = get_version(connection)
+    for migration_version, description, migration in MIGRATIONS:
+        if migration_version <= version:
+            continue
+        with engine.begin() as connection:
+            migration(connection)
+            connection.execute(text(f'PRAGMA user_version = {migration_version}'))
+        logging.info(f'Database migrated to version {migration_version}: {description}')
+        version = migration_version
+    return version
@@ -0,0 +1,36 @@
+import sqlalchemy
+from data.db_session import SqlAlchemyBase
+
+
+class CategoryStatistics(SqlAlchemyBase):
+    """Итоги ответов пользователя по разделу, обновляются вместе с записью ответов"""
+    __tablename__ = 'category_statistics'
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint('user_id', 'element_type', name='uq_category_statistics_category'),
+    )
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True, autoincrement=True)
+    user_id = sqlalchemy.Column(sqlalchemy.Integer, sqlalchemy.ForeignKey('users.id'), nullable=False)
+    element_type = sqlalchemy.Column(sqlalchemy.String, nullable=False)
+    answers = sqlalchemy.Column(sqlalchemy.Integer, nullable=False, default=0)
+    correct = sqlalchemy.Column(sqlalchemy.Integer, nullable=False, default=0)
+    latency_sum = sqlalchemy.Column(sqlalchemy.Float, nullable=False, default=0)  # в секундах
+    streak = sqlalchemy.Column(sqlalchemy.Integer, nullable=False, default=0)  # верных ответов подряд
+    best_streak = sqlalchemy.Column(sqlalchemy.Integer, nullable=False, default=0)
+
+
+class ItemStatistics(SqlAlchemyBase):
+    """Итоги ответов пользователя по одному элементу"""
+    __tablename__ = 'item_statistics'
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint('user_id', 'element_type', 'element_id', name='uq_item_statistics_element'),
+    )
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True, autoincrement=True)
+    user_id = sqlalchemy.Column(sqlalchemy.Integer, sqlalchemy.ForeignKey('users.id'), nullable=False)
+    element_type = sqlalchemy.Column(sqlalchemy.String, nullable=False)
+    element_id = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
+    answers = sqlalchemy.Column(sqlalchemy.Integer, nullable=False, default=0)
+    correct = sqlalchemy.Column(sqlalchemy.Integer, nullable=False, default=0)
+    latency_sum = sqlalchemy.Column(sqlalchemy.Float, nullable=False, default=0)
+    streak = sqlalchemy.Column(sqlalchemy.Integer, nullable=False, default=0)
+    best_streak = sqlalchemy.Column(sqlalchemy.Integer, nullable=False, default=0)
+    last_answered_at = sqlalchemy.Column(sqlalchemy.Float, nullable=True)  # time.time()
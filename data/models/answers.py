@@ -0,0 +1,15 @@
+import sqlalchemy
+from data.db_session import SqlAlchemyBase
+
+
+class AnswerEvent(SqlAlchemyBase):
+    """Ответ пользователя на вопрос теста"""
+    __tablename__ = 'answer_events'
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True, autoincrement=True)
+    user_id = sqlalchemy.Column(sqlalchemy.Integer, sqlalchemy.ForeignKey('users.id'), nullable=False)
+    element_type = sqlalchemy.Column(sqlalchemy.String, nullable=False)
+    element_id = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
+    chosen = sqlalchemy.Column(sqlalchemy.String, nullable=True)  # текст выбранного варианта
+    correct = sqlalchemy.Column(sqlalchemy.Boolean, nullable=False)
+    latency = sqlalchemy.Column(sqlalchemy.Float, nullable=False)  # время ответа (в секундах)
+    answered_at = sqlalchemy.Column(sqlalchemy.Float, nullable=False)  # time.time()
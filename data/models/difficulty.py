@@ -0,0 +1,16 @@
+import sqlalchemy
+from data.db_session import SqlAlchemyBase
+
+
+class ItemDifficulty(SqlAlchemyBase):
+    """Трудность элемента, оценённая по истории ответов (data/calibration.py)"""
+    __tablename__ = 'item_difficulty'
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint('element_type', 'element_id', name='uq_item_difficulty_element'),
+    )
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True, autoincrement=True)
+    element_type = sqlalchemy.Column(sqlalchemy.String, nullable=False)
+    element_id = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
+    difficulty = sqlalchemy.Column(sqlalchemy.Float, nullable=False)  # больше - труднее
+    answers = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
+    calibrated_at = sqlalchemy.Column(sqlalchemy.Float, nullable=False)  # time.time()
@@ -6,5 +6,5 @@ class Katakana(SqlAlchemyBase):
     __tablename__ = 'katakana'
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True, autoincrement=True)
     title = sqlalchemy.Column(sqlalchemy.String, unique=True, nullable=False, index=True)
-    reading = sqlalchemy.Column(sqlalchemy.String, nullable=False, index=True)
-    path_to_sound = sqlalchemy.Column(sqlalchemy.String, nullable=True, index=True)
+    reading = sqlalchemy.Column(sqlalchemy.String, nullable=False)
+    path_to_sound = sqlalchemy.Column(sqlalchemy.String, nullable=True)
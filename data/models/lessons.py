@@ -0,0 +1,16 @@
+import sqlalchemy
+from data.db_session import SqlAlchemyBase
+
+
+class LessonElement(SqlAlchemyBase):
+    """Принадлежность элемента уроку: (тип, номер урока, позиция) -> id элемента"""
+    __tablename__ = 'lesson_elements'
+    __table_args__ = (
+        sqlalchemy.Index('ix_lesson_elements_lesson', 'element_type', 'lesson_number', 'position'),
+        sqlalchemy.UniqueConstraint('element_type', 'element_id', name='uq_lesson_elements_element'),
+    )
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True, autoincrement=True)
+    element_type = sqlalchemy.Column(sqlalchemy.String, nullable=False)
+    lesson_number = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
+    position = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
+    element_id = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
@@ -0,0 +1,19 @@
+import sqlalchemy
+from data.db_session import SqlAlchemyBase
+
+
+class ReviewState(SqlAlchemyBase):
+    """Состояние интервального повторения элемента пользователем (SM-2)"""
+    __tablename__ = 'review_states'
+    __table_args__ = (
+        sqlalchemy.Index('ix_review_states_due', 'user_id', 'element_type', 'due_at'),
+        sqlalchemy.UniqueConstraint('user_id', 'element_type', 'element_id', name='uq_review_states_element'),
+    )
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True, autoincrement=True)
+    user_id = sqlalchemy.Column(sqlalchemy.Integer, sqlalchemy.ForeignKey('users.id'), nullable=False)
+    element_type = sqlalchemy.Column(sqlalchemy.String, nullable=False)
+    element_id = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
+    ease = sqlalchemy.Column(sqlalchemy.Float, nullable=False, default=2.5)
+    interval = sqlalchemy.Column(sqlalchemy.Float, nullable=False, default=0)  # в днях
+    repetitions = sqlalchemy.Column(sqlalchemy.Integer, nullable=False, default=0)
+    due_at = sqlalchemy.Column(sqlalchemy.Float, nullable=False)  # время повторения (time.time())
@@ -4,9 +4,12 @@ from data.db_session import SqlAlchemyBase
 
 class Word(SqlAlchemyBase):
     __tablename__ = 'word'
+    __table_args__ = (
+        sqlalchemy.Index('ix_word_title_reading', 'title', 'reading'),
+    )
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True, autoincrement=True)
-    title = sqlalchemy.Column(sqlalchemy.String, nullable=False, index=True)
-    reading = sqlalchemy.Column(sqlalchemy.String, nullable=False, index=True)
-    meaning = sqlalchemy.Column(sqlalchemy.String, nullable=False, index=True)
-    path_to_sound = sqlalchemy.Column(sqlalchemy.String, nullable=True, index=True)
-    path_to_image = sqlalchemy.Column(sqlalchemy.String, nullable=True, index=True)
+    title = sqlalchemy.Column(sqlalchemy.String, nullable=False)
+    reading = sqlalchemy.Column(sqlalchemy.String, nullable=False)
+    meaning = sqlalchemy.Column(sqlalchemy.String, nullable=False)
+    path_to_sound = sqlalchemy.Column(sqlalchemy.String, nullable=True)
+    path_to_image = sqlalchemy.Column(sqlalchemy.String, nullable=True)
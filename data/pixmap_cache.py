@@ -0,0 +1,88 @@
+"""
+Кэш изображений карточек обучения.
+Пока пользователь читает карточку, изображения следующих карточек
+декодируются в фоновом потоке, поэтому переход к следующей карточке
+не обращается к диску
+"""
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+PIXMAP_CACHE_SIZE = 64  # количество хранимых изображений
+PREFETCH_COUNT = 3  # количество карточек, изображения которых загружаются заранее
+
+# программа записывает в журнал только ошибки, статистика кэша пишется отдельным журналом уровня INFO
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+__executor = None
+
+
+def get_executor():
+    global __executor
+    if not __executor:
+        __executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pixmap_cache')
+    return __executor
+
+
+class PixmapCache(QObject):
+    """
+    LRU-кэш QPixmap по пути к файлу.
+    QImage читается в фоновом потоке, а QPixmap создаётся в потоке
+    интерфейса (в слоте on_image_loaded), как того требует Qt
+    """
+    image_loaded = pyqtSignal(str, QImage)
+
+    def __init__(self, parent=None, max_size=PIXMAP_CACHE_SIZE):
+        super().__init__(parent)
+        self.max_size = max_size
+        self.pixmaps = OrderedDict()
+        self.loading = set()
+        self.hits = 0
+        self.misses = 0
+        self.image_loaded.connect(self.on_image_loaded)
+
+    def get(self, path):
+        pixmap = self.pixmaps.get(path)
+        if pixmap is None:
+            self.misses += 1
+            pixmap = QPixmap(path)  # изображение не успело загрузиться заранее
+            self.put(path, pixmap)
+            return pixmap
+        self.hits += 1
+        self.pixmaps.move_to_end(path)
+        return pixmap
+
+    def put(self, path, pixmap):
+        self.pixmaps[path] = pixmap
+        self.pixmaps.move_to_end(path)
+        while len(self.pixmaps) > self.max_size:
+            self.pixmaps.popitem(last=False)
+
+    def prefetch(self, paths):
+        for path in paths:
+            if path not in self.pixmaps and path not in self.loading:
+                self.loading.add(path)
+                get_executor().submit(self._load, path)
+
+    def _load(self, path):
+        self.image_loaded.emit(path, QImage(path))
+
+    def on_image_loaded(self, path, image):
+        self.loading.discard(path)
+        if path not in self.pixmaps and not image.isNull():
+            self.put(path, QPixmap.fromImage(image))
+
+    def hit_rate(self):
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0
+
+    def stats(self):
+        return (f'hits: {self.hits}, misses: {self.misses}, '
+                f'hit rate: {self.hit_rate():.0%}, images: {len(self.pixmaps)}')
+
+    def log_stats(self):
+        logger.info(f'Pixmap cache {self.stats()}')
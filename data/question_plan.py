@@ -0,0 +1,249 @@
+"""
+План теста: заранее составленный список вопросов с вариантами ответов.
+План строится в фоновом потоке при запуске теста, переход к следующему
+вопросу - взятие элемента списка. План сохраняется в JSON, поэтому тест
+можно повторить в точности для отладки. Вместе с планом незавершённого
+теста хранится его состояние (TestProgress): после сбоя программа
+предлагает продолжить тест с того же вопроса
+"""
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from random import Random
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from data.consts import *
+from data.distractors import COUNT_OF_DISTRACTORS, DistractorSampler
+from data.similarity import similarity_index
+
+PLAN_VERSION = 1
+COUNT_OF_RESERVE = 4 * COUNT_OF_DISTRACTORS  # дистракторов для замены совпадающих
+CURRENT_TEST_PLAN_FILE = 'db/current_test.json'  # план незавершённого теста
+CURRENT_TEST_PROGRESS_FILE = 'db/current_test_progress.json'  # состояние незавершённого теста
+
+__executor = None
+
+
+def write_atomically(path, text):
+    """
+    Файл заменяется целиком: при сбое остаётся прежняя версия. Новая версия
+    записывается на диск (fsync) до замены, чтобы после отключения питания
+    файл не оказался пустым
+    """
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+
+def answer_fields_of(element_type):
+    """Поля элемента, по которым задаются вопросы (одна строка кнопок на поле)"""
+    if element_type == KANJI:
+        return ['onyomi_reading', 'kunyomi_reading', 'meaning']
+    if element_type == WORD:
+        return ['meaning']
+    return ['reading']
+
+
+class Question:
+    """
+    element_id: id элемента, о котором вопрос
+    title, subtitle: текст вопроса (написание и, для слов, чтение)
+    options: строки вариантов ответа, по одной на поле answer_fields_of
+    correct: индекс правильного варианта в каждой строке
+    """
+
+    def __init__(self, element_id, title, subtitle, options, correct):
+        self.element_id = element_id
+        self.title = title
+        self.subtitle = subtitle
+        self.options = options
+        self.correct = correct
+
+    def to_dict(self):
+        return {'element_id': self.element_id, 'title': self.title, 'subtitle': self.subtitle,
+                'options': self.options, 'correct': self.correct}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['element_id'], data['title'], data['subtitle'],
+                   data['options'], data['correct'])
+
+
+class QuestionPlan:
+    def __init__(self, element_type, seed, questions):
+        self.element_type = element_type
+        self.seed = seed
+        self.questions = questions
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __getitem__(self, index):
+        return self.questions[index]
+
+    def to_json(self):
+        return json.dumps({'version': PLAN_VERSION,
+                           'element_type': self.element_type,
+                           'seed': self.seed,
+                           'questions': [question.to_dict() for question in self.questions]},
+                          ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        if data.get('version') != PLAN_VERSION:
+            raise ValueError(f'Неподдерживаемая версия плана теста: {data.get("version")}')
+        return cls(data['element_type'], data['seed'],
+                   [Question.from_dict(question) for question in data['questions']])
+
+    def save(self, path=CURRENT_TEST_PLAN_FILE):
+        write_atomically(path, self.to_json())
+
+    @classmethod
+    def load(cls, path=CURRENT_TEST_PLAN_FILE):
+        with open(path, encoding='utf-8') as file:
+            return cls.from_json(file.read())
+
+
+class TestProgress:
+    """
+    Состояние незавершённого теста, сохраняется при показе каждого вопроса.
+    question_index: вопрос, на который пользователь ещё не ответил
+    answers: id элемента -> ответ верный (для интервального повторения)
+    """
+
+    def __init__(self, user_id, upgrade, question_index, permissible_mistakes, time_left, answers):
+        self.user_id = user_id
+        self.upgrade = upgrade
+        self.question_index = question_index
+        self.permissible_mistakes = permissible_mistakes
+        self.time_left = time_left
+        self.answers = answers
+
+    def to_json(self):
+        return json.dumps({'version': PLAN_VERSION, 'user_id': self.user_id, 'upgrade': self.upgrade,
+                           'question_index': self.question_index,
+                           'permissible_mistakes': self.permissible_mistakes,
+                           'time_left': self.time_left,
+                           'answers': [[element_id, correct] for element_id, correct in self.answers.items()]})
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        if data.get('version') != PLAN_VERSION:
+            raise ValueError(f'Неподдерживаемая версия состояния теста: {data.get("version")}')
+        return cls(data['user_id'], data['upgrade'], data['question_index'], data['permissible_mistakes'],
+                   data['time_left'], {element_id: correct for element_id, correct in data['answers']})
+
+    def save(self, path=CURRENT_TEST_PROGRESS_FILE):
+        write_atomically(path, self.to_json())
+
+    @classmethod
+    def load(cls, path=CURRENT_TEST_PROGRESS_FILE):
+        with open(path, encoding='utf-8') as file:
+            return cls.from_json(file.read())
+
+
+def build_question_plan(element_type, elements, seed=None, confusable=None):
+    """
+    Составляет план теста по элементам (порядок вопросов и варианты ответов).
+    В строке вариантов нет одинаковых текстов: дистрактор с тем же текстом,
+    что у правильного ответа или уже выбранного варианта, пропускается.
+    При одинаковом seed план всегда одинаков
+    """
+    random = Random(seed)
+    elements = list(elements)
+    random.shuffle(elements)
+    sampler = DistractorSampler(elements, random=random, confusable=confusable)
+    fields = answer_fields_of(element_type)
+    questions = []
+    for index, element in enumerate(elements):
+        distractors = [elements[chosen] for chosen in sampler.sample(index)]
+        reserve = None  # запасные дистракторы, если у выбранных совпадают тексты
+        options, correct = [], []
+        for field in fields:
+            row = [getattr(element, field)]
+            add_options(row, distractors, field)
+            if len(row) <= COUNT_OF_DISTRACTORS:
+                if reserve is None:
+                    reserve = [elements[chosen] for chosen in sampler.sample(index, COUNT_OF_RESERVE)]
+                add_options(row, reserve, field)
+            random.shuffle(row)  # у кандзи строки перемешиваются независимо
+            options.append(row)
+            correct.append(row.index(getattr(element, field)))
+        subtitle = element.reading if element_type == WORD else ''
+        questions.append(Question(element.id, element.title, subtitle, options, correct))
+    return QuestionPlan(element_type, seed, questions)
+
+
+def add_options(row, distractors, field):
+    """Дополняет строку вариантов до COUNT_OF_DISTRACTORS + 1 текстами, которых в ней ещё нет"""
+    for distractor in distractors:
+        if len(row) > COUNT_OF_DISTRACTORS:
+            return
+        text = getattr(distractor, field)
+        if text not in row:
+            row.append(text)
+
+
+def get_executor():
+    global __executor
+    if not __executor:
+        __executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='question_plan')
+    return __executor
+
+
+class QuestionPlanner(QObject):
+    """Строит план теста в фоновом потоке и отправляет его сигналом plan_ready"""
+    plan_ready = pyqtSignal(object)
+
+    def build(self, element_type, elements, seed=None, save=True):
+        """save - сохранить план, чтобы тест можно было продолжить после сбоя"""
+        get_executor().submit(self._build, element_type, list(elements), seed, save)
+
+    def _build(self, element_type, elements, seed, save):
+        plan = None
+        try:
+            plan = build_question_plan(element_type, elements, seed,
+                                       confusable=similarity_index.pool_confusable(element_type, elements))
+            if save:
+                plan.save()
+        except OSError as error:
+            logging.error(f'Test plan was not saved: {error}')
+        except Exception as error:
+            logging.error(f'Test plan was not built: {error}')
+        self.plan_ready.emit(plan)
+
+
+def load_saved_test(plan_path=CURRENT_TEST_PLAN_FILE, progress_path=CURRENT_TEST_PROGRESS_FILE):
+    """План и состояние незавершённого теста или None, если его нет"""
+    if not os.path.exists(progress_path):
+        return None
+    try:
+        return QuestionPlan.load(plan_path), TestProgress.load(progress_path)
+    except (OSError, ValueError, KeyError) as error:
+        logging.error(f'Saved test was not loaded: {error}')
+        remove_saved_plan(plan_path, progress_path)
+        return None
+
+
+def remove_saved_plan(plan_path=CURRENT_TEST_PLAN_FILE, progress_path=CURRENT_TEST_PROGRESS_FILE,
+                      user_id=None):
+    """
+    Удаление плана и состояния завершённого теста.
+    user_id - удалить, только если сохранённый тест принадлежит этому пользователю
+    """
+    if user_id is not None and os.path.exists(progress_path):
+        try:
+            if TestProgress.load(progress_path).user_id != user_id:
+                return  # незавершённый тест другого пользователя
+        except (OSError, ValueError, KeyError):
+            pass  # повреждённое состояние удаляется
+    for path in (plan_path, progress_path):
+        if os.path.exists(path):
+            os.remove(path)
@@ -1,10 +1,9 @@
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import (QMainWindow, QPushButton, QLabel, QLineEdit)
-from werkzeug.security import check_password_hash, generate_password_hash
 
 from data import db_session
 from data.consts import *
-from data.models.users import User
+from data.credentials import CredentialService
 from data.style import *
 
 
@@ -15,6 +14,10 @@ class LoginRegisterMenu(QMainWindow):
         self.setWindowTitle("Программа для помощи в изучении японского языка")
         db_session.global_init(f'db/{DB_FILE_NAME}')
         self.ui_list = []
+        self.current_ui = {}
+        self.credentials = CredentialService(self)
+        self.credentials.login_finished.connect(self.on_login_finished)
+        self.credentials.register_finished.connect(self.on_register_finished)
         self.login_menu()
 
     def disable_ui(self):
@@ -36,13 +39,9 @@ class LoginRegisterMenu(QMainWindow):
         back_button.clicked.connect(onclick_function)
         return back_button
 
-    def set_style_and_show_all(self):
+    def show_all(self):
+        """Цвета задаются таблицей стилей приложения (APPLICATION_STYLE)"""
         for ui_object in self.children():
-            if hasattr(ui_object, 'setStyleSheet'):
-                if isinstance(ui_object, QPushButton):
-                    set_color(ui_object, MAIN_COLORS['main_button'])
-                else:
-                    set_color(ui_object, MAIN_COLORS['menu'])
             if hasattr(ui_object, 'show'):
                 ui_object.show()
 
@@ -50,40 +49,45 @@ class LoginRegisterMenu(QMainWindow):
         login = ui['login'].text()
         password = ui['password'].text()
         repeat_password = ui['repeat'].text()
-        if password != repeat_password:
+        if self.credentials.busy:
+            return
+        if db_session.is_read_only():
+            ui['info'].setText('Регистрация недоступна на этом компьютере')
+        elif password != repeat_password:
             ui['info'].setText('Пароли должны совпадать!')
         elif not login or not password:
             ui['info'].setText('Неверный логин или пароль!')
         else:
-            session = db_session.create_session()
-            user = User(
-                login=login,
-                password_hash=generate_password_hash(password)
-            )
-            session.add(user)
-            session.commit()
-            self.parent().current_user = user
-            self.setParent(None)
+            self.current_ui = ui
+            ui['info'].setText('Регистрация...')
+            self.credentials.register(login, password)
 
     def login(self, ui):
         login = ui['login'].text()
         password = ui['password'].text()
+        if self.credentials.busy:
+            return
         if not login or not password:
             ui['info'].setText('Неверный логин или пароль!')
         else:
-            session = db_session.create_session()
-            users = session.query(User).all()
-            found = False
-            user = None
-            for user in users:
-                if check_password_hash(user.password_hash, password) and user.login == login:
-                    found = True
-                    break
-            if found:
-                self.parent().current_user = user
-                self.setParent(None)
-            else:
-                ui['info'].setText('Неверный логин или пароль!')
+            self.current_ui = ui
+            ui['info'].setText('Проверка...')
+            self.credentials.login(login, password)
+
+    def on_login_finished(self, user):
+        if user:
+            main_window = self.parent()
+            self.setParent(None)
+            main_window.set_current_user(user)
+        elif 'info' in self.current_ui:
+            self.current_ui['info'].setText('Неверный логин или пароль!')
+
+    def on_register_finished(self, user, message):
+        if user:
+            self.parent().current_user = user
+            self.setParent(None)
+        elif 'info' in self.current_ui:
+            self.current_ui['info'].setText(message)
 
     def register_menu(self):
         self.disable_ui()
@@ -123,7 +127,7 @@ class LoginRegisterMenu(QMainWindow):
         self.ui_list.extend(ui.values())
         self.ui_list.extend([info_login_label, info_password_label, pass_button,
                              info_repeat_password_label, confirm_button, back_button])
-        self.set_style_and_show_all()
+        self.show_all()
 
     def login_menu(self):
         self.disable_ui()
@@ -157,4 +161,4 @@ class LoginRegisterMenu(QMainWindow):
         self.ui_list.extend(ui.values())
         self.ui_list.extend([info_login_label, info_password_label, pass_button,
                              register_button, confirm_button, back_button])
-        self.set_style_and_show_all()
+        self.show_all()
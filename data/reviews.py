@@ -0,0 +1,135 @@
+"""
+Интервальное повторение по алгоритму SM-2.
+Для каждого пользователя и элемента хранятся лёгкость (ease), интервал
+и время следующего повторения. Элементы к повторению выбираются по индексу
+(пользователь, тип, время повторения), в течение сеанса программы очередь
+хранится в памяти в виде кучи и обновляется после каждого теста
+"""
+import heapq
+from time import time
+
+from data.lessons import SQL_VARIABLES_LIMIT
+from data.models.reviews import ReviewState
+
+SECONDS_IN_DAY = 24 * 60 * 60
+START_EASE = 2.5
+MIN_EASE = 1.3
+CORRECT_QUALITY = 4  # оценка ответа по шкале SM-2 (0 - 5)
+WRONG_QUALITY = 1
+REVIEW_LIMIT = 30  # элементов в одном повторении
+REVIEW_QUEUE_SIZE = 1000  # элементов к повторению, загружаемых в очередь
+
+
+def schedule(state, quality, now=None):
+    """Пересчёт состояния повторения после ответа с оценкой quality"""
+    now = time() if now is None else now
+    if quality < 3:  # ответ забыт - повторение с первого интервала
+        state.repetitions = 0
+        state.interval = 1
+    else:
+        state.repetitions += 1
+        if state.repetitions == 1:
+            state.interval = 1
+        elif state.repetitions == 2:
+            state.interval = 6
+        else:
+            state.interval = round(state.interval * state.ease)
+    state.ease = max(MIN_EASE, state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    state.due_at = now + state.interval * SECONDS_IN_DAY
+    return state
+
+
+def record_answers(session, user_id, element_type, answers, now=None):
+    """
+    Планирует следующие повторения по результатам теста.
+    answers: {id элемента: ответ верный (bool)}
+    Возвращает [(id элемента, время повторения)]. Изменения не фиксируются (commit)
+    """
+    now = time() if now is None else now
+    element_ids = list(answers)
+    states = {}
+    for start in range(0, len(element_ids), SQL_VARIABLES_LIMIT):
+        chunk = element_ids[start:start + SQL_VARIABLES_LIMIT]
+        for state in session.query(ReviewState).filter(
+                ReviewState.user_id == user_id, ReviewState.element_type == element_type,
+                ReviewState.element_id.in_(chunk)):
+            states[state.element_id] = state
+    result = []
+    for element_id, correct in answers.items():
+        state = states.get(element_id)
+        if state is None:
+            state = ReviewState(user_id=user_id, element_type=element_type, element_id=element_id,
+                                ease=START_EASE, interval=0, repetitions=0)
+            session.add(state)
+        schedule(state, CORRECT_QUALITY if correct else WRONG_QUALITY, now)
+        result.append((element_id, state.due_at))
+    return result
+
+
+def due_element_ids(session, user_id, element_type, now=None, limit=REVIEW_QUEUE_SIZE):
+    """[(время повторения, id элемента)] наступивших повторений, самые просроченные первыми"""
+    now = time() if now is None else now
+    query = session.query(ReviewState.due_at, ReviewState.element_id).filter(
+        ReviewState.user_id == user_id, ReviewState.element_type == element_type,
+        ReviewState.due_at <= now).order_by(ReviewState.due_at).limit(limit)
+    return [(row.due_at, row.element_id) for row in query]
+
+
+class DueQueue:
+    """
+    Куча (время повторения, id элемента) одного пользователя и типа.
+    После ответа в кучу добавляется новая запись, старая запись элемента
+    считается устаревшей и пропускается при выборке
+    """
+
+    def __init__(self, entries=()):
+        self.heap = list(entries)
+        heapq.heapify(self.heap)
+        self.due_times = {element_id: due_at for due_at, element_id in self.heap}
+
+    def push(self, element_id, due_at):
+        self.due_times[element_id] = due_at
+        heapq.heappush(self.heap, (due_at, element_id))
+
+    def due(self, now=None, limit=REVIEW_LIMIT):
+        """id элементов, время повторения которых наступило, самые просроченные первыми"""
+        now = time() if now is None else now
+        result, taken = [], []
+        while self.heap and len(result) < limit and self.heap[0][0] <= now:
+            due_at, element_id = heapq.heappop(self.heap)
+            if self.due_times.get(element_id) != due_at or element_id in result:
+                continue  # запись устарела после ответа
+            result.append(element_id)
+            taken.append((due_at, element_id))
+        for entry in taken:
+            heapq.heappush(self.heap, entry)
+        return result
+
+    def __len__(self):
+        return len(self.due_times)
+
+
+class ReviewQueues:
+    """Очереди повторения текущего сеанса: (id пользователя, тип) -> DueQueue"""
+
+    def __init__(self):
+        self.queues = {}
+
+    def get(self, session, user_id, element_type, now=None):
+        key = (user_id, element_type)
+        if key not in self.queues:
+            self.queues[key] = DueQueue(due_element_ids(session, user_id, element_type, now))
+        return self.queues[key]
+
+    def update(self, user_id, element_type, scheduled):
+        """scheduled: результат record_answers"""
+        queue = self.queues.get((user_id, element_type))
+        if queue is not None:
+            for element_id, due_at in scheduled:
+                queue.push(element_id, due_at)
+
+    def invalidate(self):
+        self.queues.clear()
+
+
+review_queues = ReviewQueues()
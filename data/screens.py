@@ -0,0 +1,35 @@
+from PyQt5.QtWidgets import QStackedWidget, QWidget
+
+
+class ScreenManager(QStackedWidget):
+    """
+    Стек экранов главного окна.
+    Каждый экран строится при первом показе и затем только переключается.
+    Экран задаётся функцией factory(screen, *args), которая создаёт виджеты
+    внутри screen и может вернуть функцию обновления данных экрана,
+    вызываемую при каждом показе
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.factories = {}
+        self.screens = {}
+        self.refresh_functions = {}
+
+    def register(self, name, factory):
+        self.factories[name] = factory
+
+    def show_screen(self, name, *args):
+        key = (name, *args)
+        screen = self.screens.get(key)
+        if screen is None:
+            screen = QWidget(self)
+            self.refresh_functions[key] = self.factories[name](screen, *args)
+            self.addWidget(screen)
+            self.screens[key] = screen
+        refresh = self.refresh_functions[key]
+        if refresh:
+            refresh()
+        self.setCurrentWidget(screen)
+        return screen
+
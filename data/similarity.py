@@ -0,0 +1,359 @@
+"""
+Индекс похожих элементов для подбора трудных вариантов ответа в тестах.
+Похожесть складывается из расстояния редактирования между чтениями,
+общих кандзи в написании (title) и общих слов в значении.
+Сравниваются не все пары элементов, а только элементы с общими ключами
+(пары символов чтения, кандзи, слова значения) из инвертированного
+индекса - не более MAX_CANDIDATES на элемент, поэтому построение линейно
+по числу элементов. Похожесть пар считается векторно (NumPy).
+Индексы строятся в фоновом потоке при запуске программы и дополняются
+при добавлении элементов. Пока индекс типа не построен, похожих нет.
+Для теста похожие ищутся среди элементов его пула (pool_confusable):
+небольшой пул сравнивается попарно целиком
+"""
+import logging
+import re
+import threading
+from time import perf_counter
+
+import numpy as np
+
+from data.catalog import catalog
+from data.consts import *
+
+COUNT_OF_SIMILAR = 10  # количество хранимых похожих элементов для каждого
+READING_WEIGHT = 0.5
+KANJI_WEIGHT = 0.3
+MEANING_WEIGHT = 0.2
+MAX_CANDIDATES = 50  # сравниваемых элементов с наибольшим числом общих ключей
+MAX_KEY_ELEMENTS = 500  # более частые ключи (общие пары символов, слова) не учитываются
+MAX_READING_LENGTH = 24  # символов чтения для расстояния редактирования
+MAX_SET_SIZE = 16  # кандзи или слов значения для коэффициента Жаккара
+ROWS_BLOCK = 5000  # элементов в одном шаге построения
+PAIRS_CHUNK = 20_000  # пар в одном векторном подсчёте расстояния
+POOL_LIMIT = 100  # пул теста до этого размера сравнивается попарно целиком
+KANJI_PATTERN = re.compile('[一-鿿]')
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def reading_of(element_type, element):
+    if element_type == KANJI:
+        return f'{element.onyomi_reading} {element.kunyomi_reading}'
+    return element.reading or ''
+
+
+def answers_of(element_type, element):
+    """
+    Тексты правильных ответов по полям вопроса (у кандзи - оба чтения и значение):
+    элемент, совпадающий с другим хотя бы в одном поле, дистрактором быть не может
+    """
+    if element_type == KANJI:
+        return [element.onyomi_reading, element.kunyomi_reading, element.meaning]
+    if element_type in (HIRAGANA, KATAKANA):
+        return [element.reading]
+    return [element.meaning]
+
+
+def kanji_of(element):
+    return set(KANJI_PATTERN.findall(element.title or ''))
+
+
+def meaning_words_of(element_type, element):
+    if element_type in (HIRAGANA, KATAKANA):
+        return set()
+    return set(WORD_PATTERN.findall((element.meaning or '').lower()))
+
+
+def keys_of(reading, kanji, meanings):
+    """Ключи инвертированного индекса: пары символов чтения (с краями строки), кандзи, слова"""
+    padded = f' {reading.lower()} '
+    keys = {('reading', padded[index:index + 2]) for index in range(len(padded) - 1)}
+    keys.update(('kanji', symbol) for symbol in kanji)
+    keys.update(('meaning', word) for word in meanings)
+    return keys
+
+
+def encode_strings(strings, width=None):
+    """Строки -> массив кодов символов (N, width) с нулями в конце и длины (N)"""
+    lengths = np.array([len(string) for string in strings], dtype=np.int64)
+    width = width or max(lengths.max(initial=0), 1)
+    codes = np.zeros((len(strings), width), dtype=np.int32)
+    for index, string in enumerate(strings):
+        codes[index, :len(string)] = [ord(symbol) for symbol in string]
+    return codes, lengths
+
+
+def pair_edit_distances(left_codes, left_lengths, right_codes, right_lengths):
+    """
+    Расстояние Левенштейна для каждой пары строк (left[i], right[i]).
+    Динамика по символам строк выполняется одновременно для всех пар
+    """
+    count = len(left_lengths)
+    width = right_codes.shape[1]
+    result = right_lengths.astype(np.int16)  # расстояние от пустой строки
+    previous = np.broadcast_to(np.arange(width + 1, dtype=np.int16)[:, None], (width + 1, count)).copy()
+    all_pairs = np.arange(count)
+    for i in range(1, left_lengths.max(initial=0) + 1):
+        current = np.empty_like(previous)
+        current[0] = i
+        symbols = left_codes[:, i - 1]
+        for j in range(1, width + 1):
+            cost = symbols != right_codes[:, j - 1]
+            np.minimum(previous[j], current[j - 1], out=current[j])
+            current[j] += 1
+            np.minimum(current[j], previous[j - 1] + cost, out=current[j])
+        finished = left_lengths == i
+        result[finished] = current[right_lengths[finished], all_pairs[finished]]
+        previous = current
+    return result
+
+
+def encode_sets(sets, numbers):
+    """Множества -> массив номеров их элементов (N, MAX_SET_SIZE), пустые места -1, и размеры (N)"""
+    tokens = np.full((len(sets), MAX_SET_SIZE), -1, dtype=np.int32)
+    sizes = np.zeros(len(sets), dtype=np.int64)
+    for index, items in enumerate(sets):
+        items = [numbers.setdefault(item, len(numbers)) for item in items][:MAX_SET_SIZE]
+        tokens[index, :len(items)] = items
+        sizes[index] = len(items)
+    return tokens, sizes
+
+
+def pair_jaccard(left_tokens, left_sizes, right_tokens, right_sizes):
+    """Коэффициент Жаккара для каждой пары множеств (left[i], right[i])"""
+    width = max(left_sizes.max(initial=0), right_sizes.max(initial=0), 1)
+    left_tokens, right_tokens = left_tokens[:, :width], right_tokens[:, :width]
+    # пустые места слева -1, справа -2: они не совпадают
+    matches = (left_tokens[:, :, None] == np.where(right_tokens < 0, -2, right_tokens)[:, None, :])
+    intersection = matches.sum(axis=(1, 2))
+    union = left_sizes + right_sizes - intersection
+    return np.divide(intersection, union, out=np.zeros(len(union)), where=union > 0)
+
+
+class TypeIndex:
+    """
+    Похожие элементы одного типа: id -> [(похожесть, id), ...] по убыванию.
+    all_pairs - сравнивать каждый элемент со всеми (для небольшого пула теста)
+    """
+
+    def __init__(self, element_type, elements, all_pairs=False):
+        self.element_type = element_type
+        self.all_pairs = all_pairs
+        self.ids = []
+        self.readings = []
+        self.answers = []
+        self.kanji = []
+        self.meanings = []
+        self.keys = []
+        self.rows_by_key = {}
+        self.numbers = {}  # текст ответа, кандзи, слово -> номер, для векторного сравнения
+        self.features = None
+        self.similar = {}
+        for element in elements:
+            self.append(element)
+        self.build()
+
+    def append(self, element):
+        row = len(self.ids)
+        self.ids.append(element.id)
+        self.readings.append(reading_of(self.element_type, element)[:MAX_READING_LENGTH])
+        self.answers.append(answers_of(self.element_type, element))
+        self.kanji.append(kanji_of(element))
+        self.meanings.append(meaning_words_of(self.element_type, element))
+        keys = keys_of(self.readings[row], self.kanji[row], self.meanings[row])
+        self.keys.append(keys)
+        for key in keys:
+            self.rows_by_key.setdefault(key, []).append(row)
+        return row
+
+    def encode(self, rows):
+        """
+        Массивы признаков строк rows: коды символов и длины чтений, номера
+        ответов по полям (пустой ответ -1), номера и количества кандзи,
+        номера и количества слов значения
+        """
+        codes, lengths = encode_strings([self.readings[row] for row in rows], MAX_READING_LENGTH)
+        answers = np.full((len(rows), 3 if self.element_type == KANJI else 1), -1, dtype=np.int64)
+        for index, row in enumerate(rows):
+            for field, answer in enumerate(self.answers[row]):
+                if answer:
+                    answers[index, field] = self.numbers.setdefault(('answer', field, answer), len(self.numbers))
+        kanji = encode_sets([self.kanji[row] for row in rows], self.numbers)
+        meanings = encode_sets([self.meanings[row] for row in rows], self.numbers)
+        return codes, lengths, answers, *kanji, *meanings
+
+    def candidates(self, row, postings=None):
+        """
+        Строки элементов, с которыми сравнивается строка row: не более
+        MAX_CANDIDATES с наибольшим числом общих ключей.
+        postings - ключ -> массив строк (rows_by_key в виде массивов NumPy)
+        """
+        if self.all_pairs:
+            return [other for other in range(len(self.ids)) if other != row]
+        postings = postings or self.rows_by_key
+        rows = [postings[key] for key in self.keys[row] if len(postings[key]) <= MAX_KEY_ELEMENTS]
+        if not rows:
+            return []
+        rows, shared = np.unique(np.concatenate(rows), return_counts=True)
+        shared[rows == row] = 0
+        if len(rows) > MAX_CANDIDATES:
+            best = np.argpartition(-shared, MAX_CANDIDATES - 1)[:MAX_CANDIDATES]
+            rows, shared = rows[best], shared[best]
+        return rows[shared > 0].tolist()
+
+    def pair_scores(self, left, right):
+        """Похожесть пар строк (left[i], right[i])"""
+        codes, lengths, answers, kanji, kanji_sizes, meanings, meaning_sizes = self.features
+        left, right = np.asarray(left, dtype=np.int64), np.asarray(right, dtype=np.int64)
+        scores = np.empty(len(left))
+        longest = np.maximum(lengths[left], lengths[right])
+        order = np.argsort(longest, kind='stable')  # пары похожей длины считаются вместе
+        for start in range(0, len(order), PAIRS_CHUNK):
+            chunk = order[start:start + PAIRS_CHUNK]
+            width = max(longest[chunk].max(), 1)
+            distances = pair_edit_distances(codes[left[chunk], :width], lengths[left[chunk]],
+                                            codes[right[chunk], :width], lengths[right[chunk]])
+            scores[chunk] = READING_WEIGHT * (1 - np.divide(
+                distances, longest[chunk], out=np.ones(len(chunk)), where=longest[chunk] > 0))
+            a, b = left[chunk], right[chunk]
+            scores[chunk] += KANJI_WEIGHT * pair_jaccard(kanji[a], kanji_sizes[a], kanji[b], kanji_sizes[b])
+            scores[chunk] += MEANING_WEIGHT * pair_jaccard(meanings[a], meaning_sizes[a],
+                                                           meanings[b], meaning_sizes[b])
+        same_answer = (answers[left] == answers[right]) & (answers[left] >= 0)
+        scores[same_answer.any(axis=1)] = -np.inf
+        return scores
+
+    def build(self):
+        self.features = self.encode(range(len(self.ids)))
+        ids = np.array(self.ids)
+        postings = {key: np.array(rows) for key, rows in self.rows_by_key.items()}
+        for start in range(0, len(self.ids), ROWS_BLOCK):
+            left, right = [], []
+            for row in range(start, min(start + ROWS_BLOCK, len(self.ids))):
+                self.similar[self.ids[row]] = []
+                candidates = self.candidates(row, postings)
+                left.extend([row] * len(candidates))
+                right.extend(candidates)
+            left, right = np.array(left, dtype=np.int64), np.array(right, dtype=np.int64)
+            scores = self.pair_scores(left, right)
+            # по убыванию похожести (при равной - по убыванию id) внутри строки
+            order = np.lexsort((-ids[right], -scores, left))
+            left, right, scores = left[order], right[order], scores[order]
+            first = np.searchsorted(left, left)  # начало группы каждой строки
+            kept = (np.arange(len(left)) - first < COUNT_OF_SIMILAR) & (scores > -np.inf)
+            for row, other, score in zip(left[kept].tolist(), right[kept].tolist(), scores[kept].tolist()):
+                self.similar[self.ids[row]].append((score, self.ids[other]))
+
+    def add(self, element):
+        """Добавление элемента без перестроения: сравнивается только с кандидатами"""
+        if element.id in self.similar:
+            return
+        row = self.append(element)
+        self.features = tuple(np.concatenate([array, new])
+                              for array, new in zip(self.features, self.encode([row])))
+        candidates = self.candidates(row)
+        pairs = []
+        scores = self.pair_scores([row] * len(candidates), candidates)
+        for other, score in zip(candidates, scores.tolist()):
+            if score == -np.inf:
+                continue
+            pairs.append((score, self.ids[other]))
+            similar = self.similar[self.ids[other]]
+            if len(similar) < COUNT_OF_SIMILAR or score > similar[-1][0]:
+                similar.append((score, element.id))
+                similar.sort(reverse=True)
+                del similar[COUNT_OF_SIMILAR:]
+        self.similar[element.id] = sorted(pairs, reverse=True)[:COUNT_OF_SIMILAR]
+
+    def confusable(self, element_id, k):
+        return [similar_id for score, similar_id in self.similar.get(element_id, [])[:k]]
+
+
+class SimilarityIndex:
+    """
+    Индексы похожести по типам. Строятся в фоновом потоке (build_in_background),
+    обращения из потока плана теста и из интерфейса защищены блокировкой
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.indexes = {}
+        self.pending = {}  # тип -> элементы, добавленные во время построения его индекса
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()  # индекс типа строится одним потоком
+        self.thread = None
+
+    def build_in_background(self, element_types=None):
+        """
+        Вызывается при запуске программы после загрузки каталога. Элементы
+        каталога копируются в вызывающем потоке (интерфейса), где каталог
+        изменяется, фоновый поток строит индексы по копиям
+        """
+        if self.thread and self.thread.is_alive():
+            return
+        snapshots = {}
+        with self.lock:
+            for element_type in element_types or self.catalog.elements:
+                if element_type not in self.indexes:
+                    snapshots[element_type] = list(self.catalog.elements[element_type].values())
+                    self.pending[element_type] = []  # добавленные после копирования
+        self.thread = threading.Thread(target=self._build_types, args=(snapshots,),
+                                       name='similarity_index', daemon=True)
+        self.thread.start()
+
+    def _build_types(self, snapshots):
+        for element_type, elements in snapshots.items():
+            try:
+                self.build_index(element_type, elements)
+            except Exception as error:
+                with self.lock:
+                    self.pending.pop(element_type, None)
+                logging.error(f'Similarity index for {element_type} was not built: {error}')
+
+    def build_index(self, element_type, elements):
+        """Индекс типа по копии элементов и добавленным после копирования (pending)"""
+        with self.build_lock:
+            start = perf_counter()
+            index = TypeIndex(element_type, elements)
+            with self.lock:
+                for element in self.pending.pop(element_type, []):
+                    index.add(element)
+                self.indexes[element_type] = index
+        logging.info(f'Similarity index built for {element_type}: {len(elements)} elements '
+                     f'in {perf_counter() - start:.2f} s')
+        return index
+
+    def confusable(self, element_type, element_id, k=COUNT_OF_SIMILAR):
+        """id k самых похожих на element_id элементов, O(k); пока индекс строится - пусто"""
+        with self.lock:
+            index = self.indexes.get(element_type)
+            return index.confusable(element_id, k) if index else []
+
+    def pool_confusable(self, element_type, elements):
+        """
+        Функция id -> id похожих элементов пула теста (для DistractorSampler).
+        Небольшой пул сравнивается попарно целиком, для большого берутся
+        похожие из индекса. Результат не зависит от последующих изменений индекса
+        """
+        if len(elements) <= POOL_LIMIT:
+            similar = TypeIndex(element_type, elements, all_pairs=True).similar
+        else:
+            with self.lock:
+                index = self.indexes.get(element_type)
+                similar = {element.id: list(index.similar.get(element.id, [])) for element in elements} \
+                    if index else {}
+        return lambda element_id: [similar_id for score, similar_id in similar.get(element_id, [])]
+
+    def add(self, element_type, element):
+        with self.lock:
+            if element_type in self.indexes:
+                self.indexes[element_type].add(element)
+            elif element_type in self.pending:
+                self.pending[element_type].append(element)
+
+    def invalidate(self):
+        with self.lock:
+            self.indexes = {}
+
+
+similarity_index = SimilarityIndex(catalog)
@@ -0,0 +1,140 @@
+"""
+Снимок содержимого базы данных: каталоги каны, кандзи и слов,
+индекс уроков, прогресс пользователей, их интервальные повторения, ответы и статистика,
+оценки трудности элементов.
+Формат - сжатые gzip строки JSON: заголовок с версией формата, затем для
+каждой таблицы строка со списком столбцов, строки таблицы (массивы значений)
+и строка окончания с количеством строк. Запись и чтение выполняются
+потоково, таблица целиком в памяти не хранится.
+Запуск из корня проекта:
+    python -m data.snapshot export deck.snapshot.gz
+    python -m data.snapshot import deck.snapshot.gz
+"""
+import argparse
+import gzip
+import json
+import logging
+
+from sqlalchemy import select
+
+from data import db_session
+from data.consts import *
+from data.db_session import SqlAlchemyBase
+
+SNAPSHOT_FORMAT = 'nihongo-snapshot'
+SNAPSHOT_VERSION = 1
+CATALOG_TABLES = ['hiragana', 'katakana', 'kanji', 'word', 'lesson_elements']
+PROGRESS_TABLES = ['users', 'review_states', 'answer_events', 'category_statistics', 'item_statistics',
+                   'item_difficulty']
+SNAPSHOT_TABLES = CATALOG_TABLES + PROGRESS_TABLES
+BATCH_SIZE = 5000
+
+
+def iterate_rows(connection, table, batch_size=BATCH_SIZE):
+    """Строки таблицы по порядку id, из базы данных читается по batch_size строк"""
+    result = connection.execution_options(stream_results=True).execute(
+        select(table).order_by(table.c.id))
+    for partition in result.partitions(batch_size):
+        yield from partition
+
+
+def snapshot_lines(connection, tables):
+    yield {'format': SNAPSHOT_FORMAT, 'version': SNAPSHOT_VERSION, 'tables': tables}
+    for name in tables:
+        table = SqlAlchemyBase.metadata.tables[name]
+        yield {'table': name, 'columns': [column.name for column in table.columns]}
+        count = 0
+        for row in iterate_rows(connection, table):
+            count += 1
+            yield list(row)
+        yield {'end': name, 'rows': count}
+
+
+def export_snapshot(session, path, tables=SNAPSHOT_TABLES):
+    """Записывает снимок таблиц tables в файл path, возвращает {таблица: строк}"""
+    counts = {}
+    with gzip.open(path, 'wt', encoding='utf-8', compresslevel=6) as file:
+        for line in snapshot_lines(session.connection(), tables):
+            if isinstance(line, dict) and 'end' in line:
+                counts[line['end']] = line['rows']
+            file.write(json.dumps(line, ensure_ascii=False, separators=(',', ':')))
+            file.write('\n')
+    logging.info(f'Snapshot exported to {path}: {counts}')
+    return counts
+
+
+def read_lines(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        for line in file:
+            yield json.loads(line)
+
+
+def table_batches(lines, table_name, batch_size):
+    """Строки одной таблицы снимка пачками, до строки окончания таблицы"""
+    batch, count = [], 0
+    for line in lines:
+        if isinstance(line, dict):
+            if line.get('end') != table_name or line.get('rows') != count + len(batch):
+                raise ValueError(f'Снимок повреждён: таблица {table_name}')
+            if batch:
+                yield batch
+            return
+        batch.append(line)
+        if len(batch) == batch_size:
+            count += len(batch)
+            yield batch
+            batch = []
+    raise ValueError(f'Снимок оборван: таблица {table_name}')
+
+
+def import_snapshot(session, path, batch_size=BATCH_SIZE):
+    """
+    Заменяет содержимое таблиц из снимка path одной транзакцией.
+    Столбцы, которых нет в текущей схеме, пропускаются.
+    Возвращает {таблица: строк}
+    """
+    lines = read_lines(path)
+    header = next(lines)
+    if not isinstance(header, dict) or header.get('format') != SNAPSHOT_FORMAT \
+            or header.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f'Файл {path} не является снимком поддерживаемой версии')
+    counts = {}
+    try:
+        for line in lines:
+            table = SqlAlchemyBase.metadata.tables.get(line.get('table'))
+            if table is None or line['table'] not in SNAPSHOT_TABLES:
+                raise ValueError(f'Неизвестная таблица в снимке: {line.get("table")}')
+            known = [index for index, column in enumerate(line['columns']) if column in table.c]
+            names = [line['columns'][index] for index in known]
+            session.execute(table.delete())
+            counts[table.name] = 0
+            for batch in table_batches(lines, table.name, batch_size):
+                session.execute(table.insert(), [dict(zip(names, (row[index] for index in known)))
+                                                 for row in batch])
+                counts[table.name] += len(batch)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    logging.info(f'Snapshot imported from {path}: {counts}')
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Экспорт и импорт снимка базы данных')
+    parser.add_argument('action', choices=['export', 'import'])
+    parser.add_argument('path')
+    parser.add_argument('--tables', nargs='+', choices=SNAPSHOT_TABLES, default=SNAPSHOT_TABLES)
+    parser.add_argument('--database', default=f'db/{DB_FILE_NAME}')
+    arguments = parser.parse_args()
+    db_session.global_init(arguments.database)
+    if arguments.action == 'export':
+        with db_session.read_only_session() as session:
+            print(export_snapshot(session, arguments.path, arguments.tables))
+    else:
+        with db_session.unit_of_work() as session:
+            print(import_snapshot(session, arguments.path))
+
+
+if __name__ == '__main__':
+    main()
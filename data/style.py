@@ -13,16 +13,31 @@ MAIN_COLORS = {
     'menu': [70, 70, 200]
 }
 
+
+def rgb(color):
+    red, green, blue = color
+    return f'rgb({red}, {green}, {blue})'
+
+
+# Единая таблица стилей приложения (QApplication.setStyleSheet)
+APPLICATION_STYLE = f"""
+QWidget {{ background-color: {rgb(MAIN_COLORS['menu'])}; }}
+QPushButton {{ background-color: {rgb(MAIN_COLORS['main_button'])}; }}
+QPushButton[answer="correct"] {{ background-color: {rgb(MAIN_COLORS['green'])}; }}
+QPushButton[answer="wrong"] {{ background-color: {rgb(MAIN_COLORS['red'])}; }}
+"""
+
+
 def mark_correct_button(ui_element, is_correct):
-    if is_correct:
-        set_color(ui_element, MAIN_COLORS['green'])
-    else:
-        set_color(ui_element, MAIN_COLORS['red'])
+    set_answer_state(ui_element, 'correct' if is_correct else 'wrong')
 
 
-def set_color(ui_element, color):
-    """color == [0..255,0..255,0..255] or
-       color == (0..255,0..255,0..255)"""
-    red, green, blue = color
-    style = f'background-color: rgb({red}, {green}, {blue})'
-    ui_element.setStyleSheet(style)
+def reset_button_mark(ui_element):
+    set_answer_state(ui_element, '')
+
+
+def set_answer_state(ui_element, state):
+    """Смена состояния кнопки ответа, цвет задаётся в APPLICATION_STYLE"""
+    ui_element.setProperty('answer', state)
+    ui_element.style().unpolish(ui_element)
+    ui_element.style().polish(ui_element)
@@ -1,65 +1,105 @@
-from random import shuffle, sample
+import logging
+from time import monotonic
 
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import *
 
 from data import db_session
+from data.answer_log import get_answer_log
 from data.consts import *
+from data.lesson_cache import lesson_cache
 from data.models.users import User
+from data.question_plan import QuestionPlanner, TestProgress, remove_saved_plan
+from data.reviews import record_answers, review_queues
 from data.style import *
 from data.timer import Timer
 
 
 class Test(QMainWindow):
-    def __init__(self, element_type, elements, is_upgrading, user, parent):
+    def __init__(self, element_type, elements, is_upgrading, user, parent, seed=None, plan=None,
+                 progress=None):
+        """
+        seed: зерно случайного порядка вопросов и вариантов ответа
+        plan: готовый план теста (QuestionPlan) для продолжения или повтора теста
+        progress: сохранённое состояние (TestProgress) для продолжения теста после сбоя
+        """
         super().__init__(parent, Qt.Window)
-        shuffle(elements)
+        self.seed = seed
         self.element_type = element_type
         self.elements = elements
-        self.question_index = -1
         self.parent_widget = parent
         self.user = user
+        # результаты сохраняются для пользователя, если база открыта не только для чтения
+        self.saves_results = bool(user) and not db_session.is_read_only()
         self.one_element_time = TIME_FOR_ONE_ELEMENT[element_type]
         self.all_time = self.one_element_time * len(self.elements)
-        self.upgrade = is_upgrading
-        # количество допустимых ошибок = кол-во элементов * 1 % * число процентов
-        self.permissible_mistakes = int(len(elements) * 0.01 * ERROR_PERCENT_FOR_TEST)
-        self.can_click = True
-        self.checked = False if element_type != KANJI else [False, False, False]
-        if element_type == KANJI:
-            self.kanji_mistakes = 0
+        self.upgrade = is_upgrading and self.saves_results
         self.buttons = []
         self.ui_list = []
+        self.result_ui = []
+        self.planner = QuestionPlanner(self)
+        self.planner.plan_ready.connect(self.start_plan)
         self.setupUi()
-        self.continue_test()  # запуск теста
+        self.start(plan, progress)
 
-    def disable_ui(self):
-        for ui_item in self.ui_list:
-            ui_item.setParent(None)
-        self.ui_list = []
-        for button in self.buttons:
-            button.setParent(None)
-        self.buttons = []
+    def start(self, plan=None, progress=None):
+        """Начальное состояние теста, виджеты и таймер используются повторно"""
+        self.plan = None
+        self.current_question = None
+        self.question_index = -1
+        # количество допустимых ошибок = кол-во элементов * 1 % * число процентов
+        self.permissible_mistakes = int(len(self.elements) * 0.01 * ERROR_PERCENT_FOR_TEST)
+        self.timer.duration = self.all_time
+        self.can_click = True
+        self.checked = False if self.element_type != KANJI else [False, False, False]
+        self.kanji_mistakes = 0
+        self.answers = {}  # id элемента -> ответ верный, для интервального повторения
+        self.resume_index = None  # вопрос, с которого продолжается тест после сбоя
+        if progress:
+            self.resume_index = progress.question_index
+            self.permissible_mistakes = progress.permissible_mistakes
+            self.timer.duration = progress.time_left
+            self.answers = dict(progress.answers)
+        self.set_visible(self.result_ui, False)
+        self.set_visible(self.ui_list, True)
+        self.set_visible(self.buttons, False)  # кнопки ответов появятся с первым вопросом
+        self.mistakes_left_label.setText(f'Прав на ошибку осталось: {self.permissible_mistakes}')
+        self.questions_left_label.setText(f'Вопросов осталось: {len(self.elements)}')
+        if plan:
+            self.start_plan(plan)
+        else:  # план составляется в фоне, тест начнётся в start_plan
+            self.label_of_element.setText('Подготовка теста...')
+            self.label_of_reading.setText('')
+            self.planner.build(self.element_type, self.elements, self.seed, save=self.saves_results)
+
+    def start_plan(self, plan):
+        if self.plan:  # план уже получен
+            return
+        if not plan:
+            self.label_of_element.setText('Не удалось подготовить тест')
+            return
+        self.plan = plan
+        self.timer.start()
+        if self.resume_index is not None:
+            self.question_index = self.resume_index
+            self.show_question()
+        else:
+            self.continue_test()  # запуск теста
 
-    def set_style_and_show_all(self):
-        for ui_object in self.children():
-            if hasattr(ui_object, 'setStyleSheet'):
-                if isinstance(ui_object, QPushButton):
-                    set_color(ui_object, MAIN_COLORS['main_button'])
-                else:
-                    set_color(ui_object, MAIN_COLORS['menu'])
-            if hasattr(ui_object, 'show'):
-                ui_object.show()
+    @staticmethod
+    def set_visible(ui_items, visible):
+        for ui_item in ui_items:
+            ui_item.setVisible(visible)
 
     def setupUi(self):
         self.centralwidget = QWidget(self)
         self.setCentralWidget(self.centralwidget)
         self.setWindowTitle("Программа для помощи в изучении японского языка")
         self.resize(700, 450)
-        self.mistakes_left_label = QLabel(f'Прав на ошибку осталось: {self.permissible_mistakes}', self)
+        self.mistakes_left_label = QLabel('', self)
         self.mistakes_left_label.setGeometry(390, 0, 300, 30)
         self.mistakes_left_label.setFont(FONT_14)
-        self.questions_left_label = QLabel(f'Вопросов осталось: {len(self.elements) - self.question_index}', self)
+        self.questions_left_label = QLabel('', self)
         self.questions_left_label.setGeometry(0, 0, 300, 30)
         self.questions_left_label.setFont(FONT_14)
         info = f'Вам необходимо пройти тест не более чем за {self.all_time} секунд'
@@ -82,23 +122,40 @@ class Test(QMainWindow):
         self.continue_button.clicked.connect(self.continue_test)
         lcd_timer = QLCDNumber(self)
         lcd_timer.setGeometry(325, 0, 50, 30)
-        self.timer = Timer(self.all_time, lcd_timer, self)
-        self.timer.start()
+        self.timer = Timer(self.all_time, lcd_timer, self,
+                           question_duration=TIME_FOR_ONE_QUESTION[self.element_type])
         self.ui_list.extend([self.mistakes_left_label, self.info_label,
                              self.label_of_reading, self.label_of_element,
                              self.continue_button, self.menu_button,
                              self.questions_left_label, lcd_timer])
+        self.create_buttons()
+        self.create_result_ui()
+
+    def create_result_ui(self):
+        """Виджеты результата теста, скрыты до его окончания"""
+        self.result_label = QLabel('', self)
+        self.result_label.setAlignment(Qt.AlignCenter)
+        self.result_label.setGeometry(50, 50, 600, 40)
+        self.result_label.setFont(FONT_20)
+        self.retest_button = QPushButton('Пройти тест заново', self)
+        self.retest_button.setFont(FONT_20)
+        self.retest_button.setGeometry(50, 200, 600, 40)
+        self.retest_button.clicked.connect(self.reset)
+        self.result_continue_button = QPushButton('Продолжить', self)
+        self.result_continue_button.setFont(FONT_20)
+        self.result_continue_button.setGeometry(50, 400, 600, 40)
+        self.result_continue_button.clicked.connect(self.destroy)
+        self.result_ui = [self.result_label, self.retest_button, self.result_continue_button]
 
     def create_buttons(self):
-        for button in self.buttons:
-            button.setParent(None)
-        self.buttons = []
+        """Кнопки ответов создаются один раз и используются во всех вопросах"""
         if self.element_type != KANJI:
             y = 150
             for index in range(4):
                 button = QPushButton('', self)
                 button.setGeometry(0, y, 700, 50)
                 button.setFont(FONT_17)
+                button.level = 0
                 y += 60
                 self.buttons.append(button)
         else:
@@ -114,88 +171,63 @@ class Test(QMainWindow):
                 if index % 4 == 3:
                     x += 233
                     y = 150
+        for button in self.buttons:
+            button.clicked.connect(self.answer_clicked)
 
-    @staticmethod
-    def select_elements_for_question(elements, current_element):
-        """
-        elements: list
-        current_element: (Hiragana, Katakana, Kanji или Word
-        Возвращает список (list) из 4-х элементов, включая current_element,
-        являющимся правильным ответом на тест
-        """
-        temporary = set(elements)
-        temporary.discard(current_element)
-        temporary = list(temporary)
-        wrong_elements = sample(temporary, 3)
-        result = (wrong_elements + [current_element])
-        shuffle(result)
-        return result
-
-    def create_question(self, current_element):
-        self.create_buttons()
+    def create_question(self, question):
+        self.current_question = question
         self.checked = False if self.element_type != KANJI else [False, False, False]
-        self.label_of_element.setText(current_element.title)
-        if self.element_type == WORD:
-            self.label_of_reading.setText(current_element.reading)
+        self.kanji_mistakes = 0
+        self.question_mistake = False
+        self.question_shown_at = monotonic()  # начало отсчёта времени ответа
+        self.timer.start_question()
+        self.label_of_element.setText(question.title)
+        self.label_of_reading.setText(question.subtitle)
+        for index, button in enumerate(self.buttons):
+            options = question.options[button.level]
+            # в тесте меньше чем из 4 элементов лишние кнопки скрываются
+            button.setVisible(index % 4 < len(options))
+            button.setText(options[index % 4] if index % 4 < len(options) else '')
+            reset_button_mark(button)
 
-        question_elements = self.select_elements_for_question(self.elements, current_element)
+    def answer_clicked(self):
+        if self.current_question is None:  # план теста ещё составляется
+            return
         if self.element_type != KANJI:
-            for index, button in enumerate(self.buttons):
-                if self.element_type == WORD:
-                    button.setText(question_elements[index].meaning)
-                else:
-                    button.setText(question_elements[index].reading)
-                button.clicked.connect(
-                    lambda: self.check_answer(current_element, self.buttons))
+            self.check_answer(self.current_question, self.buttons, self.sender())
         else:
-            self.kanji_mistakes = 0
-            onyomi_readings = set(kanji.onyomi_reading for kanji in question_elements)
-            kunyomi_readings = set(kanji.kunyomi_reading for kanji in question_elements)
-            meanings = set(kanji.meaning for kanji in question_elements)
-            for index, button in enumerate(self.buttons):
-                if index < 4:
-                    button.setText(onyomi_readings.pop())
-                elif index < 8:
-                    button.setText(kunyomi_readings.pop())
-                else:
-                    button.setText(meanings.pop())
-                button.clicked.connect(
-                    lambda: self.check_answer_of_kanji(current_element, self.buttons))
+            self.check_answer_of_kanji(self.current_question, self.buttons, self.sender())
 
     def stop_test(self, timer=False, prematurely=False):
         if prematurely:
             self.setParent(None)
         self.timer.end()
-        self.disable_ui()
-        result_label = QLabel('', self)
-        result_label.setAlignment(Qt.AlignCenter)
-        result_label.setGeometry(50, 50, 600, 40)
-        result_label.setFont(FONT_20)
+        if self.saves_results:  # тест гостя не сохранялся и не удаляет чужой
+            remove_saved_plan(user_id=self.user.id)
+        self.save_answers()
+        if self.saves_results:  # ответы теста записываются, не дожидаясь FLUSH_INTERVAL
+            get_answer_log().flush()
+        self.set_visible(self.ui_list + self.buttons, False)
+        self.set_visible(self.result_ui, True)
+        self.retest_button.hide()
         if self.permissible_mistakes >= 0 and not timer:
             if self.upgrade:
                 self.update_progress(self.element_type, self.user)
-                result_label.setText('Вы прошли тест и открыли новый урок')
+                self.result_label.setText('Вы прошли тест и открыли новый урок')
             else:
-                result_label.setText('Вы прошли тест')
+                self.result_label.setText('Вы прошли тест')
         elif timer:
-            result_label.setText('Ваше время истекло')
+            self.result_label.setText('Ваше время истекло')
         else:
-            retest_button = QPushButton('Пройти тест заново', self)
-            retest_button.setFont(FONT_20)
-            retest_button.setGeometry(50, 200, 600, 40)
-            retest_button.clicked.connect(self.reset)
-            result_label.setText('Вы не прошли тест')
-        continue_button = QPushButton('Продолжить', self)
-        continue_button.setFont(FONT_20)
-        continue_button.setGeometry(50, 400, 600, 40)
-        continue_button.clicked.connect(self.destroy)
-        self.set_style_and_show_all()
+            self.retest_button.show()
+            self.result_label.setText('Вы не прошли тест')
 
     def reset(self):
-        self.__init__(self.element_type, self.elements,
-                      self.upgrade, self.user, self.parent_widget)
+        self.start()
 
     def continue_test(self):
+        if not self.plan:  # план ещё составляется
+            return
         if self.question_index != -1:  # индекс -1 - тест только инициализируется
             if self.element_type != KANJI:
                 if not self.checked:
@@ -203,63 +235,87 @@ class Test(QMainWindow):
             else:
                 if not all(self.checked):
                     self.permissible_mistakes -= 1
+            self.answers[self.current_question.element_id] = self.is_answered_correctly()
         self.question_index += 1
+        self.show_question()
+
+    def show_question(self):
         if self.question_index == len(self.elements):
             self.stop_test()
         else:
-            current_element = self.elements[self.question_index]
+            question = self.plan[self.question_index]
             info_text = f'Прав на ошибку осталось: {self.permissible_mistakes}'
             self.mistakes_left_label.setText(info_text)
             self.questions_left_label.setText(f'Вопросов осталось: {len(self.elements) - self.question_index}')
-            self.create_question(current_element)
-            self.set_style_and_show_all()
+            self.create_question(question)
+            self.save_progress()
 
-    def check_answer(self, correct_element, buttons):
-        if isinstance(correct_element, Word):
-            correct_answer = correct_element.meaning
-        else:
-            correct_answer = correct_element.reading
+    def save_progress(self):
+        """Состояние теста пользователя сохраняется для продолжения после сбоя"""
+        if not self.saves_results:
+            return
+        try:
+            TestProgress(self.user.id, self.upgrade, self.question_index, self.permissible_mistakes,
+                         self.timer.remaining(), self.answers).save()
+        except OSError as error:
+            logging.error(f'Test progress was not saved: {error}')
+
+    def log_answer(self, question, chosen, correct):
+        """Ответ записывается в журнал в фоне, нажатие не ждёт базы данных"""
+        if self.saves_results:
+            get_answer_log().record(self.user.id, self.element_type, question.element_id, chosen,
+                                    correct, monotonic() - self.question_shown_at)
+
+    def is_answered_correctly(self):
+        if self.element_type != KANJI:
+            return self.checked and not self.question_mistake
+        return all(self.checked) and not self.kanji_mistakes
+
+    def check_answer(self, question, buttons, button):
+        correct_index = question.correct[0]
         if not self.checked and self.can_click:
-            button = self.sender()
-            if button.text() == correct_answer:
+            self.log_answer(question, button.text(), buttons.index(button) == correct_index)
+            if buttons.index(button) == correct_index:
                 mark_correct_button(button, is_correct=True)
             else:
                 self.permissible_mistakes -= 1
+                self.question_mistake = True
                 self.mistakes_left_label.setText(f'Прав на ошибку осталось: {self.permissible_mistakes}')
-                for button in buttons:
-                    if button.text() == correct_answer:
-                        mark_correct_button(button, is_correct=True)
-                    else:
-                        mark_correct_button(button, is_correct=False)
+                for index, button in enumerate(buttons):
+                    mark_correct_button(button, is_correct=index == correct_index)
             self.checked = True
 
-    def check_answer_of_kanji(self, correct_element, buttons):
-        current_level = self.sender().level
+    def check_answer_of_kanji(self, question, buttons, current_button):
+        current_level = current_button.level
         buttons = [button for button in buttons if button.level == current_level]
-        correct_answers = {0: correct_element.onyomi_reading,
-                           1: correct_element.kunyomi_reading,
-                           2: correct_element.meaning}
+        correct_index = question.correct[current_level]
         if not self.checked[current_level] and self.can_click:
-            current_button = self.sender()
-            if current_button.text() == correct_answers[current_level]:
+            self.log_answer(question, current_button.text(), buttons.index(current_button) == correct_index)
+            if buttons.index(current_button) == correct_index:
                 mark_correct_button(current_button, is_correct=True)
             else:
                 self.kanji_mistakes += 1
-                for button in buttons:
-                    if button.text() == correct_answers[current_level]:
-                        mark_correct_button(button, is_correct=True)
-                    else:
-                        mark_correct_button(button, is_correct=False)
+                for index, button in enumerate(buttons):
+                    mark_correct_button(button, is_correct=index == correct_index)
             self.checked[current_level] = True
         if self.kanji_mistakes and all(self.checked):
             self.permissible_mistakes -= 1
             self.mistakes_left_label.setText(f'Прав на ошибку осталось: {self.permissible_mistakes}')
 
+    def save_answers(self):
+        """Планирование повторений по ответам теста"""
+        if not self.saves_results or not self.answers:
+            return
+        with db_session.unit_of_work() as session:
+            scheduled = record_answers(session, self.user.id, self.element_type, self.answers)
+        review_queues.update(self.user.id, self.element_type, scheduled)
+        self.answers = {}
+
     def update_progress(self, type_of_learning, user):
         if user:
-            session = db_session.create_session()
-            user = session.query(User).filter(User.id == user.id).first()
-            current = getattr(user, f'{type_of_learning}_save', 1)
-            setattr(user, f'{type_of_learning}_save', current + 1)
-            session.commit()
+            with db_session.unit_of_work() as session:
+                user = session.query(User).filter(User.id == user.id).first()
+                current = getattr(user, f'{type_of_learning}_save', 1)
+                setattr(user, f'{type_of_learning}_save', current + 1)
+            lesson_cache.invalidate()
             self.parent_widget.current_user = user
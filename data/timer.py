@@ -1,25 +1,62 @@
-from threading import Thread
-from time import sleep
+from time import monotonic
 
+from PyQt5.QtCore import QObject, QTimer
 
-class Timer(Thread):
-    def __init__(self, duration, display_object, main_object):
-        super().__init__()
+TIMER_RESOLUTION = 100  # период проверки времени (в миллисекундах)
+
+
+class Timer(QObject):
+    """
+    Таймер теста в цикле событий Qt (без отдельных потоков).
+    Оставшееся время считается от монотонного срока окончания, поэтому
+    не накапливает погрешность. Кроме времени на весь тест (duration)
+    можно задать время на один вопрос (question_duration)
+    """
+
+    def __init__(self, duration, display_object, main_object, question_duration=None):
+        super().__init__(main_object)
         self.duration = duration
+        self.question_duration = question_duration
         self.display_object = display_object
-        self.seconds = 0
-        self.stop = False
         self.main_object = main_object
+        self.deadline = None
+        self.question_deadline = None
+        self.shown_seconds = None
+        self.timer = QTimer(self)
+        self.timer.setInterval(TIMER_RESOLUTION)
+        self.timer.timeout.connect(self.check)
+
+    def start(self):
+        self.deadline = monotonic() + self.duration
+        self.shown_seconds = None
+        self.start_question()
+        self.timer.start()
+        self.check()
+
+    def start_question(self):
+        if self.question_duration:
+            self.question_deadline = monotonic() + self.question_duration
 
     def end(self):
-        self.stop = True
+        self.timer.stop()
+        self.deadline = self.question_deadline = None
+
+    def remaining(self):
+        if self.deadline is None:
+            return 0
+        return max(self.deadline - monotonic(), 0)
 
-    def run(self):
-        while self.duration - self.seconds > 0 and not self.stop:
-            sleep(1)
-            self.seconds += 1
-            seconds_left = self.duration - self.seconds
+    def check(self):
+        if self.deadline is None:
+            return
+        now = monotonic()
+        seconds_left = int(max(self.deadline - now, 0) + 0.999)  # округление вверх
+        if seconds_left != self.shown_seconds:
+            self.shown_seconds = seconds_left
             minutes, seconds = seconds_left // 60, seconds_left % 60
-            self.display_object.display(f'{minutes}:{seconds}')
-        if not self.stop:
+            self.display_object.display(f'{minutes}:{seconds:02d}')
+        if now >= self.deadline:
+            self.end()
             self.main_object.stop_test(timer=True)
+        elif self.question_deadline is not None and now >= self.question_deadline:
+            self.main_object.continue_test()  # время на вопрос истекло
@@ -3,8 +3,11 @@ import sys
 
 from PyQt5.QtWidgets import *
 
+from data import db_session
+from data.answer_log import stop_answer_log
 from data.Nihongo import ProgramLearnJapaneseLanguage
 from data.consts import LOG_FILE
+from data.style import APPLICATION_STYLE
 
 logging.basicConfig(
     level=logging.ERROR,
@@ -13,6 +16,15 @@ logging.basicConfig(
 )
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    main = ProgramLearnJapaneseLanguage()
+    app.setStyleSheet(APPLICATION_STYLE)
+    try:
+        main = ProgramLearnJapaneseLanguage()
+    except RuntimeError as error:  # база данных не подходит для выбранного профиля
+        logging.error(error)
+        QMessageBox.critical(None, 'Ошибка базы данных', str(error))
+        sys.exit(1)
     main.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    stop_answer_log()  # запись ответов, ещё не сохранённых в базу данных
+    db_session.report_leaks()  # незакрытые сессии записываются в журнал
+    sys.exit(exit_code)